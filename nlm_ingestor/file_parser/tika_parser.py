@@ -1,11 +1,10 @@
 import logging
-import os
 
 from bs4 import BeautifulSoup
 from tika import parser
 
 from nlm_ingestor.file_parser.file_parser import FileParser
-from nlm_utils.utils.utils import ensure_bool
+from nlm_ingestor.ingestion_daemon.config import settings
 from nlm_ingestor.ingestor_utils.utils import safe_open
 
 
@@ -13,9 +12,14 @@ class TikaFileParser(FileParser):
     def __init__(self):
         pass
 
-    def parse_to_html(self, filepath, do_ocr=False):
+    def parse_to_html(self, filepath, do_ocr=False, ocr_strategy="ocr_only", ocr_auto_min_chars=None):
+        """
+        Tika's xhtml for the file. With do_ocr, the pages are OCR'd as given by ocr_strategy:
+        all of them with ocr_only, only the ones with too little text with auto.
+        With auto, ocr_auto_min_chars replaces tika's threshold of characters under which a page is OCR'd.
+        """
         # Turn off OCR by default
-        timeout = 3000
+        timeout = settings.tika_timeout
         headers = {
             "X-Tika-OCRskipOcr": "true",
             "X-Tika-PDFOcrStrategy": "auto",
@@ -27,13 +31,21 @@ class TikaFileParser(FileParser):
                 "X-Tika-OCRoutputType": "hocr",
                 "X-Tika-OCRLanguage": "eng+chi_sim+chi_tra",
                 "X-Tika-Timeout-Millis": str(100 * timeout),
-                "X-Tika-PDFOcrStrategy": "ocr_only",
+                "X-Tika-PDFOcrStrategy": ocr_strategy,
                 "X-Tika-OCRtimeoutSeconds": str(timeout),
             }
+            if ocr_strategy == "auto" and ocr_auto_min_chars:
+                # PDFParserConfig.ocrStrategyAuto: "<unmapped unicode chars per page>, <total chars per page>"
+                headers["X-Tika-PDFOcrStrategyAuto"] = f"10%, {ocr_auto_min_chars}"
 
-        if ensure_bool(os.environ.get("TIKA_OCR", False)):
+        if settings.tika_ocr:
             headers = None
-        return parser.from_file(filepath, xmlContent=True, requestOptions={'headers': headers, 'timeout': timeout})
+        return parser.from_file(
+            filepath,
+            serverEndpoint=settings.tika_server_endpoint,
+            xmlContent=True,
+            requestOptions={'headers': headers, 'timeout': timeout},
+        )
 
     def parse_to_clean_html(self, filepath):
         if not find_tika_header(filepath):
@@ -41,7 +53,7 @@ class TikaFileParser(FileParser):
                 file_data = BeautifulSoup(
                     file.read(), features="html.parser",
                 ).prettify()
-            return parser.from_buffer(file_data, xmlContent=True)
+            return parser.from_buffer(file_data, serverEndpoint=settings.tika_server_endpoint, xmlContent=True)
         else:
             with safe_open(filepath) as file:
                 file_data = file.read()
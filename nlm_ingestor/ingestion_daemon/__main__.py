@@ -1,7 +1,9 @@
 import logging
 import nlm_ingestor.ingestion_daemon.config as cfg
 import os
+import signal
 import tempfile
+import threading
 import traceback
 from flask import Flask, request, jsonify, make_response
 from werkzeug.utils import secure_filename
@@ -9,6 +11,7 @@ from nlm_ingestor.ingestor import ingestor_api
 from nlm_utils.utils import file_utils
 import boto3
 
+from nlm_ingestor.ingestor_utils.model_registry import models
 from nlm_ingestor.ingestor_utils.utils import normalize_kangxi_radicals, safe_unlink
 
 app = Flask(__name__)
@@ -25,7 +28,7 @@ if not logger.hasHandlers():
 
 s3_client = boto3.client(
     's3',
-    region_name=os.environ['AWS_REGION'] if 'AWS_REGION' in os.environ else None
+    region_name=cfg.settings.aws_region
 )
 
 @app.route('/', methods=['GET'])
@@ -49,7 +52,9 @@ def parse_document(
             "render_format": render_format,
             "use_new_indent_parser": use_new_indent_parser == "yes",
             "parse_pages": (),
-            "apply_ocr": apply_ocr == "yes"
+            "apply_ocr": apply_ocr == "yes",
+            # OCR only the pages without enough text
+            "ocr_sparse_pages": apply_ocr == "sparse",
         }
         # save the incoming file to a temporary location
         if 'file' in request.files:
@@ -133,6 +138,14 @@ def parse_s3_url(s3url):
 
 def main():
     logger.info("Starting ingestor service..")
+    if hasattr(signal, "SIGHUP"):
+        # after editing the file named by NLM_INGESTOR_CONFIG_FILE, kill -HUP <pid> applies the new
+        # cache sizes, tika settings ... without a restart. The reload runs off the signal handler,
+        # which could otherwise interrupt a reload holding the settings lock.
+        signal.signal(signal.SIGHUP, lambda *_: threading.Thread(target=cfg.reload_settings, daemon=True).start())
+    if cfg.settings.warm_models:
+        # load the spell checker etc. while the service starts, not on the first request that needs them
+        threading.Thread(target=models.warm, daemon=True).start()
     app.run(host="0.0.0.0", port=5001, debug=False)
 
 if __name__ == "__main__":
@@ -1,19 +1,147 @@
+import logging
 import os
-from distutils import util as dutils
+import threading
 from typing import List
 from typing import Optional
 
-from nlm_ingestor.ingestor_utils.utils import safe_int
+logger = logging.getLogger(__name__)
 
 __CFG = dict()
 
-
-__CFG = dict()
+# KEY=VALUE lines read over the environment, so that settings can be changed while the daemon runs
+config_file_env = "NLM_INGESTOR_CONFIG_FILE"
+
+true_values = {"y", "yes", "t", "true", "on", "1"}
+false_values = {"n", "no", "f", "false", "off", "0"}
+
+
+def to_bool(value) -> bool:
+    """
+    Parse a boolean the way distutils' strtobool did (y, yes, t, true, on, 1 / n, no, f, false, off, 0).
+    """
+    if isinstance(value, bool):
+        return value
+    value = str(value).strip().lower()
+    if value in true_values:
+        return True
+    if value in false_values:
+        return False
+    raise ValueError(f"invalid truth value {value!r}")
+
+
+def to_int(value) -> int:
+    if isinstance(value, str):
+        value = value.strip()
+    return int(value)
+
+
+def read_config_file(path):
+    """
+    KEY=VALUE lines of the file at path, without blank lines, # comments and quotes around values.
+    """
+    values = {}
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, sep, value = line.partition("=")
+            if not sep:
+                raise ValueError(f"{path}:{line_no}: expected KEY=VALUE, got {line!r}")
+            value = value.strip()
+            if len(value) > 1 and value[0] == value[-1] and value[0] in "'\"":
+                value = value[1:-1]
+            values[key.strip()] = value
+    return values
+
+
+class Settings:
+    """
+    Tunables of the pipeline, resolved from set_config values, the config file named by
+    NLM_INGESTOR_CONFIG_FILE and the environment, in that order, when the module is imported
+    (so that invalid values fail at startup) and then read as attributes, e.g. settings.tika_timeout
+    for TIKA_TIMEOUT. reload() resolves them again, reading the config file again, for instance
+    when the daemon gets a SIGHUP, and calls the functions registered with on_reload with the new settings.
+    """
+    # environment variable -> (type, default)
+    fields = {
+        "LOG_LEVEL": (str, "INFO"),
+        "PDF_PARSER": (str, "tika"),
+        "HTML_PARSER": (str, "tika"),
+        "TIKA_SERVER_ENDPOINT": (str, "http://localhost:9998"),
+        # seconds for the requests to tika, and for OCR
+        "TIKA_TIMEOUT": (int, 3000),
+        # let tika use its own OCR settings
+        "TIKA_OCR": (bool, False),
+        "MODEL_SERVER_URL": (str, "https://services.nlmatics.com"),
+        "AWS_REGION": (str, None),
+        "RUN_TABLE_DETECTION": (bool, False),
+        # with ocr_sparse_pages, the pages with fewer lines than this are OCR'd
+        "OCR_SPARSE_PAGE_LINES": (int, 4),
+        # load the models while the daemon starts
+        "WARM_MODELS": (bool, True),
+        # number of entries (and bytes) kept by the memo layers
+        "LINE_CACHE_SIZE": (int, 20000),
+        "SENT_CACHE_SIZE": (int, 20000),
+        "SENT_CACHE_BYTES": (int, 64 * 1024 * 1024),
+        "WORD_FONT_CACHE_SIZE": (int, 10000),
+        "SPELL_CACHE_SIZE": (int, 50000),
+        # distinct lines remembered by clean_lines to drop the repeated ones (page headers, footers ...)
+        "SEEN_LINE_CACHE_SIZE": (int, 100000),
+    }
+    parsers = {bool: to_bool, int: to_int, str: str}
+
+    def __init__(self):
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.reload()
+
+    def parse(self, key, value):
+        value_type = self.fields[key][0]
+        if value is None:
+            return value
+        try:
+            return self.parsers[value_type](value)
+        except ValueError:
+            raise ValueError(f"invalid value {value!r} for {key}, expected {value_type.__name__}")
+
+    def resolve(self):
+        config_file = os.environ.get(config_file_env)
+        file_values = read_config_file(config_file) if config_file else {}
+        values = {}
+        for key, (_, default) in self.fields.items():
+            if key in file_values and not is_config_set(key):
+                value = file_values[key]
+            else:
+                value = get_config(key, default)
+            values[key.lower()] = self.parse(key, value)
+        return values
+
+    def reload(self):
+        """
+        Resolve the settings again and notify the listeners. Nothing is changed if a value is invalid.
+        """
+        with self.lock:
+            self.__dict__.update(self.resolve())
+            listeners = list(self.listeners)
+        for listener in listeners:
+            listener(self)
+
+    def on_reload(self, listener):
+        self.listeners.append(listener)
+
+    def as_dict(self):
+        return {key.lower(): getattr(self, key.lower()) for key in self.fields}
 
 
 def set_config(key, value):
     global __CFG
+    if key in Settings.fields:
+        # raises ValueError before storing an invalid value, which would make every later reload fail
+        settings.parse(key, value)
     __CFG[key] = value
+    if key in Settings.fields:
+        settings.reload()
 
 
 def get_config(key, default=None):
@@ -21,6 +149,11 @@ def get_config(key, default=None):
     return __CFG.get(key) if key in __CFG else os.environ.get(key, default)
 
 
+def is_config_set(key):
+    global __CFG
+    return key in __CFG
+
+
 def get_config_as_list(key, default: Optional[List] = []):
     global __CFG
     return (
@@ -33,12 +166,29 @@ def get_config_as_list(key, default: Optional[List] = []):
 
 
 def get_config_as_int(key, default=None):
+    from nlm_ingestor.ingestor_utils.utils import safe_int
+
     return safe_int(get_config(key, default))
 
 
 def get_config_as_bool(key, default=None):
-    return dutils.strtobool(str(get_config(key, default))) == 1
+    return to_bool(get_config(key, default))
 
 
 def log_level() -> str:
-    return get_config("LOG_LEVEL", os.environ.get("LOG_LEVEL", "INFO")).upper()
+    return settings.log_level.upper()
+
+
+def reload_settings(*_):
+    """
+    Reload the settings, keeping the current ones if the new ones can't be read. Used as the daemon's
+    SIGHUP handler, so it doesn't raise.
+    """
+    logger.info(f"Reloading settings from {os.environ.get(config_file_env) or 'the environment'}")
+    try:
+        settings.reload()
+    except Exception:
+        logger.exception("Settings not reloaded, keeping the current settings")
+
+
+settings = Settings()
@@ -1,17 +1,34 @@
 import os
 
-from nlm_utils.utils import generate_version
-
 from .pdf_ingestor import *
 
-VERSION = generate_version(
-    [
-        os.path.join(os.path.dirname(__file__), "../file_parser/"),
-        os.path.join(os.path.dirname(__file__), "../ingestion_daemon/"),
-        os.path.join(os.path.dirname(__file__), "../ingestor/"),
-        os.path.join(os.path.dirname(__file__), "../ingestor_models/"),
-        os.path.join(os.path.dirname(__file__), "../ingestor_utils/"),
-    ],
-)
+version_paths = [
+    os.path.join(os.path.dirname(__file__), "../file_parser/"),
+    os.path.join(os.path.dirname(__file__), "../ingestion_daemon/"),
+    os.path.join(os.path.dirname(__file__), "../ingestor/"),
+    os.path.join(os.path.dirname(__file__), "../ingestor_models/"),
+    os.path.join(os.path.dirname(__file__), "../ingestor_utils/"),
+]
+_version = None
+
+
+def get_version():
+    """
+    Version of the ingestor code, computed by nlm_utils (which is slow to import) on first use.
+    """
+    global _version
+    if _version is None:
+        from nlm_utils.utils import generate_version
+
+        _version = generate_version(version_paths)
+    return _version
+
+
+def __getattr__(name):
+    # VERSION is computed when it is first accessed rather than when the package is imported
+    if name == "VERSION":
+        return get_version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ("VERSION",)
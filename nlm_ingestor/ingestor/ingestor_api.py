@@ -13,7 +13,6 @@ from nlm_ingestor.file_parser import markdown_parser
 from nlm_ingestor.ingestor_utils.utils import NpEncoder, safe_open, safe_unlink
 from nlm_ingestor.ingestor import html_ingestor, pdf_ingestor, xml_ingestor, text_ingestor
 from nlm_ingestor.file_parser import pdf_file_parser
-from nlm_utils.utils import ensure_bool
 from bs4 import BeautifulSoup
 import numpy as np
 
@@ -27,7 +26,6 @@ if not logger.hasHandlers():
     handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
     logger.addHandler(handler)
 
-run_table_detection: bool = ensure_bool(os.getenv("RUN_TABLE_DETECTION", False))
 title_text_only_pattern = re.compile(r"[^a-zA-Z]+")
 title_delimiter_remove_pattern = re.compile(r"[.;'\"\-,\n\r]")
 
@@ -37,6 +35,12 @@ def ingest_document(
         mime_type,
         parse_options: dict = None,
 ):
+        """
+        Parse the document at doc_location with the ingestor of its mime_type, doc_location is deleted afterwards.
+        With parse_options["stream_blocks"], the result blocks of a text/plain document are a generator
+        which reads and renders the file as it is iterated, see text_ingestor.stream_json_blocks.
+        :return: (return_dict, ingestor)
+        """
         logger.info(f"Parsing {mime_type} at {doc_location} with name {doc_name}")
         ingestor = None
         if mime_type == "application/pdf":
@@ -80,4 +84,9 @@ def ingest_document(
             logger.info(f"File {doc_location} deleted")
         return return_dict, ingestor
 
-    
+
+def __getattr__(name):
+    # read from the settings on each access, so that it follows their reloads
+    if name == "run_table_detection":
+        return cfg.settings.run_table_detection
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,8 +4,7 @@ import math
 import re
 import string
 
-from nltk.corpus import stopwords
-
+from nlm_ingestor.ingestor_utils.model_registry import models
 from nlm_ingestor.ingestor_utils.utils import is_arabic_number, safe_float
 
 from .patterns import abbreviations
@@ -13,16 +12,6 @@ from .patterns import states
 from .patterns import states_abbreviations
 from .styling_utils import mode_of_list
 
-try:
-    stop_words = set(stopwords.words("english"))
-except Exception as e:
-    logging.error(e)
-    import nltk
-
-    stopwords = nltk.download("stopwords")
-    stop_words = set(stopwords.words("english"))
-
-stop_words.add("per")
 continuing_chars = "!\"&'+,./:;<=?@\\]^_`|}~"
 list_chars = [
     "•",
@@ -110,7 +99,7 @@ class Word:
         self.is_date_entry = False
         self.is_negative = False
         self.length = len(self.text)
-        self.is_stop_word = self.text.lower() in stop_words
+        self.is_stop_word = self.text.lower() in models.get("stop_words")
         self.is_number_range = False
         self.parts = []
         text_without_punct = self.text
@@ -593,6 +582,7 @@ class Line:
         if len(noun_chunk_buf) > 0:
             self.noun_chunks.append(" ".join(noun_chunk_buf))
 
+        stop_words = models.get("stop_words")
         self.noun_chunks = sorted(list(set(filter(lambda x: x.lower() not in stop_words, self.noun_chunks))))
         self.first_word = tokens[0]
         self.last_word = tokens[-1]
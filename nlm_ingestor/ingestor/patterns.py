@@ -22,6 +22,11 @@ last_letters = [")", '"', "'", ";", ":", ",", "?", "!", "}", "]", "."]
 address = r"[0-9]{1,5}[A-Za-z\,\s]+[\,\s]+[0-9]{0,5}"
 repetitive_words = r"([a-zA-Z ]+) (\1) (\1)"  #
 space_d_numbers = r"\d[\d+\$\.\%\s]+\,*\d+\%*\,*\.*\s"
+space_d_numbers_regex = re.compile(space_d_numbers)
+digit_group = re.compile(r"(\d)+")
+digits = re.compile(r"\d+")
+whitespace = re.compile(r"\s+")
+spaced_letters = re.compile(r"(\w\s+\w\s+\w)")
 old_section_patterns = [
     re.compile("[0-9]{1,2} [A-Za-z]+", flags=re.IGNORECASE),
     re.compile("[0-9]{1,2} [A-Za-z]+", flags=re.IGNORECASE),
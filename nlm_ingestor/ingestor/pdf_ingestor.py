@@ -7,9 +7,11 @@ from typing import Optional
 
 from bs4 import BeautifulSoup
 
+import nlm_ingestor.ingestion_daemon.config as cfg
 from nlm_ingestor.file_parser import pdf_file_parser
 from timeit import default_timer
 from .visual_ingestor import visual_ingestor
+from nlm_ingestor.ingestor.visual_ingestor.hocr_reader import HocrDocument, read_hocr
 from nlm_ingestor.ingestor.visual_ingestor.new_indent_parser import NewIndentParser
 from nlm_ingestor.ingestor_utils.utils import NpEncoder, \
     detect_block_center_aligned, detect_block_center_of_page
@@ -62,6 +64,7 @@ class PDFIngestor:
 
 def parse_pdf(doc_location, parse_options):
     apply_ocr = parse_options.get("apply_ocr", False) if parse_options else False
+    ocr_sparse_pages = parse_options.get("ocr_sparse_pages", False) if parse_options else False
     if not apply_ocr:
         wall_time = default_timer() * 1000
         logger.info("Parsing PDF")
@@ -69,97 +72,64 @@ def parse_pdf(doc_location, parse_options):
         logger.info(
             f"PDF Parsing finished in {default_timer() * 1000 - wall_time:.4f}ms on workspace",
         )
-        soup = BeautifulSoup(str(parsed_content), "html.parser")
-        pages = soup.find_all("div", class_=lambda x: x not in ['annotation'])
-        p_per_page = []
-        for page in pages:
-            p_per_page.append(len(page.find_all("p")))
-        p_per_page = np.array(p_per_page)
-        sparse_page_count = np.count_nonzero(p_per_page < 4)
-        if apply_ocr:
-            # even if ocr is enabled, we don't want to run it if the document is not sparse
-            needs_ocr = sparse_page_count / len(pages) > 0.3
-            if needs_ocr:
-                logger.info(
-                    f"Running PDF OCR: sparse_page_count: {sparse_page_count}, n_pages: {len(pages)}")
-
+        if ocr_sparse_pages:
+            parsed_content = apply_sparse_page_ocr(doc_location, parsed_content)
     else:
         wall_time = default_timer() * 1000
-        parsed_content = pdf_file_parser.parse_to_html(doc_location, do_ocr=True)
-        parse_and_apply_hocr(parsed_content)
+        parsed_content = read_hocr(pdf_file_parser.parse_to_html(doc_location, do_ocr=True))
         logger.info(
             f"PDF OCR finished in {default_timer() * 1000 - wall_time:.4f}ms on workspace",
         )
     return parsed_content
         
 
-def parse_and_apply_hocr(parsed_content):
-    def get_kv_from_attr(attr_str, sep=" "):
-        #     print(attr_str)
-        kv_string = attr_str.split(";")
-        kvs = {}
-        for kv in kv_string:
-            parts = kv.strip().split(sep)
-            k = parts[0]
-            v = parts[1:]
-            if len(v) == 1:
-                v = v[0].strip()
-            kvs[k] = v
-        return kvs
+def get_sparse_page_idxs(pages, min_lines=None):
+    """
+    Pages with fewer than min_lines p tags (settings.ocr_sparse_page_lines by default), likely scans.
+    """
+    min_lines = cfg.settings.ocr_sparse_page_lines if min_lines is None else min_lines
+    p_per_page = np.array([len(page.find_all("p")) for page in pages])
+    return np.flatnonzero(p_per_page < min_lines).tolist()
+
 
+def apply_sparse_page_ocr(doc_location, parsed_content):
+    """
+    OCR the sparse pages of a PDF parsed from its text layer and replace them by their OCR'd lines.
+    Tika can't OCR a list of pages, so its auto OCR strategy is asked to OCR the pages with fewer
+    characters than the longest sparse page has. Tika may OCR a few more short pages, only the sparse
+    ones are replaced, and the sparse pages it didn't OCR keep their text layer.
+    """
     soup = BeautifulSoup(str(parsed_content), "html.parser")
-    pages = soup.find_all("div", class_='page')
-    for page in pages:
-        page_kv = get_kv_from_attr(page.get('style'), ":")
-        page_height = float(page_kv['height'].replace("px", ""))
-        page_width = float(page_kv['width'].replace("px", ""))
-        ocr_pages = page.find_all('div', class_='ocr_page')
-        if len(ocr_pages) > 0:
-            ocr_page = ocr_pages[0]
-            ocr_page_kv = get_kv_from_attr(ocr_page.get('title'))
-            ocr_page_width = float(ocr_page_kv['bbox'][2])
-            ocr_page_height = float(ocr_page_kv['bbox'][3])
-            x_scale = page_width / ocr_page_width
-            y_scale = page_height / ocr_page_height
-            lines = page.find_all('span', class_='ocr_line')
-            for line in lines:
-                title = line.get('title')
-                p_tag = soup.new_tag("p")
-                line_kv = get_kv_from_attr(title)
-                x0 = float(line_kv['bbox'][0]) * x_scale
-                y0 = float(line_kv['bbox'][1]) * y_scale
-                x1 = float(line_kv['bbox'][0]) * x_scale
-                y1 = float(line_kv['bbox'][1]) * y_scale
-                height = y1 - y0
-                font_size = float(line_kv['x_size']) * y_scale
-                font_size = 12
-                p_tag.string = line.text.strip().replace("\\n*", "")
-                style = f"position: absolute; top:{y0}px; text-indent:{x0}px;"
-                style += f"height: {height};font-size:{font_size}px;"
-                words = line.find_all('span', class_='ocrx_word')
-                word_start_positions = []
-                word_end_positions = []
-                for word in words:
-                    word_kv = get_kv_from_attr(word.get('title'))
-                    word_x0 = float(word_kv['bbox'][0]) * x_scale
-                    word_y0 = float(word_kv['bbox'][1]) * y_scale
-                    word_x1 = float(word_kv['bbox'][0]) * x_scale
-                    word_y1 = float(word_kv['bbox'][1]) * y_scale
-                    word_start_positions.append((word_x0, word_y0))
-                    word_end_positions.append((word_x1, word_y1))
-                style += f"word-start-positions: {word_start_positions}; word-end-positions: {word_end_positions};"
-                default_font_family = "TimesNewRomanPSMT"
-                default_font = f"({default_font_family},normal,normal,{font_size},{font_size},{font_size / 4.0})"
-                word_fonts = ", ".join([default_font for w in word_end_positions])
-                style += f"font-family: {default_font_family};font-style: normal;font-weight: normal;word-fonts: [{word_fonts}]"
-                p_tag.attrs["style"] = style
-                page.append(p_tag)
-            for ocr_block in page.find_all('div', class_='ocr'):
-                ocr_block.decompose()
-    html_str = str(soup.html)
-    html_str = html_str.replace("\\n", "")
-    html_str = html_str.replace("\\t", "")
-    parsed_content['content'] = html_str
+    pages = soup.find_all("div", class_=lambda x: x in ['page'])
+    sparse_page_idxs = get_sparse_page_idxs(pages)
+    if not sparse_page_idxs:
+        return parsed_content
+    wall_time = default_timer() * 1000
+    logger.info(f"Running PDF OCR on {len(sparse_page_idxs)} sparse pages of {len(pages)}")
+    ocr_auto_min_chars = max(len(pages[page_idx].get_text()) for page_idx in sparse_page_idxs) + 1
+    hocr_doc = read_hocr(pdf_file_parser.parse_to_html(
+        doc_location, do_ocr=True, ocr_strategy="auto", ocr_auto_min_chars=ocr_auto_min_chars,
+    ))
+    ocr_pages = hocr_doc.soup.find_all("div", class_=lambda x: x in ['page'])
+    if len(ocr_pages) != len(pages):
+        logger.warning(f"OCR returned {len(ocr_pages)} pages instead of {len(pages)}, keeping the text layer")
+        return parsed_content
+    # the line styles of the OCR'd pages which are not spliced in are dropped, their ids can be reused
+    line_styles = {}
+    replaced_page_idxs = [page_idx for page_idx in sparse_page_idxs if page_idx in hocr_doc.ocr_page_idxs]
+    if len(replaced_page_idxs) < len(sparse_page_idxs):
+        missed_page_idxs = [page_idx for page_idx in sparse_page_idxs if page_idx not in hocr_doc.ocr_page_idxs]
+        logger.warning(f"Sparse pages {missed_page_idxs} were not OCR'd, keeping their text layer")
+    for page_idx in replaced_page_idxs:
+        ocr_page = ocr_pages[page_idx].extract()
+        for p_tag in ocr_page.find_all("p", recursive=False):
+            line_styles[id(p_tag)] = hocr_doc.line_styles[id(p_tag)]
+        pages[page_idx].replace_with(ocr_page)
+    logger.info(
+        f"PDF OCR of {len(replaced_page_idxs)} pages finished in {default_timer() * 1000 - wall_time:.4f}ms on workspace",
+    )
+    return HocrDocument(soup, line_styles, replaced_page_idxs)
+
 
 def parse_blocks(
         tika_html_doc,
@@ -167,7 +137,13 @@ def parse_blocks(
         parse_pages: tuple = (),
         use_new_indent_parser: bool = False,
 ):
-    soup = BeautifulSoup(str(tika_html_doc), "html.parser")
+    line_styles = None
+    if isinstance(tika_html_doc, HocrDocument):
+        # read from the OCR output already, with the styles of its lines
+        soup = tika_html_doc.soup
+        line_styles = tika_html_doc.line_styles
+    else:
+        soup = BeautifulSoup(str(tika_html_doc), "html.parser")
 
     for svg_tag in soup.find_all('svg'):
         svg_tag.decompose()
@@ -184,7 +160,7 @@ def parse_blocks(
     if parse_pages:
         start_page_no, end_page_no = parse_pages
         pages = pages[start_page_no:end_page_no + 1]
-    parsed_doc = visual_ingestor.Doc(pages, ignore_blocks, render_format)
+    parsed_doc = visual_ingestor.Doc(pages, ignore_blocks, render_format, line_styles=line_styles)
     if use_new_indent_parser:
         indent_parser = NewIndentParser(parsed_doc, parsed_doc.blocks)
         indent_parser.indent()
@@ -6,7 +6,9 @@ from collections import defaultdict
 from . import formatter
 from . import line_parser
 from . import patterns
-from nlm_ingestor.ingestor_utils import spell_utils
+from nlm_ingestor.ingestion_daemon.config import settings
+from nlm_ingestor.ingestor_utils.lru_cache import LRUCache
+from nlm_ingestor.ingestor_utils.model_registry import models
 from nlm_ingestor.ingestor_utils.utils import safe_int, sent_tokenize
 
 logger = logging.getLogger(__name__)
@@ -18,7 +20,23 @@ if not logger.hasHandlers():
     handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
     logger.addHandler(handler)
 
-su = spell_utils.SpellUtil()
+# parsed text only Line objects, shared between calls (headers, footers and labels repeat),
+# for up to settings.line_cache_size distinct lines
+_line_cache = LRUCache(max_length=settings.line_cache_size)
+# clean line decisions (spaced character fix + parsed Line) keyed by line text
+_clean_line_cache = LRUCache(max_length=settings.line_cache_size)
+
+
+def resize_line_caches(settings):
+    _line_cache.resize(settings.line_cache_size)
+    _clean_line_cache.resize(settings.line_cache_size)
+
+
+settings.on_reload(resize_line_caches)
+
+# translation tables used while cleaning and tokenizing lines
+clean_line_table = str.maketrans("\n\t", "  ")
+tokenize_table = str.maketrans("-/", "  ", "�\\(*,.?•\\➢ƒ–\\)'\"—")
 
 
 def stem(line):
@@ -28,13 +46,7 @@ def stem(line):
 
 
 def check_parentheses(text):
-    count = 0
-    for i in text:
-        if i == "(":
-            count += 1
-        elif i == ")":
-            count -= 1
-    return count == 0
+    return text.count("(") == text.count(")")
 
 
 def nlm_tokenize(line):
@@ -42,10 +54,7 @@ def nlm_tokenize(line):
     tokens = []
     if not line:
         line = ""
-    line = line.lower()
-    trans_table = line.maketrans("-/", "  ")
-    line = line.translate(trans_table)
-    line = line.translate(str.maketrans("", "", "�\\(*,.?•\\➢ƒ–\\)'\"—"))
+    line = line.lower().translate(tokenize_table)
     # line = patterns.num_unit.sub(r"100 \1", line)
     line = patterns.num_unit.sub(r"", line)
     line = stem(line)
@@ -74,40 +83,77 @@ def find_floating_chars(line):
 
 
 def is_table_row(line):
-    line = line_parser.Line(line)
+    line = get_line(line)
     return line.is_table_row
 
 
+def get_line(line_str):
+    """
+    Memoized line_parser.Line for a text only line (no visual information).
+    The returned Line is shared, callers must not modify it.
+    """
+    line = _line_cache.get(line_str)
+    if line is None:
+        line = line_parser.Line(line_str)
+        _line_cache[line_str] = line
+    return line
+
+
+def get_clean_line(line_str, xml=False):
+    """
+    Parsed Line for a cleaned line, with spaced characters fixed for non xml text.
+    The decision and its result are memoized as the same lines repeat within and across documents.
+    """
+    key = (line_str, xml)
+    curr_line = _clean_line_cache.get(key)
+    if curr_line is not None:
+        return curr_line
+    curr_line = get_line(line_str)
+    # this converst strings like 'e x e c u t i v e summary' to 'executive summary'
+    if not xml and curr_line.has_spaced_characters:
+        curr_line = get_line(fix_spaced_characters(line_str))
+    _clean_line_cache[key] = curr_line
+    return curr_line
+
+
 def should_skip(line, xml=False):
     return len(line) <= 2 if not xml else len(line) == 0
 
 
 def clean_lines(lines, xml=False):
-    result = []
+    return list(iter_clean_lines(lines, xml=xml))
+
+
+def iter_clean_lines(lines, xml=False, seen_line_cache_size=None):
+    """
+    Generator version of clean_lines. Blocks are yielded as soon as the next line
+    decides that they are complete, so lines can be any iterable (e.g. a file being
+    read in chunks) and the joining state is carried across chunk boundaries.
+    A line is dropped when it repeats (digits aside) one of the last seen_line_cache_size
+    (settings.seen_line_cache_size by default) distinct lines, so memory doesn't grow
+    with the length of a streamed document.
+    """
     running_line = ""
     line_buffer = []
     line_type = "para"
     header_block_idx = -1
     block_idx = 0
-    line_set = set()
+    if seen_line_cache_size is None:
+        seen_line_cache_size = settings.seen_line_cache_size
+    seen_lines = LRUCache(max_length=seen_line_cache_size)
     for line_str in lines:
         # print(line_str)
         line_str = clean_line(line_str)
 
         if should_skip(line_str, xml=xml):
             continue
-        line_without_numbers = re.sub(r"\d+", "", line_str)
-        if line_without_numbers in line_set:
+        line_without_numbers = patterns.digits.sub("", line_str)
+        if seen_lines.get(line_without_numbers):
             continue
         else:
-            line_set.add(line_without_numbers)
+            seen_lines[line_without_numbers] = True
 
-        curr_line = line_parser.Line(line_str)
-
-        # this converst strings like 'e x e c u t i v e summary' to 'executive summary'
-        if not xml and curr_line.has_spaced_characters:
-            line_str = fix_spaced_characters(line_str)
-            curr_line = line_parser.Line(line_str)
+        curr_line = get_clean_line(line_str, xml=xml)
 
         if len(line_buffer) > 0:
 
@@ -153,7 +199,7 @@ def clean_lines(lines, xml=False):
                     "level": 0,
                 }
 
-                result.append(block)
+                yield block
 
                 block_idx = block_idx + 1
 
@@ -179,8 +225,7 @@ def clean_lines(lines, xml=False):
         "level": 0,
     }
 
-    result.append(block)
-    return result
+    yield block
 
 
 def line_list_check(prev_line, curr_line, list_char):
@@ -193,7 +238,7 @@ def line_list_check(prev_line, curr_line, list_char):
             # spell check first word
             first_word = prev_line.text.split(" ")[0]
             first_word = first_word.replace("'", "")
-            correct_word = su.segment(first_word)
+            correct_word = models.get("spell_util").segment(first_word)
             if first_word[1:] == correct_word:
                 return True
     # same char is not alpha but not digit
@@ -1222,15 +1267,12 @@ def visual_clean_lines(
 
 
 def clean_line(line):
-    line = line.replace("\n", " ")
-    line = line.replace("\t", " ")
-    line = line.strip()
-    return line
+    return line.translate(clean_line_table).strip()
 
 
 def fix_spaced_characters(line_text):
-    line_text = re.sub(r"\s+", "", line_text)
-    return su.segment(line_text)
+    line_text = patterns.whitespace.sub("", line_text)
+    return models.get("spell_util").segment(line_text)
 
 
 def connect(prev, curr):
@@ -1239,10 +1281,12 @@ def connect(prev, curr):
     return result
 
 
+trailing_number_regex = re.compile(r"\$?(\d*(\d\.?|\.\d{1,2}))$")
+
+
 def get_numbers(line):
     # test = re.compile(r"[0-9]+\.?[0-9]?")
-    regex = re.compile(r"\$?(\d*(\d\.?|\.\d{1,2}))$")
-    return regex.search(line)
+    return trailing_number_regex.search(line)
 
 
 def check_block_join(prev_block, block):
@@ -1252,8 +1296,8 @@ def check_block_join(prev_block, block):
         prev_block["block_type"] == "para" and block["block_type"] == "para"
     )
     if len(prev_text.strip()) and len(curr_text.strip()) and blocks_are_paras:
-        prev_line = line_parser.Line(prev_block["block_text"])
-        curr_line = line_parser.Line(block["block_text"])
+        prev_line = get_line(prev_block["block_text"])
+        curr_line = get_line(block["block_text"])
         if prev_line.incomplete_line or curr_line.continuing_line:
             return True
     return False
@@ -1,5 +1,3 @@
-import re
-
 from . import patterns
 
 
@@ -12,30 +10,32 @@ def space_delimited_numbers_check(line):
     space_del_numbers = False
 
     # finds any space delited numbers
-    line = re.findall(patterns.space_d_numbers, line.replace(",", "").replace("$", ""))
+    line = patterns.space_d_numbers_regex.findall(line.replace(",", "").replace("$", ""))
     for cells in line:
-        if len(re.findall(r"(\d)+", cells)) > 2:
+        if len(patterns.digit_group.findall(cells)) > 2:
             space_del_numbers = True
     # enures that there are at least 3 numbers seperated by a deliter
     return space_del_numbers
 
 
 # general line functions
+incomplete_words = {
+    "&",
+    "of",
+    "the",
+    "this",
+    "a",
+    "an",
+    "to",
+    "with",
+    "or",
+    "by",
+    "these",
+}
+
+
 def incomplete_sentence(line):
     rule1 = False
-    incomplete_words = [
-        "&",
-        "of",
-        "the",
-        "this",
-        "a",
-        "an",
-        "to",
-        "with",
-        "or",
-        "by",
-        "these",
-    ]
     if len(line) > 0:
         rule1 = line.replace(" ", "")[-1] in [",", "-", "/"]
 
@@ -53,7 +53,7 @@ def super_replace(phrase, src=[], trg=""):
 
 # find floating letters
 def fix_spaced_letters(line):
-    if len(re.findall(r"(\w\s+\w\s+\w)", line)):
+    if patterns.spaced_letters.search(line):
         return "".join(line.split(" "))
     else:
         return line
@@ -6,12 +6,8 @@ from statistics import median
 
 from nlm_ingestor.ingestor import formatter
 from nlm_ingestor.ingestor import line_parser
+from nlm_ingestor.ingestor_utils.model_registry import models
 from nlm_ingestor.ingestor_utils.utils import is_arabic_number
-from nlm_ingestor.ingestor_utils.word_splitter import WordSplitter
-
-ws = WordSplitter()
-
-WORDS = set(ws._word2cost.keys())
 
 SPACES = [
     "\t",
@@ -609,7 +605,7 @@ def p_to_lines(p_items: list) -> list:
                         str.maketrans({k: "" for k in SPACES}),
                     )
                     if text_list_str:
-                        text_list = ws.split(text_list_str)
+                        text_list = models.get("word_splitter").split(text_list_str)
                         word_list += text_list
                         new_text_list.append(" ".join(text_list))
                 # if line ends in space, add it back
@@ -4,6 +4,7 @@ from statistics import mode
 
 import nltk
 import numpy as np
+import pandas as pd
 
 from . import processors_utils
 
@@ -181,6 +182,36 @@ def group_tables(table_indexes):
     return tables
 
 
+def build_table(row_texts):
+    """
+    Cells of a table from the text of its rows. When the rows don't all have the same number of cells,
+    rows holding a multiple of the most common number of cells are split into several rows.
+    """
+    table = [list(filter(None, get_row(row_text.rstrip()))) for row_text in row_texts]
+
+    # check if table is uniform
+    if not (len(table) and (len(table[0]))):
+        return table
+    table_cell_counts = [len(row) for row in table]
+    try:
+        cell_count = mode(table_cell_counts)
+    except Exception as e:
+        logging.error(e)
+        cell_count = min(table_cell_counts)
+    # non uniform row
+    if not ((sum(table_cell_counts) % len(table[0])) and (cell_count)):
+        return table
+    new_table = []
+    for row in table:
+        # multiple rows in row
+        if (len(row) > cell_count) and (len(row) % cell_count == 0):
+            for new_row in range(0, len(row), cell_count):
+                new_table.append(row[new_row:new_row + cell_count])
+        else:
+            new_table.append(row)
+    return new_table
+
+
 def format_tables(blocks_df):
     # columns block_text	block_sents	block_type
     # identify all tables in df
@@ -193,70 +224,29 @@ def format_tables(blocks_df):
     # group tables
     tables = group_tables(table_indexes)
 
-    invalid = []
-    idx = []
-    for i in range(len(tables)):
-        if len(tables[i]) < 2:
-            invalid.append(i)
-        else:
-            idx.append(i)
+    invalid = [table for table in tables if len(table) < 2]
+    valid = [table for table in tables if len(table) >= 2]
 
     if len(invalid):
-        blocks_df.loc[
-            np.concatenate(np.array(tables)[np.array(invalid)], axis=0), "block_type",
-        ] = "para"
-    table_rows = blocks_df[blocks_df.block_type == "table_row"]
-    table_list = []
-    # print(table_rows)
-    for table_idx in idx:
-        table_idx = tables[table_idx]
-        # print(table_rows.loc[table_idx].values,"\n")
-        table = []
-        for row_idx, row in table_rows.loc[table_idx].iterrows():
-            table += [list(filter(None, get_row(row["block_text"].rstrip())))]
-
-        # check if table is uniform
-        table_cell_counts = []
-        if len(table) and (len(table[0])):
-            table_cell_counts = [len(row) for row in table]
-            try:
-                cell_count = mode(table_cell_counts)
-            except Exception as e:
-                logging.error(e)
-                cell_count = min(table_cell_counts)
-            # non uniform row
-            if (sum(table_cell_counts) % len(table[0])) and (cell_count):
-                new_table = []
-                for row in table:
-                    # multiple rows in row
-                    if (len(row) > cell_count) and (len(row) % cell_count == 0):
-                        rows = int(len(row) / cell_count)
-                        for new_row in range(rows):
-                            new_row += 1
-                            new_table_row = row[
-                                new_row * cell_count - cell_count : new_row * cell_count
-                            ]
-                            new_table.append(new_table_row)
-                    else:
-                        new_table.append(row)
-                table_list.append(new_table)
-            else:
-                table_list.append(table)
-        else:
-            table_list.append(table)
-    replace = []
+        blocks_df.loc[np.concatenate(invalid), "block_type"] = "para"
     # check for valid tables
-
-    if len(idx):
-        for i in np.array(tables)[np.array(idx)]:
-            replace.append(i)
-        for i in range(len(replace)):
-            blocks_df = blocks_df.drop(replace[i])
-            blocks_df.loc[replace[i][0]] = {
-                "block_type": "table",
-                "block_sents": table_list[i],
-                "block_text": table_list[i],
-            }
-        return blocks_df.sort_index().reset_index(drop=True)
-    else:
+    if not len(valid):
         return blocks_df
+
+    table_row_idxs = np.concatenate(valid)
+    row_texts = blocks_df.loc[table_row_idxs, "block_text"].tolist()
+    table_list = []
+    start = 0
+    for table in valid:
+        table_list.append(build_table(row_texts[start:start + len(table)]))
+        start += len(table)
+
+    # each table replaces its rows, at the place of its first row, with the other columns left empty
+    table_values = {"block_type": ["table"] * len(valid), "block_sents": table_list, "block_text": table_list}
+    tables_df = pd.DataFrame(
+        {column: pd.Series(table_values.get(column, np.nan), index=range(len(valid)), dtype=object)
+         for column in blocks_df.columns},
+    ).infer_objects()
+    tables_df.index = [table[0] for table in valid]
+    blocks_df = pd.concat([blocks_df.drop(table_row_idxs), tables_df])
+    return blocks_df.sort_index().reset_index(drop=True)
@@ -4,6 +4,124 @@ import numpy as np
 import pandas as pd
 
 
+class TableModel:
+    """
+    A resolved table kept as plain lists: the column names, the rows of cell values and the index.
+    The index is either a range (index_levels is empty), one index level or several (MultiIndex),
+    with the labels of each level stored as a list in index_levels.
+    The matching DataFrame is only built when to_dataframe is called.
+    """
+    def __init__(self, columns, rows, index_names=None, index_levels=None, df=None):
+        self.columns = columns
+        self.rows = rows
+        self.index_names = index_names or [None]
+        self.index_levels = index_levels or []
+        self._df = df
+
+    @classmethod
+    def from_rows(cls, column_names, data):
+        """
+        Table of data (lists of cell values) under column_names, like pd.DataFrame(data, columns=column_names)
+        followed by dropping the columns with no value and filling the missing cells of ragged rows with "".
+        """
+        width = max((len(row) for row in data), default=len(column_names))
+        if width != len(column_names):
+            raise ValueError(f"{len(column_names)} columns passed, passed data had {width} columns")
+        if not data:
+            # pandas drops all the columns of an empty table, and leaves it with an (empty) object index
+            return cls([], [], [None], [[]])
+        rows = [row if len(row) == width else row + [""] * (width - len(row)) for row in data]
+        return cls(list(column_names), rows)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        if isinstance(df.index, pd.MultiIndex):
+            index_names = list(df.index.names)
+            index_levels = [df.index.get_level_values(level).tolist() for level in range(df.index.nlevels)]
+        elif isinstance(df.index, pd.RangeIndex):
+            index_names = [df.index.name]
+            index_levels = []
+        else:
+            index_names = [df.index.name]
+            index_levels = [df.index.tolist()]
+        return cls(list(df.columns), df.values.tolist(), index_names, index_levels, df)
+
+    @property
+    def shape(self):
+        return len(self.rows), len(self.columns)
+
+    @property
+    def is_multi_index(self):
+        return len(self.index_levels) > 1
+
+    @property
+    def index_name(self):
+        return None if self.is_multi_index else self.index_names[0]
+
+    def get_column(self, column_idx):
+        return [row[column_idx] for row in self.rows]
+
+    def get_row_index(self, row_idx):
+        """
+        The index label of a row, as df.iterrows gives it.
+        """
+        if not self.index_levels:
+            return row_idx
+        if self.is_multi_index:
+            return tuple(level[row_idx] for level in self.index_levels)
+        return self.index_levels[0][row_idx]
+
+    def set_index(self, index_column, multi_index):
+        """
+        Move the column at index_column (if not None) to the index, under the row groups in multi_index
+        when there is more than one of them. Same as the set_index calls done on the DataFrame.
+        """
+        has_multi_index = len(set(multi_index)) > 1
+        if index_column is None and not has_multi_index:
+            return self
+        index_name = None if index_column is None else self.columns[index_column]
+        if self.columns.count(index_name) > 1 or (has_multi_index and "_MULTI_INDEX_" in self.columns):
+            # ambiguous column names, leave it to pandas
+            df = self.to_dataframe()
+            if has_multi_index:
+                df["_MULTI_INDEX_"] = multi_index
+                if index_column is None:
+                    df = df.set_index("_MULTI_INDEX_")
+                else:
+                    df = df.set_index(["_MULTI_INDEX_", df.columns[index_column]])
+            else:
+                df = df.set_index(df.columns[index_column])
+            return TableModel.from_dataframe(df)
+
+        index_names, index_levels = [], []
+        if has_multi_index:
+            index_names.append("_MULTI_INDEX_")
+            index_levels.append(multi_index)
+            if index_column == -1:
+                # _MULTI_INDEX_ was the last column of the DataFrame by then, so it ends up in the index twice
+                index_names.append("_MULTI_INDEX_")
+                index_levels.append(multi_index)
+                index_column = None
+        columns, rows = self.columns, self.rows
+        if index_column is not None:
+            index_column = index_column % len(columns)
+            index_names.append(index_name)
+            index_levels.append(self.get_column(index_column))
+            columns = columns[:index_column] + columns[index_column + 1:]
+            rows = [row[:index_column] + row[index_column + 1:] for row in rows]
+        return TableModel(columns, rows, index_names, index_levels)
+
+    def to_dataframe(self):
+        if self._df is None:
+            df = pd.DataFrame(self.rows, columns=self.columns)
+            if self.is_multi_index:
+                df.index = pd.MultiIndex.from_arrays(self.index_levels, names=self.index_names)
+            elif self.index_levels:
+                df.index = pd.Index(self.index_levels[0], name=self.index_names[0])
+            self._df = df
+        return self._df
+
+
 class TableParser:
     def __init__(self, infos):
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -28,16 +146,16 @@ class TableParser:
                 self.logger.debug(f"Table ends with match_idx:{idx}")
                 # resolve table
                 try:
-                    df = self.resolve_table_from_infos(table_infos)
-                    if isinstance(df, pd.DataFrame):
+                    table = self.resolve_table_from_infos(table_infos)
+                    if isinstance(table, TableModel):
                         self.logger.info(
-                            f"Found table at match_idx:{idx} of shape {df.shape}",
+                            f"Found table at match_idx:{idx} of shape {table.shape}",
                         )
-                        self.tables[table_start_idx] = df
+                        self.tables[table_start_idx] = table
                         if (
-                            df.shape[1] == 1
-                            and df.columns[0] == "_UNKNOWN_COLUMN_1_"
-                            and df.index.name == "_UNKNOWN_COLUMN_0_"
+                            table.shape[1] == 1
+                            and table.columns[0] == "_UNKNOWN_COLUMN_1_"
+                            and table.index_name == "_UNKNOWN_COLUMN_0_"
                         ):
                             for info_idx in range(len(table_infos)):
                                 self.two_column_table_idx.add(idx - info_idx)
@@ -156,95 +274,60 @@ class TableParser:
                 merged_col_names.append(merged_col_names_at_idx)
             column_names = merged_col_names
         try:
-            # create df
-            # print("creating tables with column names:", column_names)
-            # print("data is:", data)
-            df = pd.DataFrame(data, columns=column_names)
-
-            # drop all None columns
-            df = df.dropna(how="all", axis="columns").fillna("")
+            table = TableModel.from_rows(column_names, data)
         except Exception as e:
-            self.logger.error(f"Failed to create DataFrame. Please check ingestor. {e} \n"
+            self.logger.error(f"Failed to create table. Please check ingestor. {e} \n"
                               f"col names:\n{column_names} \ndata:\n{data[0:3]}")
             return
 
-        index_column = self.resolve_index(df)
+        index_column = self.resolve_index(table)
         self.logger.debug(f"Column with idx:{index_column} is index")
 
-        if len(set(multi_index)) > 1:
-            df["_MULTI_INDEX_"] = multi_index
-            if index_column is None:
-                df = df.set_index("_MULTI_INDEX_")
-            else:
-                df = df.set_index(["_MULTI_INDEX_", df.columns[index_column]])
-        else:
-
-            if index_column is not None:
-                df = df.set_index(df.columns[index_column])
+        return table.set_index(index_column, multi_index)
 
-        # # validate df
-        # if not df.empty:
-        #     # less than 50% of the entries contain data, invalid df
-        #     if (
-        #         df.replace(r"^\s*$", np.nan, regex=True).count().sum()
-        #         < df.shape[0] * df.shape[1] * 0.5
-        #     ):
-        #         self.logger.info("50% entries is empty, skipping current table")
-        #         return
-
-        return df
-
-    def resolve_index(self, df):
+    def resolve_index(self, table):
+        if isinstance(table, pd.DataFrame):
+            table = TableModel.from_dataframe(table)
         # table has only one column, no index needed
-        if len(df.columns) <= 1:
+        if len(table.columns) <= 1:
             return None
 
         unwanted_chars = ["$", "€", ",", "N/A", "%", "(", ")", "/"]
-        shapes = []
+        column_values = []
         for column_idx in [0, -1]:
-            column = df.columns[column_idx]
-            column_value = df.iloc[:, column_idx].copy()
-            for char in unwanted_chars:
-                column_value = column_value.str.replace(char, "", regex=False)
-
+            column_value = []
+            for value in table.get_column(column_idx):
+                if isinstance(value, str):
+                    for char in unwanted_chars:
+                        value = value.replace(char, "")
+                else:
+                    value = None
+                column_value.append(value)
+            column_values.append(column_value)
+        # parse both columns in one go, the same way pd.to_numeric parses a column
+        numbers = pd.to_numeric(np.array(column_values[0] + column_values[1], dtype=object), errors="coerce")
+        n_rows = len(table.rows)
+        shapes = []
+        for column_idx, column_numbers in zip([0, -1], [numbers[:n_rows], numbers[n_rows:]]):
+            column_numbers = column_numbers[~pd.isna(column_numbers)]
             _shape = {
-                "no_column_name": "_UNKNOWN_" in str(column),
-                "number_column": pd.to_numeric(
-                    column_value,
-                    errors="coerce",
-                )
-                .dropna()
-                .shape[0],
-                "is_unique": column_value.unique().shape[0] <= 1,
-                "is_duplicated": column_value.reset_index().duplicated().any(),
+                "no_column_name": "_UNKNOWN_" in str(table.columns[column_idx]),
+                "number_column": len(column_numbers),
             }
             if column_idx == 0 and _shape["number_column"]:
                 # Check whether we are dealing with a year column
-                _shape["is_year_column"] = pd.to_numeric(
-                    column_value,
-                    errors="coerce",
-                ).dropna().between(1900, 2500).all()
+                _shape["is_year_column"] = bool(((column_numbers >= 1900) & (column_numbers <= 2500)).all())
 
             shapes.append(_shape)
 
         first_column_impossible = False
         last_column_impossible = False
 
-        # # column is unique, or duplicated when combine with existing, it must not be index
-        # if shapes[0]["is_unique"] or shapes[0]["is_duplicated"]:
-        #     self.logger.debug(f"First column has duplicates, it can not be an index")
-        #     first_column_impossible = True
-
         # first column is number, it can not be an index only if the column is not an year value
         if shapes[0]["number_column"] and not shapes[0].get("is_year_column", False):
             self.logger.debug("First column is number, it can not be an index")
             first_column_impossible = True
 
-        # # column is unique, or duplicated when combine with existing, it must not be index
-        # if shapes[-1]["is_unique"] or shapes[-1]["is_duplicated"]:
-        #     self.logger.debug(f"Last column has duplicates, it can not be an index")
-        #     last_column_impossible = True
-
         # fist column is possible
         if first_column_impossible is False:
             # first column has no name, and other contain column name
@@ -311,14 +394,16 @@ class TableParser:
                 indexes.append((idx, index))
         return indexes
 
-    def create_es_index(self, df):
+    def create_es_index(self, table):
+        if isinstance(table, pd.DataFrame):
+            table = TableModel.from_dataframe(table)
         es_index = []
         cell_texts = []
         index_name = ""
-        if isinstance(df.index, pd.Index):
-            name = str(df.index.name)
-            if not name.startswith("_UNKNOWN"):
-                index_name = name.strip()
+        name = str(table.index_name)
+        if not name.startswith("_UNKNOWN"):
+            index_name = name.strip()
+        prefix_index_name = not index_name.startswith("(")
 
         def process_index_name(texts):
             index = []
@@ -329,67 +414,60 @@ class TableParser:
             return index
 
         # create es record for rows
-        cols = df.columns
-        if isinstance(df.index, pd.MultiIndex) and all(isinstance(col, tuple) for col in df.columns):
-            df.columns = [' '.join(col).strip() for col in df.columns]
+        cols = table.columns
+        if table.is_multi_index and all(isinstance(col, tuple) for col in cols):
+            cols = [' '.join(col).strip() for col in cols]
+        known_cols = [not col.startswith("_UNKNOWN") for col in cols]
 
-        for idx, (index, row) in enumerate(df.iterrows()):
+        for idx, row in enumerate(table.rows):
+            index = table.get_row_index(idx)
             if not isinstance(index, tuple):
                 index = [index]
-            else:
-                index = index
             # remove inferred keys
             indexes = process_index_name(index)
 
-            table_row = {
+            table_row_index_text = " ".join(indexes)
+            es_index.append({
                 "idx": idx,
                 "index": [{"text": x} for x in indexes],
-                "index_text": " ".join(indexes),
-                "text": " ".join(indexes + row.values.tolist()),
+                "index_text": table_row_index_text,
+                "text": " ".join(indexes + row),
                 "type": "row",
-            }
-            table_row_index_text = table_row["index_text"]
+            })
             # Create the cell level data.
-            for columnIndex, value in row.items():
-                if not columnIndex.startswith("_UNKNOWN"):
-                    if not index_name.startswith("("):
-                        final_text = index_name + " " + table_row_index_text + " " + columnIndex + " " + value
+            for column_name, is_known, value in zip(cols, known_cols, row):
+                if is_known:
+                    if prefix_index_name:
+                        final_text = index_name + " " + table_row_index_text + " " + column_name + " " + value
                     else:
-                        final_text = table_row_index_text + " " + columnIndex + " " + value + " " + index_name
+                        final_text = table_row_index_text + " " + column_name + " " + value + " " + index_name
                 else:
-                    if not index_name.startswith("("):
+                    if prefix_index_name:
                         final_text = index_name + " " + table_row_index_text + " " + value
                     else:
                         final_text = table_row_index_text + " " + value + " " + index_name
                 cell_texts.append(final_text.strip())
 
-            es_index.append(table_row)
-        df.columns = cols
-
         # create es record for columns
-        for idx, (index, column) in enumerate(df.items()):
-            # for column in df.columns:
+        for idx, index in enumerate(table.columns):
             if not isinstance(index, tuple):
                 index = [index]
-            else:
-                index = index
 
             indexes = process_index_name(index)
 
-            table_column = {
+            es_index.append({
                 "idx": idx,
                 "index": [{"text": x} for x in indexes],
                 "index_text": " ".join(indexes),
-                "text": " ".join(indexes + column.values.tolist()),
+                "text": " ".join(indexes + table.get_column(idx)),
                 "type": "col",
-            }
-            es_index.append(table_column)
+            })
 
         # create es record for index
-        if isinstance(df.index, pd.RangeIndex):
+        if not table.index_levels:
             pass
-        elif isinstance(df.index, pd.MultiIndex):
-            for idx, name in enumerate(df.index.names):
+        elif table.is_multi_index:
+            for idx, name in enumerate(table.index_names):
                 name = str(name)
                 if "_UNKNOWN" not in name:
                     table_index = {
@@ -400,8 +478,8 @@ class TableParser:
                         "type": "index",
                     }
                     es_index.append(table_index)
-        elif isinstance(df.index, pd.Index):
-            name = str(df.index.name)
+        else:
+            name = str(table.index_name)
             if not name.startswith("_UNKNOWN"):
                 table_index = {
                     "idx": 0,
@@ -7,24 +7,44 @@ from nlm_ingestor.ingestor.visual_ingestor import block_renderer
 from nlm_ingestor.ingestor_utils.ing_named_tuples import LineStyle
 from . import processors
 
+# number of characters read from the file at a time when streaming
+READ_CHUNK_SIZE = 1 << 20
+
+
 class TextIngestor:
     def __init__(self, doc_location, parse_options):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logger.setLevel(logging.INFO)
         render_format = parse_options.get("render_format", "all") \
             if parse_options else "all"
-       
-        with safe_open(doc_location) as f:
-            raw_lines = f.readlines()
-
-        blocks, _block_texts, _sents, _file_data, result, page_dim, num_pages = parse_blocks(
-            raw_lines=raw_lines
-        )
-        self.blocks = blocks
+        stream_blocks = parse_options.get("stream_blocks", False) \
+            if parse_options else False
         self.line_style_classes = {}
         self.class_levels = {}
         self.add_styles()
 
+        if stream_blocks:
+            # the blocks of json_dict (and of the result) are a generator rendering them as the file is read,
+            # there is no html and no list of blocks
+            self.blocks = None
+            self.html_str = None
+            self.json_dict = {
+                "styles": block_renderer.BlockRenderer(self).get_styles_from_doc(),
+                "blocks": stream_json_blocks(doc_location),
+            }
+            self.return_dict = {
+                "page_dim": [1, 1],
+                "num_pages": 0,
+                "result": self.json_dict,
+            }
+            return
+
+        with safe_open(doc_location) as f:
+            blocks, _block_texts, _sents, _file_data, result, page_dim, num_pages = parse_blocks(
+                raw_lines=read_lines(f)
+            )
+        self.blocks = blocks
+
         return_dict = {
             "page_dim": page_dim,
             "num_pages": num_pages,
@@ -73,14 +93,53 @@ class TextIngestor:
         self.line_style_classes[para_style] = 'nlm-text-body'
         self.class_levels['nlm-text-body'] = 2
 
-def parse_blocks(raw_lines):
+def read_lines(f, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield the lines of an open text file reading at most chunk_size characters at a time.
+    A line cut at a chunk boundary is carried over to the next chunk, so the lines are the
+    same as the ones returned by f.readlines().
+    """
+    remainder = ""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        lines = (remainder + chunk).split("\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    if remainder:
+        yield remainder
 
-    blocks = processors.clean_lines(raw_lines)
-    page_blocks = [blocks]
 
-    blocks = blocks_to_json(page_blocks)
+def iter_blocks(raw_lines):
+    """
+    Clean the lines and convert them to json ready blocks incrementally.
+    Yields the same blocks as parse_blocks without holding the whole document in memory.
+    """
+    return iter_blocks_to_json(processors.iter_clean_lines(raw_lines))
 
-    blocks = [item for sublist in blocks for item in sublist]
+
+def stream_json_blocks(doc_location, chunk_size=READ_CHUNK_SIZE):
+    """
+    Stream the rendered JSON blocks of a (very large) text file.
+    Peak memory depends on the size of the largest block and not on the size of the file.
+    The file is opened right away and closed once the blocks are exhausted, so they can still be
+    read after the file is unlinked (as ingestor_api.ingest_document does) on POSIX systems.
+    """
+    return iter_json_blocks(safe_open(doc_location), chunk_size)
+
+
+def iter_json_blocks(f, chunk_size=READ_CHUNK_SIZE):
+    doc = namedtuple("ObjectName", ["blocks", "line_style_classes", "class_levels"])([], {}, {})
+    br = block_renderer.BlockRenderer(doc)
+    with f:
+        yield from br.iter_render_json(iter_blocks(read_lines(f, chunk_size)))
+
+
+def parse_blocks(raw_lines):
+
+    blocks = list(iter_blocks(raw_lines))
     title = ""
     if len(blocks) > 0:
         title = blocks[0]["block_text"]
@@ -109,34 +168,34 @@ def blocks_to_json(page_blocks):
     results = []
     block_count = 0
     for page_idx, blocks in enumerate(page_blocks):
-        result = []
-        block_start = block_count
-        header_block_idx = -1
-        header_block_text = ""
-        for block_idx_in_page, block in enumerate(blocks):
-            if block["block_text"]:
-                block_sents = utils.sent_tokenize(block["block_text"])
-                # header_block_idx = block["header_block_idx"]
-                if block["block_type"] == "header":
-                    header_block_idx = block["block_idx"]
-                    header_block_text = block["block_text"]
-
-                result.append(
-                    {
-                        "block_text": block["block_text"],
-                        "block_idx": block["block_idx"],
-                        "block_sents": block_sents,
-                        "block_type": block["block_type"],
-                        "header_block_idx": block_start + header_block_idx,
-                        "page_idx": page_idx,
-                        "block_idx_in_page": block_start + block_idx_in_page,
-                        "header_text": header_block_text,
-                        "text_group_start_idx": block["text_group_start_idx"],
-                        "block_list": block["block_list"],
-                        "level":0,
-                        "block_class": block["block_class"] if "block_class" in block else {}
-                    },
-                )
-                block_count += 1
+        result = list(iter_blocks_to_json(blocks, page_idx=page_idx, block_start=block_count))
+        block_count += len(result)
         results.append(result)
     return results
+
+
+def iter_blocks_to_json(blocks, page_idx=0, block_start=0):
+    header_block_idx = -1
+    header_block_text = ""
+    for block_idx_in_page, block in enumerate(blocks):
+        if block["block_text"]:
+            block_sents = utils.sent_tokenize(block["block_text"])
+            # header_block_idx = block["header_block_idx"]
+            if block["block_type"] == "header":
+                header_block_idx = block["block_idx"]
+                header_block_text = block["block_text"]
+
+            yield {
+                "block_text": block["block_text"],
+                "block_idx": block["block_idx"],
+                "block_sents": block_sents,
+                "block_type": block["block_type"],
+                "header_block_idx": block_start + header_block_idx,
+                "page_idx": page_idx,
+                "block_idx_in_page": block_start + block_idx_in_page,
+                "header_text": header_block_text,
+                "text_group_start_idx": block["text_group_start_idx"],
+                "block_list": block["block_list"],
+                "level":0,
+                "block_class": block["block_class"] if "block_class" in block else {}
+            }
@@ -207,31 +207,21 @@ class BlockRenderer:
             })
         return styles
 
-    def render_json(self):
+    def iter_rendered(self):
         """
-        Render the blocks as JSON Dictionary.
-        :return: JSON Dictionary output of the blocks
+        Walk the blocks of the doc the way they are rendered: blocks outside of tables as their dict
+        (render_block_as_dict), each table as a table dict followed by its rows.
+        :return: Generator of (kind, block, item):
+            ("block", block, block_dict) for each rendered block, tables included,
+            ("row", block, table_row) for each row of the table being rendered,
+            ("table_end", block, bbox) when the table being rendered ends.
         """
         is_rendering_table = False
         is_rendering_merged_cells = False
-        prev_page_idx = -1
+        last_block_dict = None
 
-        # Retrieve styles from the doc
-        render_dict = {
-            "styles": self.get_styles_from_doc(),
-            "blocks": [],
-        }
-
-        table_rows = []
-        for idx, block in enumerate(self.doc.blocks):
+        for block in self.doc.blocks:
             block_dict = None
-            page_idx = block['page_idx']
-            if page_idx != prev_page_idx:
-                prev_page_idx = page_idx
-
-            block_type = block["block_type"]
-            block_text = block["block_text"]
-
             if 'is_table_start' in block and block['is_table_start']:
                 top = block["box_style"][0] if "box_style" in block else 0
                 left = block["box_style"][1] if "box_style" in block else 0
@@ -249,42 +239,15 @@ class BlockRenderer:
                 if 'has_merged_cells' in block:
                     is_rendering_merged_cells = True
 
-            elif block_type == "header" and not is_rendering_table:
-                block_dict = {
-                    "tag": block_type,
-                    "page_idx": block["page_idx"],
-                    "block_class": block["block_class"],
-                    "sentences": [block_text],
-                    "bbox": [
-                        block["box_style"][1],
-                        block["box_style"][0],
-                        block["box_style"][1] + block["box_style"][3],
-                        block["box_style"][0] + block["box_style"][4],
-                    ] if "box_style" in block else []                 
-                }
-            elif block_type == "list_item" and not is_rendering_table:
-                block_dict = self.render_nested_block_as_dict(block, "list_item")
-            elif (block_type == "para" or block_type == "numbered_list_item") and not is_rendering_table:
-                block_dict = self.render_nested_block_as_dict(block, "para")
-            elif 'is_table_start' not in block and not is_rendering_table and block_type == "table_row":
-                block_dict = {
-                    "tag": "para",
-                    "page_idx": block["page_idx"],
-                    "block_class": block["block_class"],
-                    "sentences": [block_text],
-                    "bbox": [
-                        block["box_style"][1],
-                        block["box_style"][0],
-                        block["box_style"][1] + block["box_style"][3],
-                        block["box_style"][0] + block["box_style"][4],
-                    ] if "box_style" in block else []                 
-                }
+            elif not is_rendering_table:
+                block_dict = self.render_block_as_dict(block)
 
             if block_dict:
                 block_dict["block_idx"] = block["block_idx"]
                 if "level" in block:
                     block_dict["level"] = block["level"]
-                render_dict["blocks"].append(block_dict)
+                last_block_dict = block_dict
+                yield "block", block, block_dict
 
             if is_rendering_table:
                 if "cell_values" not in block:
@@ -337,22 +300,167 @@ class BlockRenderer:
                     }
                 if tab_row:
                     tab_row["block_idx"] = block["block_idx"]
-                    table_rows.append(tab_row)
+                    yield "row", block, tab_row
 
-            if 'is_table_end' in block and is_rendering_table and len(render_dict["blocks"]) > 0 and render_dict["blocks"][-1]["tag"] == "table":
+            if 'is_table_end' in block and is_rendering_table and last_block_dict is not None and last_block_dict["tag"] == "table":
                 is_rendering_table = False
-                table_block = render_dict["blocks"][-1] 
+                bbox = [
+                        last_block_dict["left"],
+                        last_block_dict["top"],
+                        last_block_dict["left"] + block["box_style"][3],
+                        last_block_dict["top"] + block["box_style"][4],
+                    ] if "box_style" in block else []
+                yield "table_end", block, bbox
+
+    def render_json(self):
+        """
+        Render the blocks as JSON Dictionary.
+        :return: JSON Dictionary output of the blocks
+        """
+        # Retrieve styles from the doc
+        render_dict = {
+            "styles": self.get_styles_from_doc(),
+            "blocks": [],
+        }
+
+        table_rows = []
+        for kind, block, item in self.iter_rendered():
+            if kind == "block":
+                render_dict["blocks"].append(item)
+            elif kind == "row":
+                table_rows.append(item)
+            else:
+                table_block = render_dict["blocks"][-1]
                 table_block["table_rows"] = table_rows
-                table_block["bbox"] = [
-                        table_block["left"],
-                        table_block["top"],
-                        table_block["left"] + block["box_style"][3],
-                        table_block["top"] + block["box_style"][4],
-                    ]  if "box_style" in block else []                 
+                table_block["bbox"] = item
                 table_rows = []
 
         return render_dict
 
+    def render_columns(self):
+        """
+        Render the blocks as two column oriented tables, with the block dicts and table rows of render_json.
+        :return: (block_columns, cell_columns), dicts of column name to list of values.
+            block_columns: block_idx, page_idx, tag, level, bbox, text, sentences (one row per rendered block).
+            cell_columns: table_idx (block_idx of the table), row, col (first grid column of the cell),
+            col_span, row_type, value (one row per table cell).
+        """
+        block_columns = {
+            "block_idx": [],
+            "page_idx": [],
+            "tag": [],
+            "level": [],
+            "bbox": [],
+            "text": [],
+            "sentences": [],
+        }
+        cell_columns = {
+            "table_idx": [],
+            "row": [],
+            "col": [],
+            "col_span": [],
+            "row_type": [],
+            "value": [],
+        }
+
+        table_idx = -1
+        table_row_idx = 0
+        for kind, block, item in self.iter_rendered():
+            if kind == "block":
+                is_table = item["tag"] == "table"
+                block_columns["block_idx"].append(item["block_idx"])
+                block_columns["page_idx"].append(item["page_idx"])
+                block_columns["tag"].append(item["tag"])
+                block_columns["level"].append(item.get("level", None))
+                block_columns["bbox"].append([] if is_table else item["bbox"])
+                block_columns["text"].append(item["name"] if is_table else block["block_text"])
+                block_columns["sentences"].append([] if is_table else item["sentences"])
+                if is_table:
+                    table_idx = item["block_idx"]
+                    table_row_idx = 0
+            elif kind == "row":
+                if "cells" in item:
+                    cells = item["cells"]
+                else:
+                    cells = [{"col_span": item["col_span"], "cell_value": item["cell_value"]}]
+                # grid column of the cell, cells spanning several columns shift the ones after them
+                col = 0
+                for cell in cells:
+                    value = cell["cell_value"]
+                    if isinstance(value, dict):
+                        # merged cell rendered as a nested para
+                        value = " ".join(value.get("sentences", []))
+                    col_span = cell.get("col_span", 1)
+                    cell_columns["table_idx"].append(table_idx)
+                    cell_columns["row"].append(table_row_idx)
+                    cell_columns["col"].append(col)
+                    cell_columns["col_span"].append(col_span)
+                    cell_columns["row_type"].append(item["type"])
+                    cell_columns["value"].append(value)
+                    col += col_span
+                table_row_idx += 1
+            else:
+                block_columns["bbox"][-1] = item
+
+        return block_columns, cell_columns
+
+    def iter_render_json(self, blocks):
+        """
+        Render a stream of blocks as JSON dictionaries, one at a time.
+        Only meant for block streams without tables (e.g. plain text), where each
+        block can be rendered without looking at its neighbours.
+        :param blocks: Iterable of blocks
+        :return: Generator of the rendered block dictionaries
+        """
+        for block in blocks:
+            block_dict = self.render_block_as_dict(block)
+            if block_dict:
+                block_dict["block_idx"] = block["block_idx"]
+                if "level" in block:
+                    block_dict["level"] = block["level"]
+                yield block_dict
+
+    def render_block_as_dict(self, block):
+        """
+        Convert a block outside of a table to the dict representation.
+        :param block: Block element
+        :return: Dictionary for the block or None if the block is not rendered
+        """
+        block_dict = None
+        block_type = block["block_type"]
+        block_text = block["block_text"]
+        if block_type == "header":
+            block_dict = {
+                "tag": block_type,
+                "page_idx": block["page_idx"],
+                "block_class": block["block_class"],
+                "sentences": [block_text],
+                "bbox": [
+                    block["box_style"][1],
+                    block["box_style"][0],
+                    block["box_style"][1] + block["box_style"][3],
+                    block["box_style"][0] + block["box_style"][4],
+                ] if "box_style" in block else []
+            }
+        elif block_type == "list_item":
+            block_dict = self.render_nested_block_as_dict(block, "list_item")
+        elif block_type == "para" or block_type == "numbered_list_item":
+            block_dict = self.render_nested_block_as_dict(block, "para")
+        elif 'is_table_start' not in block and block_type == "table_row":
+            block_dict = {
+                "tag": "para",
+                "page_idx": block["page_idx"],
+                "block_class": block["block_class"],
+                "sentences": [block_text],
+                "bbox": [
+                    block["box_style"][1],
+                    block["box_style"][0],
+                    block["box_style"][1] + block["box_style"][3],
+                    block["box_style"][0] + block["box_style"][4],
+                ] if "box_style" in block else []
+            }
+        return block_dict
+
     def render_nested_block_as_dict(self, block, tag):
         """
         Convert the block object to the dict representation.
@@ -0,0 +1,50 @@
+from nlm_ingestor.ingestor.visual_ingestor.block_renderer import BlockRenderer
+
+
+def get_schemas():
+    import pyarrow as pa
+
+    block_schema = pa.schema([
+        ("block_idx", pa.int32()),
+        ("page_idx", pa.int32()),
+        ("tag", pa.string()),
+        ("level", pa.int32()),
+        ("bbox", pa.list_(pa.float64())),
+        ("text", pa.string()),
+        ("sentences", pa.list_(pa.string())),
+    ])
+    cell_schema = pa.schema([
+        ("table_idx", pa.int32()),
+        ("row", pa.int32()),
+        ("col", pa.int32()),
+        ("col_span", pa.int32()),
+        ("row_type", pa.string()),
+        ("value", pa.string()),
+    ])
+    return block_schema, cell_schema
+
+
+def to_arrow(doc):
+    """
+    Arrow tables of the blocks and of the table cells of a doc, built from doc.blocks
+    by BlockRenderer.render_columns. Needs pyarrow (pip install nlm-ingestor[arrow]), which is only imported here.
+    :return: (blocks_table, cells_table), cells_table.table_idx is the block_idx of the table in blocks_table
+    """
+    import pyarrow as pa
+
+    block_schema, cell_schema = get_schemas()
+    block_columns, cell_columns = BlockRenderer(doc).render_columns()
+    blocks_table = pa.Table.from_pydict(block_columns, schema=block_schema)
+    cells_table = pa.Table.from_pydict(cell_columns, schema=cell_schema)
+    return blocks_table, cells_table
+
+
+def write_parquet(doc, blocks_path, cells_path):
+    """
+    Write the blocks and the table cells of a doc to two parquet files.
+    """
+    import pyarrow.parquet as pq
+
+    blocks_table, cells_table = to_arrow(doc)
+    pq.write_table(blocks_table, blocks_path)
+    pq.write_table(cells_table, cells_path)
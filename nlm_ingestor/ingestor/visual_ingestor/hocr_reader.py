@@ -0,0 +1,119 @@
+from bs4 import BeautifulSoup
+
+from nlm_ingestor.ingestor.visual_ingestor import style_utils
+from nlm_ingestor.ingestor_utils.ing_named_tuples import BoxStyle, LineStyle
+
+# tesseract doesn't report fonts, all the OCR'd lines get this one
+default_font_family = "TimesNewRomanPSMT"
+default_font_size = 12
+
+
+class HocrDocument:
+    """
+    Tika output for an OCR'd PDF, read once. soup has one p tag per hOCR line in each page div, with
+    the same style strings as the p tags of tika's text layer, and line_styles maps id(p) to the
+    (box_style, line_style, word_line_styles) of that p tag, so that Doc doesn't decode its style.
+    ocr_page_idxs are the indexes of the pages which had hOCR.
+    """
+    def __init__(self, soup, line_styles, ocr_page_idxs=()):
+        self.soup = soup
+        self.line_styles = line_styles
+        self.ocr_page_idxs = ocr_page_idxs
+
+
+def get_kv_from_attr(attr_str, sep=" "):
+    kvs = {}
+    for kv in attr_str.split(";"):
+        parts = kv.strip().split(sep)
+        v = parts[1:]
+        if len(v) == 1:
+            v = v[0].strip()
+        kvs[parts[0]] = v
+    return kvs
+
+
+def get_line_style_str(x0, y0, word_positions):
+    """
+    Style of the p tag for an OCR'd line, in tika's format.
+    Only the start of each word is known, so it is used as the end too.
+    """
+    font_size = default_font_size
+    style = f"position: absolute; top:{y0}px; text-indent:{x0}px;"
+    style += f"height: 0.0;font-size:{font_size}px;"
+    style += f"word-start-positions: {word_positions}; word-end-positions: {word_positions};"
+    default_font = f"({default_font_family},normal,normal,{font_size},{font_size},{font_size / 4.0})"
+    word_fonts = ", ".join([default_font for _ in word_positions])
+    style += f"font-family: {default_font_family};font-style: normal;font-weight: normal;word-fonts: [{word_fonts}]"
+    return style
+
+
+def get_line_styles(y0, word_positions, text):
+    """
+    What style_utils.parse_tika_style returns for the style from get_line_style_str.
+    """
+    font_space_width = round(default_font_size / 4.0, 2)
+    line_style = LineStyle(
+        default_font_family,
+        "normal",
+        round(style_utils.font_scale * default_font_size, 1),
+        style_utils.get_numeric_font_weight(default_font_family, "normal"),
+        "none",
+        font_space_width,
+        "left",
+    )
+    left = round(word_positions[0][0], 2)
+    right = round(word_positions[-1][0], 2)
+    if right < left:
+        # words out of order, extend the line past its last word when the words are on the same line
+        word_tops = [round(y, 2) for _, y in word_positions]
+        if all(abs(top - next_top) <= 2 for top, next_top in zip(word_tops, word_tops[1:])):
+            right = right + len(text.split()[-1].strip()) * font_space_width
+    box_style = BoxStyle(round(y0, 2), left, right, right - left, float(default_font_size))
+    return box_style, line_style, [line_style] * len(word_positions)
+
+
+def iter_spans(tag, class_name):
+    # the same as tag.find_all("span", class_=class_name), without going through bs4's filters
+    for element in tag.descendants:
+        if element.name == "span" and class_name in element.get("class", ()):
+            yield element
+
+
+def read_hocr(parsed_content):
+    """
+    Replace the hOCR of each page of tika's output by p tags for its lines, scaled to the page size.
+    """
+    soup = BeautifulSoup(parsed_content.get("content") or "", "html.parser")
+    line_styles = {}
+    ocr_page_idxs = []
+    for page_idx, page in enumerate(soup.find_all("div", class_="page")):
+        ocr_page = page.find("div", class_="ocr_page")
+        if ocr_page is None:
+            continue
+        ocr_page_idxs.append(page_idx)
+        # the OCR'd lines replace the text layer of the page, when tika extracted it too
+        for p_tag in page.find_all("p", recursive=False):
+            p_tag.decompose()
+        page_kv = get_kv_from_attr(page.get("style"), ":")
+        ocr_page_kv = get_kv_from_attr(ocr_page.get("title"))
+        x_scale = float(page_kv["width"].replace("px", "")) / float(ocr_page_kv["bbox"][2])
+        y_scale = float(page_kv["height"].replace("px", "")) / float(ocr_page_kv["bbox"][3])
+        for line in list(iter_spans(page, "ocr_line")):
+            word_positions = []
+            for word in iter_spans(line, "ocrx_word"):
+                word_bbox = get_kv_from_attr(word.get("title"))["bbox"]
+                word_positions.append((float(word_bbox[0]) * x_scale, float(word_bbox[1]) * y_scale))
+            text = " ".join(line.text.split())
+            if not word_positions or not text:
+                continue
+            line_bbox = get_kv_from_attr(line.get("title"))["bbox"]
+            x0 = float(line_bbox[0]) * x_scale
+            y0 = float(line_bbox[1]) * y_scale
+            p_tag = soup.new_tag("p")
+            p_tag.string = text
+            p_tag["style"] = get_line_style_str(x0, y0, word_positions)
+            page.append(p_tag)
+            line_styles[id(p_tag)] = get_line_styles(y0, word_positions, text)
+        for ocr_block in page.find_all("div", class_="ocr"):
+            ocr_block.decompose()
+    return HocrDocument(soup, line_styles, ocr_page_idxs)
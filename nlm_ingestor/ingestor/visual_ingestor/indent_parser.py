@@ -1,7 +1,6 @@
 from nlm_ingestor.ingestor.visual_ingestor import table_parser
 from nlm_ingestor.ingestor_utils.utils import detect_block_center_aligned, safe_int
 from nlm_ingestor.ingestor import line_parser
-import copy
 import operator
 
 LEVEL_DEBUG = False
@@ -371,7 +370,7 @@ class IndentParser:
                     indent_reason = "table - matching previous level"
                     return level, new_stack, indent_reason
                 else:
-                    new_stack = copy.deepcopy(level_stack)
+                    new_stack = list(level_stack)
                     new_line_style = self.doc.class_line_styles[new_class["name"]]
                     all_caps = prev_block["block_text"].isupper() and not block['block_text'].isupper()
                     if prev_block["block_type"] == block["block_type"] == "header" and \
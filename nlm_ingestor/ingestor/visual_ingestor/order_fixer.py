@@ -1,3 +1,4 @@
+from bisect import bisect_right
 from functools import cmp_to_key
 from nlm_ingestor.ingestor_utils.utils import safe_float, safe_int
 import numpy as np
@@ -6,6 +7,54 @@ REORDER_DEBUG = False
 TOP_THRESHOLD = 15
 
 
+class BlockColumn:
+    """
+    A list of blocks kept together with numpy columns of their first line's top and left
+    and their last line's bottom, so that out of order blocks can be placed without walking the list.
+    """
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.extents = np.empty((2 * len(blocks) + 16, 3), dtype=float)
+        for idx, blk in enumerate(blocks):
+            self.extents[idx] = BlockColumn.block_extent(blk)
+
+    @staticmethod
+    def block_extent(blk):
+        first_box = blk["visual_lines"][0]["box_style"]
+        last_box = blk["visual_lines"][-1]["box_style"]
+        return first_box[0], first_box[1], last_box[0] + last_box[4]
+
+    @property
+    def tops(self):
+        return self.extents[:len(self.blocks), 0]
+
+    @property
+    def lefts(self):
+        return self.extents[:len(self.blocks), 1]
+
+    @property
+    def bottoms(self):
+        return self.extents[:len(self.blocks), 2]
+
+    def insert(self, idx, blk):
+        n_blocks = len(self.blocks)
+        if n_blocks == len(self.extents):
+            self.extents = np.concatenate([self.extents, np.empty_like(self.extents)])
+        self.extents[idx + 1:n_blocks + 1] = self.extents[idx:n_blocks]
+        self.extents[idx] = BlockColumn.block_extent(blk)
+        self.blocks.insert(idx, blk)
+
+    def append(self, blk):
+        self.insert(len(self.blocks), blk)
+
+
+def have_range_overlap(start_1, end_1, start_2, end_2):
+    """
+    Whether the integer ranges [start_1, end_1] and [start_2, end_2] share a point.
+    """
+    return max(start_1, start_2) <= min(end_1, end_2)
+
+
 class OrderFixer:
     def __init__(self, doc, page_blocks, offset):
         self.doc = doc
@@ -73,7 +122,7 @@ class OrderFixer:
                 right = max(blk['visual_lines'][-1]['box_style'][2], right)
             return (left, top, right, bottom), non_table_row_blocks
 
-        def check_within_cb_bounds(blk, cb_bound, top_sorted_blocks):
+        def check_within_cb_bounds(blk, cb_bound, top_sorted_tops):
             """
             Check whether the blk is within in the bounds as dictated by cb_bound.
             """
@@ -82,11 +131,9 @@ class OrderFixer:
             left, top, right, bottom = cb_bound
             nearest_top = 0
             # Get the previous block's y-coord
-            for s_blk in top_sorted_blocks:
-                if s_blk['visual_lines'][0]['box_style'][0] <= b_top:
-                    nearest_top = s_blk['visual_lines'][0]['box_style'][0]
-                else:
-                    break
+            top_idx = bisect_right(top_sorted_tops, b_top)
+            if top_idx > 0:
+                nearest_top = top_sorted_tops[top_idx - 1]
             if nearest_top:
                 if (b_top - nearest_top) > 35:  # If we are too far off from the last point
                     return False
@@ -109,6 +156,7 @@ class OrderFixer:
                     )
         first_column = contiguous_blocks[0]
         bounds, non_table_row_blocks = calc_c_blok_bound(first_column)
+        non_table_row_tops = [blk['visual_lines'][0]['box_style'][0] for blk in non_table_row_blocks]
         cnt_table_rows = sum(map(lambda blk: blk["block_type"] == "table_row", first_column["blocks"]))
         cnt_table_row_vls = sum(map(lambda blk: len(blk["visual_lines"]) if blk["block_type"] == "table_row" else 0,
                                     first_column["blocks"]))
@@ -119,7 +167,7 @@ class OrderFixer:
                 if block["block_type"] == "table_row" and \
                         (cnt_table_row_vls / first_column_vls) < .40 and \
                         (cnt_table_rows / len(first_column["blocks"])) < 0.40 and \
-                        not check_within_cb_bounds(block, bounds, non_table_row_blocks):
+                        not check_within_cb_bounds(block, bounds, non_table_row_tops):
                     if REORDER_DEBUG:
                         print("splitting spanning block:", block["block_text"])
                         print("splitting spanning BOUNDS:", bounds)
@@ -258,6 +306,10 @@ class OrderFixer:
             print(f"==== end {description} ===\n")
 
     def insert_out_of_order_block(self, oob, main_block):
+        """
+        Place oob into main_block (a BlockColumn) before the first block whose top crosses oob's top,
+        or before the first block above oob that lies to its right and ends below it.
+        """
         if len(oob["visual_lines"]) == 1 and self.doc.is_list_item(
                 oob["visual_lines"][0],
         ):
@@ -269,60 +321,52 @@ class OrderFixer:
         ob_top = oob["visual_lines"][0]["box_style"][0]
         ob_left = oob["visual_lines"][0]["box_style"][1]
         ob_right = oob["visual_lines"][0]["box_style"][2]
-        prev_top = main_block[0]["visual_lines"][0]["box_style"][0]
-        location_found = False
-        for idx, gb in enumerate(main_block):
-            gb_top = gb["visual_lines"][0]["box_style"][0]
-            gb_left = gb["visual_lines"][0]["box_style"][1]
-            cond = (gb_top >= ob_top) if idx == 0 else (gb_top >= ob_top > prev_top)
-            if cond:
-                #  Do we need to determine block type again.
-                # oob["block_type"] = self.doc.determine_block_type(oob)
-                if REORDER_DEBUG:
-                    print(
-                        "found location before --",
-                        main_block[idx]["block_text"][0:120],
-                    )
-                if gb_top == ob_top or abs(gb_top - ob_top) < 0.1:
-                    # If we are of the same top, look left-wise to pick the right spot.
-                    for insert_idx, insert_gb in enumerate(main_block[idx:]):
-                        insert_top = insert_gb["visual_lines"][0]["box_style"][0]
-                        insert_left = insert_gb["visual_lines"][0]["box_style"][1]
-                        if abs(insert_top - ob_top) < 0.1 and insert_left < ob_left:
-                            continue
-                        else:
-                            main_block.insert(idx + insert_idx, oob)
-                            location_found = True
-                            break
-                else:
-                    # If there is a match of bottom,
-                    # check whether the current left is greater than the previous right.
-                    if (oob["box_style"][0] + oob["box_style"][4]) == (
-                            main_block[idx]["box_style"][0] + main_block[idx]["box_style"][4]
-                    ) and oob["box_style"][1] > main_block[idx]["box_style"][2]:
-                        main_block.insert(idx + 1, oob)
-                    else:
-                        main_block.insert(idx, oob)
-                    location_found = True
-                    break
-            elif gb_top < ob_top and \
-                    gb_left > ob_right and \
-                    ((oob["visual_lines"][-1]["box_style"][0] + oob["visual_lines"][-1]["box_style"][4]) <=
-                     (gb["visual_lines"][-1]["box_style"][0] + gb["visual_lines"][-1]["box_style"][4])):
+        ob_bottom = oob["visual_lines"][-1]["box_style"][0] + oob["visual_lines"][-1]["box_style"][4]
+        blocks = main_block.blocks
+        tops = main_block.tops
+        # the first block only has to start at or below oob, the others have to follow one that starts above it
+        crosses_top = tops >= ob_top
+        crosses_top[1:] &= tops[:-1] < ob_top
+        is_right_of_oob = (tops < ob_top) & (main_block.lefts > ob_right) & (main_block.bottoms >= ob_bottom)
+        for idx in np.flatnonzero(crosses_top | is_right_of_oob):
+            idx = int(idx)
+            if is_right_of_oob[idx]:
                 main_block.insert(idx, oob)
-                location_found = True
-            if location_found:
-                break
-            prev_top = gb_top
-        if not location_found:
-            if main_block[0]["visual_lines"][0]["page_idx"] == oob["visual_lines"][0]["page_idx"]:
-                if REORDER_DEBUG:
-                    print("appending oob to end --")
-                main_block.append(oob)
+                return False
+            #  Do we need to determine block type again.
+            # oob["block_type"] = self.doc.determine_block_type(oob)
+            if REORDER_DEBUG:
+                print(
+                    "found location before --",
+                    blocks[idx]["block_text"][0:120],
+                )
+            gb_top = tops[idx]
+            if gb_top == ob_top or abs(gb_top - ob_top) < 0.1:
+                # If we are of the same top, look left-wise to pick the right spot.
+                for insert_idx in range(idx, len(blocks)):
+                    if abs(tops[insert_idx] - ob_top) < 0.1 and main_block.lefts[insert_idx] < ob_left:
+                        continue
+                    else:
+                        main_block.insert(insert_idx, oob)
+                        return False
             else:
-                if REORDER_DEBUG:
-                    print("appending oob to start --")
-                main_block.insert(0, oob)
+                # If there is a match of bottom,
+                # check whether the current left is greater than the previous right.
+                if (oob["box_style"][0] + oob["box_style"][4]) == (
+                        blocks[idx]["box_style"][0] + blocks[idx]["box_style"][4]
+                ) and oob["box_style"][1] > blocks[idx]["box_style"][2]:
+                    main_block.insert(idx + 1, oob)
+                else:
+                    main_block.insert(idx, oob)
+                return False
+        if blocks[0]["visual_lines"][0]["page_idx"] == oob["visual_lines"][0]["page_idx"]:
+            if REORDER_DEBUG:
+                print("appending oob to end --")
+            main_block.append(oob)
+        else:
+            if REORDER_DEBUG:
+                print("appending oob to start --")
+            main_block.insert(0, oob)
         return False
 
     def reorder_two_column_layout(self):
@@ -334,6 +378,7 @@ class OrderFixer:
             print("==== end original ===")
         main_block_idx = np.argmax(self.ratios)
         main_blocks = self.contiguous_blocks[main_block_idx]
+        main_block_column = BlockColumn(main_blocks)
         reordered_blocks = []
         for idx, cb in enumerate(self.contiguous_blocks):
             if REORDER_DEBUG:
@@ -347,7 +392,7 @@ class OrderFixer:
                         print("---", b["block_text"][0:120], b["block_type"])
                     print("==== end out of order ===")
                 for oob in oo_blocks:
-                    is_skipped = self.insert_out_of_order_block(oob, main_blocks)
+                    is_skipped = self.insert_out_of_order_block(oob, main_block_column)
                     if is_skipped:
                         skipped_blocks = skipped_blocks + 1
             reordered_blocks = main_blocks
@@ -396,13 +441,14 @@ class OrderFixer:
 
         # main_blocks = contiguous_blocks[main_block_idx]
         # skipped_blocks = 0
+        main_block_idx_set = set(main_block_idxs)
         for idx, cb in enumerate(contiguous_blocks):
             if REORDER_DEBUG:
                 print(
                     f"contiguous block {len(cb)}",
                     cb["blocks"][0]["block_text"][0:120],
                 )
-            if idx not in main_block_idxs:
+            if idx not in main_block_idx_set:
                 oo_blocks = cb["blocks"]
                 new_cb_blocks = []
                 if REORDER_DEBUG:
@@ -412,12 +458,12 @@ class OrderFixer:
                     print("==== end out of order ===")
                 for oob in oo_blocks:
                     spot_found = False
+                    ob_box = oob["visual_lines"][0]["box_style"]
                     for main_block_idx, cb_idx in enumerate(main_block_idxs):
                         mb = contiguous_blocks[cb_idx]
                         mb_left, mb_top, mb_right, mb_bottom = main_block_bounds[
                             main_block_idx
                         ]
-                        ob_box = oob["visual_lines"][0]["box_style"]
                         ob_in_mb = (mb_left <= ob_box[1] <= mb_right) and (
                             mb_top <= ob_box[0] <= mb_bottom
                         )
@@ -446,9 +492,10 @@ class OrderFixer:
             top_diff = cb_1_box[0] - cb_2_box[0]
             left_diff = cb_1_box[1] - cb_2_box[1]
             if self.doc.have_y_overlap(cb_1["blocks"][0], cb_2["blocks"][0]) or \
-                    list(range(max(safe_int(cb_1_blk_box[0]), safe_int(cb_2_blk_box[0])),
-                               min(int(safe_float(cb_1_blk_box[0]) + safe_float(cb_1_blk_box[4])),
-                                   int(safe_float(cb_2_blk_box[0]) + safe_float(cb_2_blk_box[4])))+1)):
+                    have_range_overlap(safe_int(cb_1_blk_box[0]),
+                                       int(safe_float(cb_1_blk_box[0]) + safe_float(cb_1_blk_box[4])),
+                                       safe_int(cb_2_blk_box[0]),
+                                       int(safe_float(cb_2_blk_box[0]) + safe_float(cb_2_blk_box[4]))):
                 return left_diff
             else:
                 return top_diff
@@ -466,7 +513,7 @@ class OrderFixer:
         # combine all the blocks, sort each continuous block again by top
         for cb in contiguous_blocks:
             merged_blocks = self.get_cb_blocks(cb)
-            reordered_blocks = reordered_blocks + merged_blocks
+            reordered_blocks.extend(merged_blocks)
         if REORDER_DEBUG:
             self.print_blocks(reordered_blocks, "multi-col reordered")
         return reordered_blocks, 0
@@ -511,9 +558,10 @@ class OrderFixer:
                 top_diff = cb_1_box[0] - cb_2_box[0]
                 left_diff = cb_1_box[1] - cb_2_box[1]
                 # Check whether we have an intersection of y coordinate
-                if list(range(max(safe_int(cb_1_box[0]), safe_int(cb_2_box[0])),
-                              min(int(safe_float(cb_1_last_box[0]) + safe_float(cb_1_last_box[4])),
-                                  int(safe_float(cb_2_last_box[0]) + safe_float(cb_2_last_box[4])))+1)):
+                if have_range_overlap(safe_int(cb_1_box[0]),
+                                      int(safe_float(cb_1_last_box[0]) + safe_float(cb_1_last_box[4])),
+                                      safe_int(cb_2_box[0]),
+                                      int(safe_float(cb_2_last_box[0]) + safe_float(cb_2_last_box[4]))):
                     return left_diff
                 else:
                     return top_diff
@@ -602,18 +650,21 @@ class OrderFixer:
                 # contiguous_blocks.append(block_buf)
                 # block_buf = [b]
                 add_to_temp = False
-                for b_idx, b_buf in enumerate(block_buf):
+                # Walk back from the end of block_buf: b starts a new column if the last block level with it
+                # on its left is followed only by blocks that stay clear of b's left (and are not table rows).
+                for b_idx in range(len(block_buf) - 1, 0, -1):
+                    b_temp_buf = block_buf[b_idx]
+                    if b_temp_buf["visual_lines"][0]["box_style"][2] > curr_box[1] or \
+                            b_temp_buf["block_type"] == "table_row":
+                        break
+                    b_buf = block_buf[b_idx - 1]
                     curr_b_buf_box = b_buf["visual_lines"][0]["box_style"]
                     curr_b_buf_top = curr_b_buf_box[0]
                     if abs(curr_b_buf_top - curr_top) < TOP_THRESHOLD and \
                             curr_b_buf_box[2] < curr_box[1] and len(b_buf["visual_lines"]) > 3 and \
                             b_buf["block_type"] != "table_row":
-                        for b_temp_buf in block_buf[b_idx + 1:]:
-                            add_to_temp = True
-                            if b_temp_buf["visual_lines"][0]["box_style"][2] > curr_box[1] or \
-                                    b_temp_buf["block_type"] == "table_row":
-                                add_to_temp = False
-                                break
+                        add_to_temp = True
+                        break
                 if not add_to_temp and len(block_buf) > 0 and block_buf[-1]["block_type"] != "table_row":
                     prev_last_vl_box_style = block_buf[-1]["visual_lines"][-1]["box_style"]
                     prev_first_vl_box_style = block_buf[-1]["visual_lines"][0]["box_style"]
@@ -676,12 +727,14 @@ class OrderFixer:
             block_dim = [find_cb_left_and_right(cb) for cb_idx, cb in enumerate(self.contiguous_blocks)
                          if ratios[cb_idx] >= 0.05]
             block_dim.sort(key=lambda x: x[0])
+            # sweep by left: some column reaches into a later one if the furthest right so far reaches its left
             intersect = False
-            for b_dim_index, (b_dim_left, b_dim_right) in enumerate(block_dim):
-                for b_dim in block_dim[b_dim_index+1:]:
-                    if b_dim_right >= b_dim[0]:
-                        intersect = True
-                        break
+            max_right = None
+            for b_dim_left, b_dim_right in block_dim:
+                if max_right is not None and max_right >= b_dim_left:
+                    intersect = True
+                    break
+                max_right = b_dim_right if max_right is None else max(max_right, b_dim_right)
             if not intersect:
                 page_style = list(self.doc.page_styles[self.page_blocks[-1]["visual_lines"][0]["page_idx"]])
                 page_style[3]["probable_multi_column"] = True
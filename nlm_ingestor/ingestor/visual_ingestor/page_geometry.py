@@ -0,0 +1,84 @@
+from bisect import bisect_left, bisect_right
+
+
+class SvgLineIndex:
+    """
+    The svg lines of a page, indexed by y1.
+    lines_between returns the lines within a vertical range in their original (page) order,
+    so Doc.check_line_between_box_styles can skip the lines that can't be between two boxes.
+    """
+    def __init__(self, lines_tag_list):
+        self.line_tags = lines_tag_list
+        y1_sorted = sorted((line['y1'], line_idx) for line_idx, line in enumerate(lines_tag_list))
+        self.y1s = [y1 for y1, _ in y1_sorted]
+        self.line_idxs = [line_idx for _, line_idx in y1_sorted]
+
+    def __len__(self):
+        return len(self.line_tags)
+
+    def __iter__(self):
+        return iter(self.line_tags)
+
+    def lines_between(self, top, bottom):
+        """
+        Lines with top <= y1 <= bottom, in page order.
+        """
+        start = bisect_left(self.y1s, top)
+        end = bisect_right(self.y1s, bottom)
+        if end - start == len(self.line_tags):
+            return self.line_tags
+        return [self.line_tags[line_idx] for line_idx in sorted(self.line_idxs[start:end])]
+
+
+def box_within_bound(box_style, bound):
+    """
+    Whether the top left corner of box_style falls within bound, given as (left, top, right, bottom).
+    The top and bottom of the bound are relaxed by the height of the box.
+    """
+    (left, top, right, bottom) = bound
+    return ((top - box_style[4]) <= box_style[0] <= (bottom + box_style[4])) and \
+           (left <= box_style[1] <= right)
+
+
+class AuditedBBoxIndex:
+    """
+    Audited bboxes grouped by page and block type, and bucketed into horizontal bands of the page,
+    so that finding the bboxes holding a block only looks at the few bands around its top.
+    The bboxes are read as bbox.page_idx, bbox["block_type"] and bbox.bbox (left, top, right, bottom).
+    """
+    def __init__(self, audited_bbox, band_height=64.0):
+        self.band_height = band_height
+        self.page_bboxes = {}       # (page_idx, block_type) -> bboxes in the order they were given
+        self.page_bands = {}        # (page_idx, block_type) -> {band: indexes into page_bboxes}
+        for bbox in audited_bbox:
+            key = (bbox.page_idx, bbox["block_type"])
+            bboxes = self.page_bboxes.setdefault(key, [])
+            bands = self.page_bands.setdefault(key, {})
+            (_, top, _, bottom) = bbox.bbox
+            for band in range(self.band(min(top, bottom)), self.band(max(top, bottom)) + 1):
+                bands.setdefault(band, []).append(len(bboxes))
+            bboxes.append(bbox)
+
+    def band(self, y):
+        return int(y // self.band_height)
+
+    def get_bboxes(self, page_idx, block_type):
+        return self.page_bboxes.get((page_idx, block_type), [])
+
+    def find_bbox(self, page_idx, block_type, box_style):
+        """
+        First bbox (in the order they were given) of block_type on the page that holds box_style,
+        as decided by box_within_bound. None if there is none.
+        """
+        bands = self.page_bands.get((page_idx, block_type))
+        if not bands:
+            return None
+        bboxes = self.page_bboxes[(page_idx, block_type)]
+        # box_within_bound lets the bbox be off by the box height, so look at the bands around the box top
+        candidate_idxs = set()
+        for band in range(self.band(box_style[0] - box_style[4]), self.band(box_style[0] + box_style[4]) + 1):
+            candidate_idxs.update(bands.get(band, ()))
+        for bbox_idx in sorted(candidate_idxs):
+            if box_within_bound(box_style, bboxes[bbox_idx].bbox):
+                return bboxes[bbox_idx]
+        return None
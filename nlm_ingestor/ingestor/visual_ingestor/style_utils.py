@@ -1,6 +1,8 @@
 import re
 
+from nlm_ingestor.ingestion_daemon.config import settings
 from nlm_ingestor.ingestor_utils.ing_named_tuples import BoxStyle, LineStyle
+from nlm_ingestor.ingestor_utils.lru_cache import lru_memoize
 
 word_font_pattern = re.compile(r"^(.+?),([^,]+),([^,]+),([^,]+),([^,]+),([^,]+)$")
 font_weights = {"normal": 400, "bold": 600, "bolder": 900, "lighter": 200}
@@ -69,24 +71,12 @@ def parse_tika_style(style_str: str, text_str: str, page_width: float) -> dict:
         if "," in font_family and font_family in wf:
             new_font_family = font_family.replace(",", "-")
             wf = wf.replace(font_family, new_font_family)
-        word_font_match_result = word_font_pattern.match(wf)
-        wf_parts = word_font_match_result.groups() if word_font_match_result else []
-        if len(wf_parts) < 6:
+        word_line_style = parse_word_font(wf)
+        if word_line_style is None:
             continue
-        wf_font_space_width = round(float(wf_parts[5]), 2)
-        word_line_styles.append(
-            LineStyle(
-                wf_parts[0],
-                wf_parts[2],
-                round(font_scale * float(wf_parts[3]), 1),
-                get_numeric_font_weight(wf_parts[0], wf_parts[1]),
-                text_transform,
-                wf_font_space_width,
-                text_align,
-            )
-        )
+        word_line_styles.append(word_line_style)
         if wf_idx == 0:
-            font_space_width = wf_font_space_width
+            font_space_width = word_line_style.font_space_width
 
     line_style = LineStyle(
         font_family,
@@ -103,6 +93,34 @@ def parse_tika_style(style_str: str, text_str: str, page_width: float) -> dict:
     return box_style, line_style, word_line_styles
 
 
+@lru_memoize(max_length=settings.word_font_cache_size)
+def parse_word_font(word_font):
+    """
+    LineStyle of a tika word font (font family, weight, style, size, ..., space width), None if it can't be parsed.
+    Memoized as the same few fonts are used by all the words of a document, the returned LineStyle is shared.
+    """
+    word_font_match_result = word_font_pattern.match(word_font)
+    if not word_font_match_result:
+        return None
+    wf_parts = word_font_match_result.groups()
+    return LineStyle(
+        wf_parts[0],
+        wf_parts[2],
+        round(font_scale * float(wf_parts[3]), 1),
+        get_numeric_font_weight(wf_parts[0], wf_parts[1]),
+        'none',
+        round(float(wf_parts[5]), 2),
+        'left',
+    )
+
+
+def resize_word_font_cache(settings):
+    parse_word_font.cache.resize(settings.word_font_cache_size)
+
+
+settings.on_reload(resize_word_font_cache)
+
+
 def get_style_kv(style_str):
     parts = style_str.split(";")
     input_style = {}
@@ -1,4 +1,3 @@
-import copy
 from nlm_ingestor.ingestor_utils.utils import safe_int
 import numpy as np
 from collections import Counter
@@ -311,7 +310,7 @@ class TableParser:
         col_spans.sort(key=lambda x: x[0])
 
         for (k, v) in single_cell_col_span:
-            temp_col_spans = copy.deepcopy(col_spans)
+            temp_col_spans = list(col_spans)    # spans are only removed from this list, never modified
             blk_idx = v["block_idx"]
             blk = self.blocks[span_determine_start_idx + blk_idx]
             vls = blk["visual_lines"]
@@ -961,9 +960,7 @@ class TableParser:
                 dest_block["box_style"] = box_style
                 dest_block["cell_values"][row_cell_index] = row_block["cell_values"][row_cell_index] + " " + \
                                                             dest_block["cell_values"][row_cell_index]
-                temp_vls = copy.deepcopy(row_block["visual_lines"])
-                temp_vls.extend(dest_block["visual_lines"])
-                dest_block["visual_lines"] = temp_vls
+                dest_block["visual_lines"] = row_block["visual_lines"] + dest_block["visual_lines"]
             dest_block["row_merged"] = True
             return True
         else:
@@ -1,6 +1,8 @@
 """
 Abode for all Visual Ingestor Helper Utils.
 """
+from timeit import default_timer
+
 from nlm_ingestor.ingestor_utils.utils import safe_int
 import numpy as np
 
@@ -132,3 +134,25 @@ def get_avg_space_bw_multi_line_vls(visual_lines):
     if len(spaces):
         avg_space = np.mean(spaces)
     return avg_space, spaces
+
+
+class StageTimer:
+    """
+    Wall time spent in the named stages of a loop.
+    mark(stage) charges the time since the previous mark to stage, and does nothing when disabled.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.times = {}
+        self.last_mark = default_timer() if enabled else 0.0
+
+    def mark(self, stage):
+        if self.enabled:
+            now = default_timer()
+            self.times[stage] = self.times.get(stage, 0.0) + now - self.last_mark
+            self.last_mark = now
+
+    def report(self, description):
+        if self.enabled:
+            stage_times = ", ".join(f"{stage}: {elapsed * 1000:.2f}ms" for stage, elapsed in self.times.items())
+            print(f"{description} - {stage_times}")
@@ -9,7 +9,6 @@ import sys
 import numpy as np
 import pprint
 from typing import List, Dict
-from itertools import groupby
 from bs4 import BeautifulSoup
 from timeit import default_timer
 
@@ -19,6 +18,7 @@ from nlm_ingestor.ingestor.visual_ingestor import style_utils, table_parser, ind
 from nlm_ingestor.ingestor import line_parser
 from nlm_ingestor.ingestor_utils.parsing_utils import *
 from nlm_ingestor.ingestor.visual_ingestor import vi_helper_utils as vhu
+from nlm_ingestor.ingestor.visual_ingestor.page_geometry import AuditedBBoxIndex, SvgLineIndex, box_within_bound
 
 base_font_size = 3
 header_margin = 0.18            # don't touch this!
@@ -62,6 +62,7 @@ number_in_braces_pattern = re.compile(r"(\(\d+\))")
 page_num_pattern = re.compile(PAGE_NUM_HEADER, re.IGNORECASE)
 parenthesized_hdr_pattern = re.compile(PARENTHESIZED_HDR)
 ends_with_sentence_delimiter_pattern = re.compile(r"(?<![.;:][a-zA-Z0-9])(?<!INC|inc|Inc)[.;:]+(?![\w])[\"“‘’”\'\s]*$")
+trailing_delimiters_pattern = re.compile(r"[.;:\"“‘’”\'\s]*$")
 section_num_pattern = re.compile(r"^\d+([.]?\d+[.]?)*$")
 floating_number_pattern = re.compile(r"\d+([.]?\d+[.]?)*")
 section_generic_pattern = re.compile(r"section(?!\s+\d+\.*\d*\.*[(])(\s+\d+\.*\d*\.*[,\-;\w\s]+\.\s*)", re.MULTILINE)
@@ -82,9 +83,126 @@ def get_block_type(group_is_list, group_is_table_row, group_text):
     return block_type, line_props
 
 
+class BlockSpan:
+    """
+    Running bounds of a block's visual lines.
+    Lets the merge passes extend the box of a growing block with the visual lines of the
+    merged block only, instead of walking every visual line again (see Doc.calc_block_span).
+    """
+    __slots__ = ("top", "min_left", "max_right", "height", "prev_vl_box")
+
+    def __init__(self, visual_lines):
+        prev_vl_box = visual_lines[0]['box_style']
+        self.top = prev_vl_box[0]
+        self.min_left = prev_vl_box[1]
+        self.max_right = prev_vl_box[2]
+        self.height = prev_vl_box[4]
+        self.prev_vl_box = prev_vl_box
+        self.extend(visual_lines[1:])
+
+    def extend(self, visual_lines):
+        prev_vl_box = self.prev_vl_box
+        for vl in visual_lines:
+            vl_box = vl['box_style']
+            if vl_box[0] > prev_vl_box[0]:
+                self.height = self.height + vl_box[4] + (vl_box[0] - (prev_vl_box[0] + prev_vl_box[4]))
+                prev_vl_box = vl_box
+            elif vl_box[0] == prev_vl_box[0]:
+                self.height = max(self.height, vl_box[4])
+                prev_vl_box = vl_box
+            self.min_left = min(vl_box[1], self.min_left)
+            self.max_right = max(vl_box[2], self.max_right)
+        self.prev_vl_box = prev_vl_box
+        return self
+
+    def box_style(self):
+        return BoxStyle(
+            self.top,
+            self.min_left,
+            self.max_right,
+            self.max_right - self.min_left,
+            self.height
+        )
+
+
+class MergedText:
+    """
+    Text of a block built by the merge passes, as the texts of the merged blocks and the spaces added
+    between them (Doc.check_add_space_btw_texts). It is joined once, by Doc.finalize_merged_blocks;
+    until then the merge conditions only read its end and its word count.
+    """
+    __slots__ = ("parts", "word_count")
+
+    def __init__(self, text):
+        self.parts = [text]
+        self.word_count = len(text.split())
+
+    def last_text(self):
+        for part in reversed(self.parts):
+            if part:
+                return part
+        return ""
+
+    def append(self, text):
+        left_text = self.last_text()
+        space = Doc.check_add_space_btw_texts(left_text, text)
+        word_count = len(text.split())
+        if not space and left_text and text and not left_text[-1].isspace() and not text[0].isspace():
+            # the last word so far and the first word of text are glued together
+            word_count -= 1
+        self.parts.append(space)
+        self.parts.append(text)
+        self.word_count += word_count
+
+    def tail(self):
+        """
+        End of the text, with its trailing delimiters, quotes and spaces and the 3 characters before
+        them: all that ends_with_sentence_delimiter_pattern looks at.
+        """
+        tail = ""
+        for part in reversed(self.parts):
+            tail = part + tail
+            if trailing_delimiters_pattern.search(tail).start() >= 3:
+                break
+        return tail
+
+    def join(self):
+        text = "".join(self.parts)
+        self.parts = [text]
+        return text
+
+
+class TableRowSpacing:
+    """
+    Vertical space between the consecutive rows of the table being collected in organize_and_indent_blocks.
+    Spaces measured on an earlier call are kept while the table's leading rows are unchanged,
+    so each call only measures the rows added since.
+    """
+    __slots__ = ("rows", "spaces")
+
+    def __init__(self):
+        self.rows = []
+        self.spaces = []
+
+    def mean_space(self, table_rows):
+        n_rows = len(self.rows)
+        # list comparison checks identity first, so this is cheap while the rows are the same blocks
+        if n_rows > len(table_rows) or table_rows[:n_rows] != self.rows:
+            self.rows = []
+            self.spaces = []
+        for row in table_rows[len(self.rows):]:
+            if self.rows:
+                prev_box = self.rows[-1]['box_style']
+                self.spaces.append(row['box_style'][0] - (prev_box[0] + prev_box[4]))
+            self.rows.append(row)
+        return np.mean(self.spaces)
+
+
 class Doc:
-    def __init__(self, pages, ignore_blocks, render_format: str = "all", audited_bbox = None):
+    def __init__(self, pages, ignore_blocks, render_format: str = "all", audited_bbox = None, line_styles=None):
         self.pages = pages
+        # (box_style, line_style, word_line_styles) of p tags by id(p), when they are known already (OCR)
+        self.line_styles = line_styles or {}
         self.line_style_classes = dict()
         self.class_line_styles = dict()
         self.class_stats = dict()
@@ -110,8 +228,11 @@ class Doc:
         self.is_justified = False
         self.page_styles = []           # Style specific to a page. Height, width, space stats etc.
         self.audited_bbox = audited_bbox
-        self.audited_table_bbox = {}
+        self.audited_bbox_index = AuditedBBoxIndex(audited_bbox or [])
         self.page_svg_tags = []
+        self.page_svg_lines = []        # SvgLineIndex over the svg lines of each page
+        # id(block) -> (block, BlockSpan, MergedText) for the blocks built by the merge passes, which own their visual_lines
+        self.merged_blocks = {}
         if PERFORMANCE_DEBUG:
             self.wall_time = default_timer()
         self.parse(pages)
@@ -136,21 +257,15 @@ class Doc:
         page_blocks = []
         vl_word_counts = []
         soup = BeautifulSoup()
-        if self.audited_bbox:
-            # Group by page_idx for later usage.
-            table_query = {'block_type': 'table'}
-            for page_id, bboxes in groupby(audited_bbox, key=lambda bbox: bbox.page_idx):
-                list_of_bbox = list(bboxes)
-                self.audited_bbox[page_id] = list_of_bbox
-                self.audited_table_bbox[page_id] = list(self.filter_list_of_bbox(list_of_bbox, **table_query))
         if BLOCK_DEBUG:
-            print('Audited Table Boxes: ', self.audited_table_bbox)
+            print('Audited Table Boxes: ', self.audited_bbox_index.page_bboxes)
         for page_idx, page in enumerate(pages):
             all_p = page.find_all("p")
             svg_children = page.find('svg') or []
             lines_tag_list, rect_tag_list = Doc.remove_duplicate_svg_tags(soup, svg_children)
 
             self.page_svg_tags.append([lines_tag_list, rect_tag_list])
+            self.page_svg_lines.append(SvgLineIndex(lines_tag_list))
             # page_style = pages[0].attrs["style"]
             page_style = pages[page_idx].attrs.get("style", None) or pages[0].attrs["style"]
             page_style_kv = style_utils.get_style_kv(page_style)
@@ -185,6 +300,8 @@ class Doc:
                     else:
                         page.insert(0, new_p)
                     p_list = [new_p, orig_p]
+                # the style of orig_p is rewritten when it is reformatted
+                orig_p_styles = self.line_styles.get(id(orig_p), None) if not changed else None
                 for p in p_list:
                     if line_idx > len(all_p) - 3:
                         text_only = text_only_pattern.sub("", p.text).strip()
@@ -194,9 +311,12 @@ class Doc:
                                 last_line_counts[text_only] = 1
                             else:
                                 last_line_counts[text_only] = last_line_counts[text_only] + 1
-                    box_style, line_style, word_line_styles = style_utils.parse_tika_style(
-                        p["style"], p.text, page_width
-                    )
+                    if p is orig_p and orig_p_styles is not None:
+                        box_style, line_style, word_line_styles = orig_p_styles
+                    else:
+                        box_style, line_style, word_line_styles = style_utils.parse_tika_style(
+                            p["style"], p.text, page_width
+                        )
                     is_page_header = box_style[0] < header_cutoff  # Check box_style.top
                     is_page_footer = box_style[0] > footer_cutoff  # Check box_style.top
 
@@ -1983,9 +2103,11 @@ class Doc:
         prev_table_row = None
         prev_too_much_space = False
         space_bw_table_rows = 0.0
+        table_row_spacing = TableRowSpacing()
         table_row_with_max_cols = None
-        svg_page_tags = None
+        svg_page_lines = None
         included_prev_2_prev_blk = False
+        stage_timer = vhu.StageTimer(enabled=PERFORMANCE_DEBUG)
 
         while idx < len(self.blocks):
             block = self.blocks[idx]
@@ -2003,13 +2125,13 @@ class Doc:
                 table_start_idx = block_idx
                 block["block_type"] = 'table_row'
             # print("state: ", block_idx, len(organized_blocks))
-            if not svg_page_tags and not prev_block:
-                svg_page_tags = self.page_svg_tags[block["page_idx"]]
+            if svg_page_lines is None and not prev_block:
+                svg_page_lines = self.page_svg_lines[block["page_idx"]]
             new_page = prev_block and prev_block["page_idx"] != block["page_idx"]
             if new_page:
                 if PROGRESS_DEBUG:
                     print('processing blocks in page: ', block["page_idx"])
-                svg_page_tags = self.page_svg_tags[block["page_idx"]]
+                svg_page_lines = self.page_svg_lines[block["page_idx"]]
 
             probable_table_block = False    # self.check_block_within_svg_tags(block, prev_block)
             if probable_table_block:
@@ -2079,6 +2201,7 @@ class Doc:
                         print("merged block", new_block["block_text"], new_block["block_type"],
                               "vl: ", len(new_block["visual_lines"]))
 
+            stage_timer.mark("y_overlap")
             block_sents = sent_tokenize(block["block_text"])
             class_name = block["block_class"]
 
@@ -2159,7 +2282,7 @@ class Doc:
                             # if there is a line between the vls, then we might be dealing with multi cell. Break it
                             if Doc.check_line_between_box_styles(prev_vl['box_style'],
                                                                  vl['box_style'],
-                                                                 svg_page_tags[0]):
+                                                                 svg_page_lines):
                                 split_idx = v_idx + 1
                                 break
                         elif min_top <= vl_bottom <= max_bottom and vl["box_style"][1] > box_0[2]:
@@ -2172,7 +2295,7 @@ class Doc:
                 if not misaligned_top and orig_misaligned_top != misaligned_top and split_idx > 0:
                     if Doc.check_line_between_box_styles(vls[split_idx - 1]['box_style'],
                                                          vls[split_idx]['box_style'],
-                                                         svg_page_tags[0]):
+                                                         svg_page_lines):
                         misaligned_top = True
 
                 # when a row group is present but gets attached to the next line
@@ -2242,7 +2365,7 @@ class Doc:
                     if prev_block and not Doc.check_line_between_box_styles(
                         prev_block['box_style'],
                         block['box_style'],
-                        svg_page_tags[0],
+                        svg_page_lines,
                         check_gap=True,
                     ):
                         non_table_row_count = non_table_row_count + 1
@@ -2264,15 +2387,9 @@ class Doc:
             # more than two non-table rows after table row - table has ended ## also add blank space logic heremeans the table has ended
             n_rows = table_end_idx - table_start_idx + 1
             if n_rows > 2:
-                temp_trow_block = organized_blocks[table_start_idx]
-                space_bw_trow_list = []
-                for tblock in organized_blocks[table_start_idx + 1:table_end_idx]:
-                    temp_diff_in_space = tblock['box_style'][0] - \
-                                         (temp_trow_block['box_style'][0] + temp_trow_block['box_style'][4])
-                    space_bw_trow_list.append(temp_diff_in_space)
-                    temp_trow_block = tblock
-                space_bw_table_rows = np.mean(space_bw_trow_list)
+                space_bw_table_rows = table_row_spacing.mean_space(organized_blocks[table_start_idx:table_end_idx])
 
+            stage_timer.mark("table_rows")
             check_again = True
             no_more_non_table_rows = (not is_table_row
                                       and table_start_idx != -1
@@ -2352,38 +2469,15 @@ class Doc:
                                                  block["visual_lines"][-1]["text"].strip().endswith(")")) or \
                         self.detect_block_center_aligned(prev_block, enable_width_check=False):
                     no_more_table_rows = True
-            # Find GAP between rows
-            min_left = 10000
-            prev_blk_btm = 0
-            gap_bw_rows = []
-            gap_bw_actual_rows = []
-            left_most_vl = None
             block_vl = block['visual_lines'][0]
-            if table_start_idx != -1 and n_rows > 2:
-                for tblock in organized_blocks[table_start_idx:table_end_idx]:
-                    tb_box = tblock['box_style']
-                    if block_vl["line_style"] == tblock['visual_lines'][0]["line_style"] and \
-                            n_rows <= 4:
-                        # If there is a match in line_style with the possible headers ?
-                        # Allow this only for the first actual data row. Here we consider only 3 rows of header ?
-                        if prev_blk_btm > 0:
-                            row_gap = round(abs(tb_box[0] - prev_blk_btm), 2)
-                            gap_bw_rows.append(row_gap)
-                            if tblock["block_type"] == "table_row":
-                                gap_bw_actual_rows.append(row_gap)
-                            continue
-                    if tb_box[1] < min_left:
-                        left_most_vl = tblock['visual_lines'][0]
-                        min_left = tb_box[1]
-                    if prev_blk_btm > 0:
-                        row_gap = round(abs(tb_box[0] - prev_blk_btm), 2)
-                        gap_bw_rows.append(row_gap)
-                        if tblock["block_type"] == "table_row":
-                            gap_bw_actual_rows.append(row_gap)
-                    prev_blk_btm = tb_box[0] + tb_box[4]
-
             if not no_more_table_rows and non_table_row_count > 0 and table_start_idx != -1 \
                     and not is_table_row and n_rows > 2 and not last_block_in_page and check_again:
+                # Find GAP between rows
+                min_left, left_most_vl, gap_bw_rows, gap_bw_actual_rows = Doc.get_table_row_gaps(
+                    organized_blocks[table_start_idx:table_end_idx],
+                    block_vl,
+                    n_rows,
+                )
                 if left_most_vl:
                     prev_box = left_most_vl['box_style']
                     curr_box = block_vl['box_style']
@@ -2451,7 +2545,7 @@ class Doc:
                 prev_block_style = prev_block['box_style']
                 prev_blk_bottom = prev_block_style[0] + prev_block_style[4]
                 space_bw_curr_and_prev = block['box_style'][0] - prev_blk_bottom
-                if Doc.check_line_between_box_styles(prev_block['box_style'], block['box_style'], svg_page_tags[0]) and\
+                if Doc.check_line_between_box_styles(prev_block['box_style'], block['box_style'], svg_page_lines) and\
                         0 < space_bw_curr_and_prev < prev_block_style[4]:
                     no_more_table_rows = False
                     align_count, _, _ = table_parser.get_alignment_count(prev_block, block)
@@ -2619,11 +2713,11 @@ class Doc:
                         page_change_alignment_style_check = page_change_alignment_style_check and \
                                                             Doc.check_line_between_box_styles(prev_box_style,
                                                                                               block['box_style'],
-                                                                                              svg_page_tags[0],
+                                                                                              svg_page_lines,
                                                                                               x_axis_relaxed=True) and \
                                                             Doc.check_line_between_box_styles(block['box_style'],
                                                                                               next_box_style,
-                                                                                              svg_page_tags[0],
+                                                                                              svg_page_lines,
                                                                                               x_axis_relaxed=True)
 
                 page_change = (new_page and
@@ -2739,6 +2833,7 @@ class Doc:
                         print("\t", block["block_text"][0:80])
                         print("\n</table>\n")
 
+            stage_timer.mark("table_end")
             prev_class_name = class_name
             prev_line_style = line_style
             if is_table_row:
@@ -2775,6 +2870,7 @@ class Doc:
                 prev_block = block
             idx = idx + 1
             block_idx = block_idx + 1
+            stage_timer.mark("block_types")
 
         if len(block_buf) > 0:
             if prev_block:
@@ -2791,6 +2887,7 @@ class Doc:
 
         if table_start_idx != table_end_idx and table_start_idx < len(organized_blocks):
             self.build_table(block_idx, organized_blocks, table_start_idx, table_end_idx + 1)
+        stage_timer.mark("table_end")
 
         i = 0
         prev_header_block = None
@@ -2956,7 +3053,7 @@ class Doc:
                         "header_block_idx": a_block.get("header_block_idx", header_block_idx),
                         "header_text": a_block.get("header_text", ""),
                         "page_idx": a_block["page_idx"],
-                        "visual_lines": [copy.deepcopy(a_block["visual_lines"][0])],  # Is this correct ???
+                        "visual_lines": [copy.copy(a_block["visual_lines"][0])],  # Is this correct ???
                     }
                     # Add only if present. Only if should_be_list == True
                     if a_block.get("list_type", None):
@@ -3040,7 +3137,7 @@ class Doc:
 
             self.post_fix(a_block)
             i += 1
-        
+        stage_timer.mark("headers")
         self.blocks = self.parse_special_lists(organized_blocks)
         self.divide_para_to_headers()
         self.merge_para_blocks()
@@ -3048,14 +3145,55 @@ class Doc:
         self.merge_ooo_para_list_blocks()
         self.merge_ooo_list_para_blocks()
         self.merge_center_aligned_header_para_blocks()
+        self.finalize_merged_blocks()
         self.correct_blk_idxs()
+        stage_timer.mark("block_merges")
         # self.indent_blocks()
         indent = indent_parser.IndentParser(self)
         indent.indent_blocks()
         self.blocks = indent.blocks
+        stage_timer.mark("indent")
+        stage_timer.report("organize_and_indent_blocks")
         # self.class_levels = class_levels
         # print(self.class_levels)
 
+    @staticmethod
+    def get_table_row_gaps(table_blocks, block_vl, n_rows):
+        """
+        Gaps between the rows of the table being built and its left most row.
+        :param table_blocks: blocks collected for the table so far
+        :param block_vl: first visual line of the block being checked against the table
+        :param n_rows: number of rows in the table, including the block being checked
+        :return: min_left, left_most_vl, gap_bw_rows, gap_bw_actual_rows (the gaps following table_row blocks)
+        """
+        min_left = 10000
+        prev_blk_btm = 0
+        gap_bw_rows = []
+        gap_bw_actual_rows = []
+        left_most_vl = None
+        for tblock in table_blocks:
+            tb_box = tblock['box_style']
+            if block_vl["line_style"] == tblock['visual_lines'][0]["line_style"] and \
+                    n_rows <= 4:
+                # If there is a match in line_style with the possible headers ?
+                # Allow this only for the first actual data row. Here we consider only 3 rows of header ?
+                if prev_blk_btm > 0:
+                    row_gap = round(abs(tb_box[0] - prev_blk_btm), 2)
+                    gap_bw_rows.append(row_gap)
+                    if tblock["block_type"] == "table_row":
+                        gap_bw_actual_rows.append(row_gap)
+                    continue
+            if tb_box[1] < min_left:
+                left_most_vl = tblock['visual_lines'][0]
+                min_left = tb_box[1]
+            if prev_blk_btm > 0:
+                row_gap = round(abs(tb_box[0] - prev_blk_btm), 2)
+                gap_bw_rows.append(row_gap)
+                if tblock["block_type"] == "table_row":
+                    gap_bw_actual_rows.append(row_gap)
+            prev_blk_btm = tb_box[0] + tb_box[4]
+        return min_left, left_most_vl, gap_bw_rows, gap_bw_actual_rows
+
     def build_table(self, block_idx, organized_blocks, table_start_idx, table_end_idx):
         footer_count, footers = self.get_table_footers(organized_blocks, table_start_idx, table_end_idx)
         if table_parser.TABLE_DEBUG:
@@ -3226,7 +3364,7 @@ class Doc:
                     break
             if ((same_class or (is_aligned and
                                 Doc.check_line_between_box_styles(prev_box, curr_top_box,
-                                                                  self.page_svg_tags[curr_top_block["page_idx"]][0],
+                                                                  self.page_svg_lines[curr_top_block["page_idx"]],
                                                                   x_axis_relaxed=True)))
                     and "is_table_end" not in prev_block
                     and prev_block["block_type"] != "header_modified_to_para"
@@ -3485,38 +3623,7 @@ class Doc:
 
     @staticmethod
     def calc_block_span(block):
-        n_lines = 1
-        block_vl = block['visual_lines']
-        prev_vl_box = block_vl[0]['box_style']
-        top = prev_vl_box[0]
-        min_left = prev_vl_box[1]
-        max_right = prev_vl_box[2]
-        height = prev_vl_box[4]
-        # print(block['block_text'][0:20], "n_vls:", len(block_vl))
-        for vl in block_vl[1:]:
-            vl_box = vl['box_style']
-            if vl_box[0] > prev_vl_box[0]:
-                n_lines = n_lines + 1
-                height = height + vl_box[4] + (vl_box[0] - (prev_vl_box[0] + prev_vl_box[4]))
-                prev_vl_box = vl_box
-            elif vl_box[0] == prev_vl_box[0]:
-                n_lines = n_lines + 1
-                height = max(height, vl_box[4])
-                prev_vl_box = vl_box
-            min_left = min(vl_box[1], min_left)
-            max_right = max(vl_box[2], max_right)
-
-        box_style = BoxStyle(
-            top,
-            min_left,
-            max_right,
-            max_right - min_left,
-            height
-        )
-        # print("--")
-        # print("bounds for ", block['block_text'])
-        # print(box_props)
-        return box_style
+        return BlockSpan(block['visual_lines']).box_style()
 
     @staticmethod
     def has_page_number(text, last_line_counts):
@@ -3794,11 +3901,9 @@ class Doc:
             Tuple as (left, top, right, bottom)
         :return: True if block falls within the bounds else False
         """
-        (left, top, right, bottom) = bound
         # We are not going to be strict about the bottom of box_style and right of box_style
         # Do we need to ?
-        return ((top - box_style[4]) <= box_style[0] <= (bottom + box_style[4])) and \
-               (left <= box_style[1] <= right)
+        return box_within_bound(box_style, bound)
 
     def check_block_within_table_bbox(self, block):
         """
@@ -3806,27 +3911,7 @@ class Doc:
         :param block: block whose bounds need to be decided
         :return: True if block falls within the bounds else False
         """
-        for table_bbox in self.audited_table_bbox.get(block["page_idx"], []):
-            if self.check_block_within_bound(block["box_style"], table_bbox.bbox):
-                return True
-        return False
-
-    @staticmethod
-    def filter_list_of_bbox(list_of_bbox, **kwargs):
-        """
-        Filter the list of BBOX based on the Key-Value pairs mentioned in kwargs
-        Match against all of them
-        :param list_of_bbox: List of BBOX
-        :param kwargs: Key-value pairs to filter
-        :return: Generator object with List of dictionaries matching the query params
-        """
-        list_of_bbox, kwargs = list(list_of_bbox), dict(kwargs)
-        # Each data item is checked against ALL kwargs before matching in the filter
-        matches = filter(
-            lambda bbox: all([bbox[k] == v for k, v in kwargs.items()]),
-            list_of_bbox
-        )
-        yield from list(matches)
+        return self.audited_bbox_index.find_bbox(block["page_idx"], "table", block["box_style"]) is not None
 
     def create_new_vl_group_for_sections(self, result_list, buf_texts, block_types):
         """
@@ -4038,33 +4123,20 @@ class Doc:
                          temp_blocks[-1]["visual_lines"][-1]["word_classes"][-1] ==
                          blk["visual_lines"][0]["word_classes"][0]) \
                     and blk["page_idx"] == temp_blocks[-1]["page_idx"] \
-                    and ends_with_sentence_delimiter_pattern.search(temp_blocks[-1]["block_text"]) is None \
+                    and not self.ends_with_sentence_delimiter(temp_blocks[-1]) \
                     and not blk.get("is_row_group", False) \
                     and (blk["box_style"][0] - (temp_blocks[-1]["box_style"][0] + temp_blocks[-1]["box_style"][4]) <=
                          blk["visual_lines"][0]['line_style'][2] or
                          temp_blocks[-1]['visual_lines'][-1]["line_parser"].get("last_word_is_co_ordinate_conjunction",
                                                                                 False)):
                 # We are merging centre_aligned para blocks even if the distance between blocks are considerable
-                merged_text = temp_blocks[-1]["block_text"]
-                merged_text = merged_text + \
-                              self.check_add_space_btw_texts(merged_text, blk["block_text"]) \
-                              + blk["block_text"]
-                merged_block = {
-                    "block_idx": temp_blocks[-1]["block_idx"],
-                    "page_idx": blk["page_idx"],
-                    "block_type": "para",
-                    "block_text": merged_text,
-                    "merged_block": True,
-                    "visual_lines": temp_blocks[-1]["visual_lines"] + blk["visual_lines"],
-                    "block_class": temp_blocks[-1]["block_class"],
-                    "block_sents": sent_tokenize(merged_text),
-                }
-                merged_block["box_style"] = self.calc_block_span(merged_block)
+                merged_block = self.merge_block_pair(temp_blocks[-1], blk, temp_blocks[-1]["block_idx"],
+                                                     blk["page_idx"], "para", temp_blocks[-1]["block_class"])
                 temp_blocks[-1] = merged_block
             elif len(temp_blocks) \
                     and not blk.get("is_row_group", False) \
                     and blk["block_type"] == "para" \
-                    and ends_with_sentence_delimiter_pattern.search(temp_blocks[-1]["block_text"]) is None \
+                    and not self.ends_with_sentence_delimiter(temp_blocks[-1]) \
                     and (blk["page_idx"] != temp_blocks[-1]["page_idx"] or
                          (blk["page_idx"] == temp_blocks[-1]["page_idx"] and len(temp_blocks) > 1 and
                           temp_blocks[-1]["page_idx"] != temp_blocks[-2]["page_idx"])):
@@ -4080,7 +4152,7 @@ class Doc:
                     if t_blk["block_class"] == blk["block_class"] \
                             and t_blk["block_type"] == "para" \
                             and not t_blk.get("is_row_group", False):
-                        if ends_with_sentence_delimiter_pattern.search(t_blk["block_text"]) is None:
+                        if not self.ends_with_sentence_delimiter(t_blk):
                             prev_same_class_block = t_blk
                             prev_temp_idx = len(temp_blocks) - abs(rev_start_idx) - t_blk_idx
                         break
@@ -4092,21 +4164,8 @@ class Doc:
                         prev_temp_idx >= 0 and \
                         (blk['visual_lines'][0]["line_parser"].get("continuing_line", False) or
                          prev_same_class_block['visual_lines'][-1]["line_parser"].get("incomplete_line", False)):
-                    merged_text = prev_same_class_block["block_text"]
-                    merged_text = merged_text + \
-                                  self.check_add_space_btw_texts(merged_text, blk["block_text"]) \
-                                  + blk["block_text"]
-                    merged_block = {
-                        "block_idx": prev_same_class_block["block_idx"],
-                        "page_idx": prev_same_class_block["page_idx"],
-                        "block_type": "para",
-                        "block_text": merged_text,
-                        "merged_block": True,
-                        "visual_lines": prev_same_class_block["visual_lines"] + blk["visual_lines"],
-                        "block_class": blk["block_class"],
-                        "block_sents": sent_tokenize(merged_text),
-                    }
-                    merged_block["box_style"] = self.calc_block_span(merged_block)
+                    merged_block = self.merge_block_pair(prev_same_class_block, blk, prev_same_class_block["block_idx"],
+                                                         prev_same_class_block["page_idx"], "para", blk["block_class"])
                     temp_blocks[prev_temp_idx] = merged_block
                 else:
                     # Add the same block anyways
@@ -4143,7 +4202,7 @@ class Doc:
                         if t_blk["block_class"] == blk["block_class"] \
                                 and t_blk["block_type"] == "para" \
                                 and not t_blk.get("is_row_group", False):
-                            if ends_with_sentence_delimiter_pattern.search(t_blk["block_text"]) is None:
+                            if not self.ends_with_sentence_delimiter(t_blk):
                                 prev_same_class_block = t_blk
                                 prev_temp_idx = len(temp_blocks) - abs(rev_start_idx) - t_blk_idx
                             break
@@ -4151,24 +4210,11 @@ class Doc:
                             break
                 if prev_same_class_block and \
                         prev_temp_idx >= 0:
-                    merged_text = prev_same_class_block["block_text"]
-                    merged_text = merged_text + \
-                                  self.check_add_space_btw_texts(merged_text, blk["block_text"]) \
-                                  + blk["block_text"]
                     merged_block_class = prev_same_class_block['block_class'] \
-                        if len(prev_same_class_block["block_text"].split()) > len(blk["block_text"].split()) \
+                        if self.count_block_words(prev_same_class_block) > self.count_block_words(blk) \
                         else blk["block_class"]
-                    merged_block = {
-                        "block_idx": prev_same_class_block["block_idx"],
-                        "page_idx": prev_same_class_block["page_idx"],
-                        "block_type": "para",
-                        "block_text": merged_text,
-                        "merged_block": True,
-                        "visual_lines": prev_same_class_block["visual_lines"] + blk["visual_lines"],
-                        "block_class": merged_block_class,
-                        "block_sents": sent_tokenize(merged_text),
-                    }
-                    merged_block["box_style"] = self.calc_block_span(merged_block)
+                    merged_block = self.merge_block_pair(prev_same_class_block, blk, prev_same_class_block["block_idx"],
+                                                         prev_same_class_block["page_idx"], "para", merged_block_class)
                     temp_blocks[prev_temp_idx] = merged_block
                 else:
                     # Add the same block anyways
@@ -4179,27 +4225,14 @@ class Doc:
                          temp_blocks[-1]["visual_lines"][-1]["word_classes"][-1] ==
                          blk["visual_lines"][0]["word_classes"][0]) \
                     and blk["page_idx"] == temp_blocks[-1]["page_idx"] \
-                    and ends_with_sentence_delimiter_pattern.search(temp_blocks[-1]["block_text"]) is None \
+                    and not self.ends_with_sentence_delimiter(temp_blocks[-1]) \
                     and not blk.get("is_row_group", False) \
                     and temp_blocks[-1]['visual_lines'][-1]["line_parser"].get("last_word_is_co_ordinate_conjunction",
                                                                                 False):
                 # We are merging a previous para with a header if the previous para ends with a conjunction and
                 # are of the same block class
-                merged_text = temp_blocks[-1]["block_text"]
-                merged_text = merged_text + \
-                              self.check_add_space_btw_texts(merged_text, blk["block_text"]) \
-                              + blk["block_text"]
-                merged_block = {
-                    "block_idx": temp_blocks[-1]["block_idx"],
-                    "page_idx": blk["page_idx"],
-                    "block_type": "para",
-                    "block_text": merged_text,
-                    "merged_block": True,
-                    "visual_lines": temp_blocks[-1]["visual_lines"] + blk["visual_lines"],
-                    "block_class": temp_blocks[-1]["block_class"],
-                    "block_sents": sent_tokenize(merged_text),
-                }
-                merged_block["box_style"] = self.calc_block_span(merged_block)
+                merged_block = self.merge_block_pair(temp_blocks[-1], blk, temp_blocks[-1]["block_idx"],
+                                                     blk["page_idx"], "para", temp_blocks[-1]["block_class"])
                 temp_blocks[-1] = merged_block
             else:
                 temp_blocks.append(blk)
@@ -4222,7 +4255,7 @@ class Doc:
                     not blk.get("is_row_group", False) and \
                     not blk.get("list_type", "") and not temp_blocks[-1].get("list_type", ""):
                 # "Name" header blocks should not be merged.
-                translated_str = blk['block_text'].translate(str.maketrans('', '', string.punctuation))
+                translated_str = self.get_block_text(blk).translate(str.maketrans('', '', string.punctuation))
                 json_rec = line_parser.Line(translated_str).to_json()
                 name_decider = False
                 if json_rec['noun_chunks']:
@@ -4232,42 +4265,16 @@ class Doc:
                              (json_rec['word_count'] - json_rec['stop_word_count'])) > 0.75:
                         name_decider = True
                 if not name_decider:
-                    merged_text = temp_blocks[-1]["block_text"]
-                    merged_text = merged_text + \
-                                  self.check_add_space_btw_texts(merged_text, blk["block_text"]) \
-                                  + blk["block_text"]
-                    merged_block = {
-                        "block_idx": temp_blocks[-1]["block_idx"],
-                        "page_idx": blk["page_idx"],
-                        "block_type": "header",
-                        "block_text": merged_text,
-                        "merged_block": True,
-                        "visual_lines": temp_blocks[-1]["visual_lines"] + blk["visual_lines"],
-                        "block_class": temp_blocks[-1]["block_class"],
-                        "block_sents": sent_tokenize(merged_text),
-                    }
-                    merged_block["box_style"] = self.calc_block_span(merged_block)
+                    merged_block = self.merge_block_pair(temp_blocks[-1], blk, temp_blocks[-1]["block_idx"],
+                                                         blk["page_idx"], "header", temp_blocks[-1]["block_class"])
                     temp_blocks[-1] = merged_block
                     do_merge_blocks = True
 
             if not do_merge_blocks:
                 if center_aligned_blocks:
                     for b in center_aligned_blocks:
-                        merged_text = temp_blocks[-1]["block_text"]
-                        merged_text = merged_text + \
-                                      self.check_add_space_btw_texts(merged_text, b["block_text"]) \
-                                      + b["block_text"]
-                        merged_block = {
-                            "block_idx": temp_blocks[-1]["block_idx"],
-                            "page_idx": b["page_idx"],
-                            "block_type": "header",
-                            "block_text": merged_text,
-                            "merged_block": True,
-                            "visual_lines": temp_blocks[-1]["visual_lines"] + b["visual_lines"],
-                            "block_class": temp_blocks[-1]["block_class"],
-                            "block_sents": sent_tokenize(merged_text),
-                        }
-                        merged_block["box_style"] = self.calc_block_span(merged_block)
+                        merged_block = self.merge_block_pair(temp_blocks[-1], b, temp_blocks[-1]["block_idx"],
+                                                             b["page_idx"], "header", temp_blocks[-1]["block_class"])
                         temp_blocks[-1] = merged_block
                     center_aligned_blocks = []
                 temp_blocks.append(blk)
@@ -4280,27 +4287,14 @@ class Doc:
                     and len(temp_blocks) \
                     and temp_blocks[-1]["block_type"] == "para" \
                     and blk["block_class"] == temp_blocks[-1]["block_class"] \
-                    and ends_with_sentence_delimiter_pattern.search(temp_blocks[-1]["block_text"]) is None \
+                    and not self.ends_with_sentence_delimiter(temp_blocks[-1]) \
                     and not temp_blocks[-1].get("is_row_group", False) \
-                    and len(temp_blocks[-1]["block_text"].split()) > 1 \
+                    and self.count_block_words(temp_blocks[-1]) > 1 \
                     and blk['visual_lines'][0].get("line_parser", {}).get("start_number", "") \
                     not in ["a", "A", "i", "1"] \
                     and not blk.get("underwriter_block", False):
-                merged_text = temp_blocks[-1]["block_text"]
-                merged_text = merged_text + \
-                              self.check_add_space_btw_texts(merged_text, blk["block_text"]) \
-                              + blk["block_text"]
-                merged_block = {
-                    "block_idx": temp_blocks[-1]["block_idx"],
-                    "page_idx": temp_blocks[-1]["page_idx"],
-                    "block_type": "para",
-                    "block_text": merged_text,
-                    "merged_block": True,
-                    "visual_lines": temp_blocks[-1]["visual_lines"] + blk["visual_lines"],
-                    "block_class": blk["block_class"],
-                    "block_sents": sent_tokenize(merged_text),
-                }
-                merged_block["box_style"] = self.calc_block_span(merged_block)
+                merged_block = self.merge_block_pair(temp_blocks[-1], blk, temp_blocks[-1]["block_idx"],
+                                                     temp_blocks[-1]["page_idx"], "para", blk["block_class"])
                 temp_blocks[-1] = merged_block
             else:
                 temp_blocks.append(blk)
@@ -4318,18 +4312,16 @@ class Doc:
                     and temp_blocks[-1]["block_type"] == "list_item" \
                     and blk["block_class"] == temp_blocks[-1]["block_class"] \
                     and blk["page_idx"] != temp_blocks[-1]["page_idx"] \
-                    and ends_with_sentence_delimiter_pattern.search(temp_blocks[-1]["block_text"]) is None \
+                    and not self.ends_with_sentence_delimiter(temp_blocks[-1]) \
                     and not temp_blocks[-1].get("is_row_group", False) \
-                    and len(temp_blocks[-1]["block_text"].split()) > 1:
-                merged_text = temp_blocks[-1]["block_text"]
-                merged_text = merged_text + \
-                              self.check_add_space_btw_texts(merged_text, blk["block_text"]) \
-                              + blk["block_text"]
-                temp_blocks[-1]["block_text"] = merged_text
+                    and self.count_block_words(temp_blocks[-1]) > 1:
+                visual_lines, span, merged_text = self.extend_merged_block(temp_blocks[-1], blk)
+                temp_blocks[-1]["block_text"] = None
                 temp_blocks[-1]["merged_block"] = True
-                temp_blocks[-1]["visual_lines"] = temp_blocks[-1]["visual_lines"] + blk["visual_lines"]
-                temp_blocks[-1]["block_sents"] = sent_tokenize(merged_text)
-                temp_blocks[-1]["box_style"] = self.calc_block_span(temp_blocks[-1])
+                temp_blocks[-1]["visual_lines"] = visual_lines
+                temp_blocks[-1]["block_sents"] = None
+                temp_blocks[-1]["box_style"] = span.box_style()
+                self.merged_blocks[id(temp_blocks[-1])] = (temp_blocks[-1], span, merged_text)
             else:
                 temp_blocks.append(blk)
         self.blocks = temp_blocks
@@ -4359,26 +4351,95 @@ class Doc:
                     and not blk.get("is_row_group", False) \
                     and not blk.get("list_type", "") \
                     and not temp_blocks[-1].get("list_type", ""):
-                merged_text = temp_blocks[-1]["block_text"]
-                merged_text = merged_text + \
-                              self.check_add_space_btw_texts(merged_text, blk["block_text"]) \
-                              + blk["block_text"]
-                merged_block = {
-                    "block_idx": temp_blocks[-1]["block_idx"],
-                    "page_idx": blk["page_idx"],
-                    "block_type": "para",
-                    "block_text": merged_text,
-                    "merged_block": True,
-                    "visual_lines": temp_blocks[-1]["visual_lines"] + blk["visual_lines"],
-                    "block_class": temp_blocks[-1]["block_class"],
-                    "block_sents": sent_tokenize(merged_text),
-                }
-                merged_block["box_style"] = self.calc_block_span(merged_block)
+                merged_block = self.merge_block_pair(temp_blocks[-1], blk, temp_blocks[-1]["block_idx"],
+                                                     blk["page_idx"], "para", temp_blocks[-1]["block_class"])
                 temp_blocks[-1] = merged_block
             else:
                 temp_blocks.append(blk)
         self.blocks = temp_blocks
 
+    def merge_block_pair(self, prev_block, blk, block_idx, page_idx, block_type, block_class):
+        """
+        Append blk to prev_block for the merge passes.
+        The box, visual lines and text are extended incrementally (extend_merged_block), block_text and
+        block_sents are left to finalize_merged_blocks, so a long chain of merged fragments is not
+        copied, re-measured and re-tokenized at every step.
+        :param prev_block: block being grown, replaced by the merged block
+        :param blk: block to append
+        :return: the merged block
+        """
+        visual_lines, span, merged_text = self.extend_merged_block(prev_block, blk)
+        merged_block = {
+            "block_idx": block_idx,
+            "page_idx": page_idx,
+            "block_type": block_type,
+            "block_text": None,
+            "merged_block": True,
+            "visual_lines": visual_lines,
+            "block_class": block_class,
+            "block_sents": None,
+            "box_style": span.box_style(),
+        }
+        self.merged_blocks[id(merged_block)] = (merged_block, span, merged_text)
+        return merged_block
+
+    def extend_merged_block(self, prev_block, blk):
+        """
+        Visual lines, span and text of prev_block followed by blk's.
+        When prev_block was built by the merge passes, it owns its visual_lines list, span and text:
+        they are extended in place and handed over to the block replacing prev_block. Otherwise they
+        are copied, prev_block's list may be shared with other blocks.
+        :return: (visual_lines, BlockSpan, MergedText)
+        """
+        merged_entry = self.merged_blocks.pop(id(prev_block), None)
+        if merged_entry and merged_entry[0] is prev_block:
+            _, span, merged_text = merged_entry
+            visual_lines = prev_block["visual_lines"]
+            visual_lines.extend(blk["visual_lines"])
+        else:
+            span = BlockSpan(prev_block["visual_lines"])
+            merged_text = MergedText(prev_block["block_text"])
+            visual_lines = prev_block["visual_lines"] + blk["visual_lines"]
+        span.extend(blk["visual_lines"])
+        merged_text.append(self.get_block_text(blk))
+        return visual_lines, span, merged_text
+
+    def get_block_text(self, block):
+        """
+        block_text of block, joined first when the merge passes left it in parts.
+        """
+        if block["block_text"] is None:
+            block["block_text"] = self.merged_blocks[id(block)][2].join()
+        return block["block_text"]
+
+    def ends_with_sentence_delimiter(self, block):
+        """
+        Whether block_text ends a sentence, only the end of the text is joined when the merge passes
+        left it in parts.
+        """
+        if block["block_text"] is None:
+            text = self.merged_blocks[id(block)][2].tail()
+        else:
+            text = block["block_text"]
+        return ends_with_sentence_delimiter_pattern.search(text) is not None
+
+    def count_block_words(self, block):
+        if block["block_text"] is None:
+            return self.merged_blocks[id(block)][2].word_count
+        return len(block["block_text"].split())
+
+    def finalize_merged_blocks(self):
+        """
+        Join the text of the blocks built by the merge passes and sentence split them,
+        once all of the passes are done.
+        """
+        for blk in self.blocks:
+            if blk.get("block_text", "") is None:
+                self.get_block_text(blk)
+            if blk.get("block_sents", []) is None:
+                blk["block_sents"] = sent_tokenize(blk["block_text"])
+        self.merged_blocks = {}
+
     def correct_blk_idxs(self):
         for blk_idx, blk in enumerate(self.blocks):
             blk["block_idx"] = blk_idx
@@ -4570,7 +4631,7 @@ class Doc:
         Check whether there is a line between the blocks / visual_lines represented by box_styles
         :param prev_blk_box_style:
         :param curr_blk_box_style:
-        :param lines_tag_list:
+        :param lines_tag_list: list of line tags, or the SvgLineIndex of the page
         :param check_gap: Checks the gap between line and the blocks
         :param x_axis_relaxed: Relax the left/right check for the current box style.
         :return:
@@ -4584,6 +4645,8 @@ class Doc:
             top2 = curr_blk_box_style[0]
             left2 = curr_blk_box_style[1]
             right2 = curr_blk_box_style[2]
+            if isinstance(lines_tag_list, SvgLineIndex):
+                lines_tag_list = lines_tag_list.lines_between(bottom1, top2 + 2.0)
 
             for line in lines_tag_list:
                 # Not doing exact match on top of the next element as sometimes lines are thick
@@ -1,9 +1,9 @@
 import logging
-import os
 from collections import defaultdict
 
 import numpy as np
-from nlm_utils.model_client import EncoderClient
+
+import nlm_ingestor.ingestion_daemon.config as cfg
 
 
 class DeDuplicateEngine:
@@ -15,11 +15,14 @@ class DeDuplicateEngine:
             f"Initing Duplicated Detection Engine with settings {settings}",
         )
 
+        # nlm_utils is slow to import and fetches its tokenizer from the network, import it on first use
+        from nlm_utils.model_client import EncoderClient
+
         self.inited = False
         self.threshold = threshold
         self.encoder = EncoderClient(
             model="sif",
-            url=os.getenv("MODEL_SERVER_URL", "https://services.nlmatics.com"),
+            url=cfg.settings.model_server_url,
         )
         if not settings:
             self.logger.info(
@@ -34,33 +37,73 @@ class DeDuplicateEngine:
             self.embeddings[setting["level"]].append(setting["text"])
             self.settings[setting["level"]].append(setting)
 
-        # convert text to embeddings
+        # convert text to embeddings, stored as normalized float32 matrices per level
         for level, texts in self.embeddings.items():
-            self.embeddings[level] = self.encoder(texts)["embeddings"]
+            self.embeddings[level] = normalize_rows(self.encoder(texts)["embeddings"])
         self.inited = True
 
     def check_duplicate(self, embeddings={}):
-        report = {"is_duplicated": False, "ignore_all_after": False}
+        if self.inited:
+            assert len(embeddings) > 0, ValueError("Both text and text_emb are None")
+        return self.check_duplicates([embeddings])[0]
+
+    def check_duplicates(self, blocks_embeddings, top_k=1):
+        """
+        Check all the blocks of a document at once.
+        :param blocks_embeddings: list of {level: embedding} dicts, one per block in document order
+        :param top_k: number of most similar settings to consider per block and level
+        :return: list of reports, one per block. Once a block matches a setting with ignore_all_after,
+                 all the following blocks are reported as duplicated with ignore_all_after.
+        """
+        reports = [{"is_duplicated": False, "ignore_all_after": False} for _ in blocks_embeddings]
         # engine not inited with settings, return False
         if not self.inited:
-            return report
+            return reports
 
-        assert len(embeddings) > 0, ValueError("Both text and text_emb are None")
-        for level, embedding in embeddings.items():
-            # level has no settings, return False
-            if level not in self.embeddings:
-                continue
+        # group the blocks per level so that each level is scored with one matrix multiply
+        level_block_idxs = defaultdict(list)
+        level_block_embeddings = defaultdict(list)
+        for block_idx, embeddings in enumerate(blocks_embeddings):
+            for level, embedding in embeddings.items():
+                # level has no settings, return False
+                if level not in self.embeddings:
+                    continue
+                level_block_idxs[level].append(block_idx)
+                level_block_embeddings[level].append(embedding)
 
-            scores = np.dot(self.embeddings[level], embedding)
-            most_similar_idx = np.argmax(scores)
-            if scores[most_similar_idx] > self.threshold:
+        for level, block_idxs in level_block_idxs.items():
+            settings_matrix = self.embeddings[level]
+            scores = normalize_rows(level_block_embeddings[level]) @ settings_matrix.T
+            k = min(top_k, settings_matrix.shape[0])
+            if k < settings_matrix.shape[0]:
+                top_idxs = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                top_idxs = np.broadcast_to(np.arange(k), (len(block_idxs), k))
+            top_scores = np.take_along_axis(scores, top_idxs, axis=1)
+            for row, col in zip(*np.nonzero(top_scores > self.threshold)):
+                block_idx = block_idxs[row]
+                setting_idx = top_idxs[row, col]
                 self.logger.info(
-                    f"found duplicate with score: {scores[most_similar_idx]}, settings: {self.settings[level][most_similar_idx]}",
+                    f"found duplicate with score: {top_scores[row, col]}, settings: {self.settings[level][setting_idx]}",
                 )
-                report["is_duplicated"] = True
-                report["ignore_all_after"] = (
-                    report["ignore_all_after"]
-                    or self.settings[level][most_similar_idx]["ignore_all_after"]
+                reports[block_idx]["is_duplicated"] = True
+                reports[block_idx]["ignore_all_after"] = (
+                    reports[block_idx]["ignore_all_after"]
+                    or self.settings[level][setting_idx]["ignore_all_after"]
                 )
-        # nothing matched, return False
-        return report
+
+        # everything after the first ignore_all_after block is ignored
+        for block_idx, report in enumerate(reports):
+            if report["ignore_all_after"]:
+                for later_report in reports[block_idx + 1:]:
+                    later_report["is_duplicated"] = True
+                    later_report["ignore_all_after"] = True
+                break
+        return reports
+
+
+def normalize_rows(embeddings):
+    matrix = np.array(embeddings, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
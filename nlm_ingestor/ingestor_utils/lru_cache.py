@@ -1,32 +1,159 @@
 #!/usr/bin/env python
 """
-Python's OrderedDict is an ideal data structure
-to create an LRU cache
+Thread-safe LRU cache bounded by entry count and approximate size in bytes,
+with an optional time to live, used for the ingestor's memo layers.
 """
+import sys
+import threading
 from collections import OrderedDict
+from functools import wraps
+from time import monotonic
+
+
+def get_approximate_size(obj):
+    """
+    Shallow size of obj plus the shallow size of its items (or attributes), in bytes.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(sys.getsizeof(item) for item in obj)
+    elif isinstance(obj, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in obj.items())
+    elif hasattr(obj, "__dict__"):
+        size += get_approximate_size(obj.__dict__)
+    return size
 
 
-# to be replaced with redis later
-# Borrowed from https://gist.github.com/damzam/4b0812c997e91f1bed17
 class LRUCache:
-    def __init__(self, max_length=100000):
+    """
+    Keeps the most recently used entries, up to max_length entries and, when max_bytes is set, up to
+    max_bytes as measured by size_of on the keys and values. When ttl is set, entries older than ttl
+    seconds are dropped on access. Hits, misses, evictions and expirations are counted.
+    """
+    def __init__(self, max_length=100000, max_bytes=None, ttl=None, size_of=get_approximate_size):
+        # key -> (value, size, expiry time)
         self.cache = OrderedDict()
         self.max_length = max_length
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size_of = size_of
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.cache.get(key, None)
+            if entry is not None and self.ttl is not None and entry[2] <= monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return entry[0]
 
     def __setitem__(self, key, value):
-        if key in self.cache:
-            self.cache.pop(key)
-        self.cache[key] = value
-        if len(self.cache) > self.max_length:
-            self.cache.popitem(last=False)
+        size = self.size_of(key) + self.size_of(value) if self.max_bytes is not None else 0
+        expiry = monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            if key in self.cache:
+                self._remove(key)
+            self.cache[key] = (value, size, expiry)
+            self.n_bytes += size
+            self._evict()
+
+    def resize(self, max_length, max_bytes=None):
+        """
+        Change the bounds of the cache, evicting the least recently used entries to fit.
+        Sizes are only measured when max_bytes is set, so it can't be set on a cache created without it.
+        """
+        with self.lock:
+            self.max_length = max_length
+            if self.max_bytes is not None and max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        while len(self.cache) > self.max_length or (
+            self.max_bytes is not None and self.n_bytes > self.max_bytes and len(self.cache) > 1
+        ):
+            _, (_, evicted_size, _) = self.cache.popitem(last=False)
+            self.n_bytes -= evicted_size
+            self.evictions += 1
 
     def __getitem__(self, key):
-        if key in self.cache:
-            value = self.cache.pop(key)
-            self.cache[key] = value
-            return value
-        else:
-            raise KeyError
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            raise KeyError(key)
+        return value
 
     def __contains__(self, key):
-        return key in self.cache
+        with self.lock:
+            entry = self.cache.get(key, None)
+            return entry is not None and (self.ttl is None or entry[2] > monotonic())
+
+    def __len__(self):
+        return len(self.cache)
+
+    def _remove(self, key):
+        _, size, _ = self.cache.pop(key)
+        self.n_bytes -= size
+
+    def pop(self, key, default=None):
+        with self.lock:
+            if key not in self.cache:
+                return default
+            value = self.cache[key][0]
+            self._remove(key)
+            return value
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+            self.n_bytes = 0
+
+    def get_stats(self):
+        """
+        Hits, misses, evictions, expirations, size, bytes and hit rate of the cache.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self.cache),
+                "bytes": self.n_bytes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def lru_memoize(max_length=100000, max_bytes=None, ttl=None, size_of=get_approximate_size):
+    """
+    Decorator memoizing a function of hashable positional arguments in an LRUCache, available as
+    the cache attribute of the decorated function. Concurrent misses on the same arguments may
+    each call the function; the last result is kept.
+    """
+    def decorator(func):
+        cache = LRUCache(max_length=max_length, max_bytes=max_bytes, ttl=ttl, size_of=size_of)
+        missing = object()
+
+        @wraps(func)
+        def wrapper(*args):
+            value = cache.get(args, missing)
+            if value is missing:
+                value = func(*args)
+                cache[args] = value
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,94 @@
+import logging
+import threading
+from timeit import default_timer
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Models and data files (SymSpell dictionary, NLTK data, word costs ...) shared by the whole process.
+    Each one is loaded the first time it is asked for (or when the registry is warmed), by the loader
+    it was registered with, and is kept for the life of the process.
+    """
+    def __init__(self):
+        self.loaders = {}
+        self.models = {}
+        self.load_times = {}
+        self.lock = threading.RLock()
+
+    def register(self, name, loader):
+        self.loaders[name] = loader
+
+    def is_loaded(self, name):
+        return name in self.models
+
+    def get(self, name):
+        model = self.models.get(name, None)
+        if model is not None:
+            return model
+        with self.lock:
+            # another thread may have loaded it while we were waiting
+            if name not in self.models:
+                start = default_timer()
+                self.models[name] = self.loaders[name]()
+                self.load_times[name] = default_timer() - start
+                logger.info(f"Loaded {name} in {self.load_times[name]:.3f}s")
+        return self.models[name]
+
+    def warm(self, names=None):
+        """
+        Load the given models (all the registered ones by default) now, instead of on first use.
+        """
+        for name in names or list(self.loaders):
+            self.get(name)
+
+    def unload(self, name):
+        with self.lock:
+            self.models.pop(name, None)
+            self.load_times.pop(name, None)
+
+    def get_timings(self):
+        """
+        Seconds spent loading each of the models loaded so far.
+        """
+        return dict(self.load_times)
+
+
+def load_spell_util():
+    from nlm_ingestor.ingestor_utils.spell_utils import SpellUtil
+
+    return SpellUtil()
+
+
+def load_word_splitter():
+    from nlm_ingestor.ingestor_utils.word_splitter import WordSplitter
+
+    return WordSplitter()
+
+
+def load_stop_words():
+    import nltk
+    from nltk.corpus import stopwords
+
+    try:
+        stop_words = set(stopwords.words("english"))
+    except Exception as e:
+        logging.error(e)
+        nltk.download("stopwords")
+        stop_words = set(stopwords.words("english"))
+    stop_words.add("per")
+    return stop_words
+
+
+def load_punkt_abbreviations():
+    from nltk import load
+
+    return load("tokenizers/punkt/{}.pickle".format("english"))._params.abbrev_types
+
+
+models = ModelRegistry()
+models.register("spell_util", load_spell_util)
+models.register("word_splitter", load_word_splitter)
+models.register("stop_words", load_stop_words)
+models.register("punkt_abbreviations", load_punkt_abbreviations)
@@ -1,6 +1,11 @@
 import json
+import mmap
 import re
+import struct
 
+from array import array
+from bisect import bisect_left
+from collections import deque
 from string import punctuation
 from typing import List, Dict
 from unidecode import unidecode
@@ -145,12 +150,19 @@ STOPWORDS_GENE = [
 ]
 special_char_regex = re.compile('[^0-9a-zA-Z]+')
 
+# compiled (memory-mappable) ner dict: magic, version, byte order mark, counts of tokens, nodes, edges and metas,
+# sizes of the token and meta blobs
+BINARY_MAGIC = b"NLMNERDB"
+BINARY_VERSION = 1
+BINARY_HEADER_FORMAT = "=8sIIIIIIqq"
+
 
 class NERDict:
     def __init__(
             self,
     ):
         self.ner_dict = dict()
+        self.matcher = None
 
     def create_ner_dict(self, input_dict: Dict):
         """
@@ -177,23 +189,55 @@ class NERDict:
         for input_str, meta_values in input_dict.items():
             if input_str.strip():
                 NERDict.insert_tokens(input_str, input_str.split(), None, self.ner_dict, self.ner_dict, meta_values)
+        self.matcher = None
 
     def get_ner_dict(self):
         return self.ner_dict
 
+    def get_matcher(self):
+        """
+        Aho-Corasick matcher built from the ner_dict, created on first use
+        """
+        if self.matcher is None:
+            self.matcher = NERMatcher(self.ner_dict)
+        return self.matcher
+
     def load_ner_dict_from_json(self, json_file: str):
         with safe_open(json_file) as read_file:
             self.ner_dict = json.load(read_file)
+        self.matcher = None
 
     def save_ner_dict_to_json(self, json_file: str):
         with safe_open(json_file, 'w') as write_file:
             json.dump(self.ner_dict, write_file, indent=2)
 
+    def load_ner_dict_from_binary(self, binary_file: str):
+        """
+        Memory-map a ner dict compiled with save_ner_dict_to_binary or convert_json_to_binary.
+        Only the matcher is loaded, the nested ner_dict stays empty.
+        """
+        self.ner_dict = dict()
+        self.matcher = MappedNERMatcher(binary_file)
+
+    def save_ner_dict_to_binary(self, binary_file: str):
+        self.get_matcher().save(binary_file)
+
+    def find_keys_in_texts(self, texts: List[str], stop_words: List[str]):
+        """
+        Batch version of find_keys_in_text, returns the list of keys found for each text
+        """
+        stop_words = set(stop_words)
+        matcher = self.get_matcher()
+        return [
+            matcher.find_keys(NERDict.get_input_tokens(text, stop_words)) if text else []
+            for text in texts
+        ]
+
     def find_keys_in_text(self, text: str, stop_words: List[str]):
         list_of_keys = []
         if text:
-            input_list = [i for i in text.split() if i[0].lower() + i[1:] not in stop_words]
-            list_of_keys = self.lookup_keys_in_dict(input_list, self.ner_dict, [], list_of_keys)
+            input_list = NERDict.get_input_tokens(text, set(stop_words))
+            list_of_keys = self.get_matcher().find_keys(input_list)
             # Special case for Pathways
             '''
             # Commenting out the pathway detection as there is a division by Zero in 
@@ -226,6 +270,10 @@ class NERDict:
             '''
         return list_of_keys
 
+    @staticmethod
+    def get_input_tokens(text: str, stop_words):
+        return [i for i in text.split() if i[0].lower() + i[1:] not in stop_words]
+
     def lookup_keys_in_dict(
             self,
             token_list: List[str],
@@ -233,32 +281,26 @@ class NERDict:
             token_cache: List[str],
             list_of_keys: List[Dict]
     ):
+        """
+        Greedy walk of the nested ner_dict, one token at a time.
+        Kept for callers that rely on its results, find_keys_in_text uses the NERMatcher.
+        """
         if not list_of_keys:
             list_of_keys = []
 
-        if not token_list:  # Nothing more to check for.
-            if token_cache:
-                if not lookup_dict.get("synonyms", True) and not lookup_dict.get("ner_dict", True):
-                    list_of_keys += [
-                        {
-                            'result': " ".join(token_cache),
-                            'meta': lookup_dict.get("meta", {}),
-                        }
-                    ]
-                token_cache = []
-            return list_of_keys
-        else:  # There are tokens in the list worth our Attention.
-            # Retrieve the first token
-            token = NERDict.preprocess_token(token_list[0])
+        idx = 0
+        while idx < len(token_list):  # There are tokens in the list worth our Attention.
+            # Retrieve the current token
+            token = NERDict.preprocess_token(token_list[idx])
             token_struct = lookup_dict.get(token, None)
             if token_struct:  # We have a match in the dictionary lookup
-                if token in token_struct["synonyms"]:  #token_list[0] in token_struct["synonyms"]:  # We have a match in the synonyms
-                    token_cache.append(token_list[0].rstrip(punctuation))
+                if token in token_struct["synonyms"]:  # We have a match in the synonyms
+                    token_cache.append(token_list[idx].rstrip(punctuation))
                     lookup_dict = token_struct["ner_dict"]
-                token_list = token_list[1:]
+                idx += 1
             else:  # Not Present in the dictionary
                 if token_cache:
-                    if not lookup_dict.get("synonyms", True) and not lookup_dict.get("ner_dict", True):
+                    if NERDict.is_terminal(lookup_dict):
                         list_of_keys += [
                             {
                                 'result': " ".join(token_cache),
@@ -268,8 +310,20 @@ class NERDict:
                     token_cache = []
                 lookup_dict = self.ner_dict
                 if not lookup_dict.get(token, None):
-                    token_list = token_list[1:]
-            return self.lookup_keys_in_dict(token_list, lookup_dict, token_cache, list_of_keys)
+                    idx += 1
+        # Nothing more to check for.
+        if token_cache and NERDict.is_terminal(lookup_dict):
+            list_of_keys += [
+                {
+                    'result': " ".join(token_cache),
+                    'meta': lookup_dict.get("meta", {}),
+                }
+            ]
+        return list_of_keys
+
+    @staticmethod
+    def is_terminal(lookup_dict: Dict):
+        return not lookup_dict.get("synonyms", True) and not lookup_dict.get("ner_dict", True)
 
     @staticmethod
     def insert_tokens(
@@ -363,3 +417,276 @@ class NERDict:
     def contains_letter_and_number(text: str):
         return text.isalnum() and not text.isalpha() and not text.isdigit()
 
+
+class NERMatcher:
+    """
+    Aho-Corasick automaton over the token ids of a nested ner_dict.
+    Finds all the dictionary entries in a token list in a single pass and
+    keeps the leftmost longest non overlapping ones.
+    """
+    def __init__(self, ner_dict: Dict = None):
+        # token (as preprocessed by NERDict.preprocess_token) -> token id
+        self.token_ids = {}
+        # per node: token id -> child node, failure link and depth
+        self.children = [{}]
+        self.fail = [0]
+        self.depth = [0]
+        # per node: index in metas for terminal nodes (-1 if not terminal)
+        self.meta_ids = [-1]
+        self.metas = []
+        # nearest terminal node reachable through the failure links (-1 if none)
+        self.output = [-1]
+        if ner_dict is not None:
+            self.build_trie(ner_dict)
+            self.build_links()
+
+    def get_token_id(self, token: str):
+        return self.token_ids.get(token, -1)
+
+    def get_child(self, node: int, token_id: int):
+        return self.children[node].get(token_id, 0)
+
+    def get_meta(self, node: int):
+        return self.metas[self.meta_ids[node]]
+
+    def add_node(self, parent: int, token: str):
+        token_id = self.token_ids.setdefault(token, len(self.token_ids))
+        node = len(self.children)
+        self.children[parent][token_id] = node
+        self.children.append({})
+        self.fail.append(0)
+        self.depth.append(self.depth[parent] + 1)
+        self.meta_ids.append(-1)
+        self.output.append(-1)
+        return node
+
+    def build_trie(self, ner_dict: Dict):
+        stack = [(0, ner_dict)]
+        while stack:
+            parent, lookup_dict = stack.pop()
+            for token, token_struct in lookup_dict.items():
+                # skip the terminal markers (synonyms, ner_dict, meta) stored next to the child tokens
+                if not isinstance(token_struct, dict) or "synonyms" not in token_struct:
+                    continue
+                if token not in token_struct["synonyms"]:
+                    continue
+                node = self.add_node(parent, token)
+                child_dict = token_struct["ner_dict"]
+                if NERDict.is_terminal(child_dict):
+                    self.meta_ids[node] = len(self.metas)
+                    self.metas.append(child_dict.get("meta", {}))
+                stack.append((node, child_dict))
+
+    def build_links(self):
+        queue = deque(self.children[0].values())
+        while queue:
+            node = queue.popleft()
+            fail_node = self.fail[node]
+            self.output[node] = fail_node if self.meta_ids[fail_node] >= 0 else self.output[fail_node]
+            for token_id, child in self.children[node].items():
+                state = fail_node
+                while state and token_id not in self.children[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.children[state].get(token_id, 0)
+                queue.append(child)
+
+    def find_matches(self, token_list: List[str]):
+        """
+        Returns a list with, for each token position, the (end, node) of the longest match starting there
+        """
+        longest = [None] * len(token_list)
+        fail, depth, output, meta_ids = self.fail, self.depth, self.output, self.meta_ids
+        state = 0
+        for idx, token in enumerate(token_list):
+            token_id = self.get_token_id(NERDict.preprocess_token(token))
+            next_state = self.get_child(state, token_id) if token_id >= 0 else 0
+            while state and not next_state:
+                state = fail[state]
+                next_state = self.get_child(state, token_id) if token_id >= 0 else 0
+            state = next_state
+            node = state if meta_ids[state] >= 0 else output[state]
+            while node > 0:
+                start = idx + 1 - depth[node]
+                if longest[start] is None or longest[start][0] < idx + 1:
+                    longest[start] = (idx + 1, node)
+                node = output[node]
+        return longest
+
+    def find_keys(self, token_list: List[str]):
+        list_of_keys = []
+        longest = self.find_matches(token_list)
+        idx = 0
+        while idx < len(token_list):
+            if longest[idx] is None:
+                idx += 1
+                continue
+            end, node = longest[idx]
+            list_of_keys.append(
+                {
+                    'result': " ".join(token.rstrip(punctuation) for token in token_list[idx:end]),
+                    'meta': self.get_meta(node),
+                }
+            )
+            idx = end
+        return list_of_keys
+
+    def find_keys_in_batch(self, token_lists: List[List[str]]):
+        return [self.find_keys(token_list) for token_list in token_lists]
+
+    def save(self, binary_file: str):
+        """
+        Write the automaton in the compact binary format read by MappedNERMatcher.
+        Token ids are renumbered in the (utf-8) sorted order of the tokens so that they can be
+        looked up with a binary search, and the children of each node are sorted by token id.
+        """
+        tokens = sorted(self.token_ids, key=lambda token: token.encode("utf-8"))
+        new_ids = {self.token_ids[token]: idx for idx, token in enumerate(tokens)}
+        token_blobs = [token.encode("utf-8") for token in tokens]
+        token_offsets = array("q", [0])
+        for blob in token_blobs:
+            token_offsets.append(token_offsets[-1] + len(blob))
+
+        edge_offsets = array("i", [0])
+        edge_tokens = array("i")
+        edge_targets = array("i")
+        for children in self.children:
+            for token_id, child in sorted((new_ids[token_id], child) for token_id, child in children.items()):
+                edge_tokens.append(token_id)
+                edge_targets.append(child)
+            edge_offsets.append(len(edge_tokens))
+
+        meta_blobs = [json.dumps(meta).encode("utf-8") for meta in self.metas]
+        meta_offsets = array("q", [0])
+        for blob in meta_blobs:
+            meta_offsets.append(meta_offsets[-1] + len(blob))
+
+        sections = [
+            token_offsets,
+            b"".join(token_blobs),
+            edge_offsets,
+            edge_tokens,
+            edge_targets,
+            array("i", self.fail),
+            array("i", self.depth),
+            array("i", self.output),
+            array("i", self.meta_ids),
+            meta_offsets,
+            b"".join(meta_blobs),
+        ]
+        header = struct.pack(
+            BINARY_HEADER_FORMAT,
+            BINARY_MAGIC,
+            BINARY_VERSION,
+            1,
+            len(tokens),
+            len(self.children),
+            len(edge_tokens),
+            len(self.metas),
+            token_offsets[-1],
+            meta_offsets[-1],
+        )
+        with safe_open(binary_file, "wb") as write_file:
+            write_file.write(header)
+            position = len(header)
+            for section in sections:
+                padding = -position % 8
+                write_file.write(b"\0" * padding)
+                data = section.tobytes() if isinstance(section, array) else section
+                write_file.write(data)
+                position += padding + len(data)
+
+
+class _SortedTokens:
+    """
+    Sequence view over the sorted token blob, used to binary search the token ids
+    """
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        return self.blob[self.offsets[idx]:self.offsets[idx + 1]].tobytes()
+
+
+class MappedNERMatcher(NERMatcher):
+    """
+    NERMatcher backed by a memory-mapped binary file written by NERMatcher.save.
+    Loading only maps the file, the arrays are shared across processes through the page cache.
+    """
+    def __init__(self, binary_file: str):
+        super().__init__()
+        with safe_open(binary_file, "rb") as read_file:
+            self.mmap = mmap.mmap(read_file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.mmap)
+        (
+            magic, version, byte_order_mark, n_tokens, n_nodes, n_edges, n_metas, token_blob_size, meta_blob_size,
+        ) = struct.unpack_from(BINARY_HEADER_FORMAT, view)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"{binary_file} is not a compiled ner dict (version {BINARY_VERSION})")
+        if byte_order_mark != 1:
+            raise ValueError(f"{binary_file} was compiled on a machine with a different byte order")
+
+        position = struct.calcsize(BINARY_HEADER_FORMAT)
+
+        def section(n_bytes, item_format=None):
+            nonlocal position
+            position += -position % 8
+            data = view[position:position + n_bytes]
+            position += n_bytes
+            return data.cast(item_format) if item_format else data
+
+        token_offsets = section(8 * (n_tokens + 1), "q")
+        token_blob = section(token_blob_size)
+        self.edge_offsets = section(4 * (n_nodes + 1), "i")
+        self.edge_tokens = section(4 * n_edges, "i")
+        self.edge_targets = section(4 * n_edges, "i")
+        self.fail = section(4 * n_nodes, "i")
+        self.depth = section(4 * n_nodes, "i")
+        self.output = section(4 * n_nodes, "i")
+        self.meta_ids = section(4 * n_nodes, "i")
+        self.meta_offsets = section(8 * (n_metas + 1), "q")
+        self.meta_blob = section(meta_blob_size)
+        self.sorted_tokens = _SortedTokens(token_offsets, token_blob)
+        self.children = None
+        self.metas = None
+
+    def get_token_id(self, token: str):
+        token = token.encode("utf-8")
+        idx = bisect_left(self.sorted_tokens, token)
+        if idx < len(self.sorted_tokens) and self.sorted_tokens[idx] == token:
+            return idx
+        return -1
+
+    def get_child(self, node: int, token_id: int):
+        start, end = self.edge_offsets[node], self.edge_offsets[node + 1]
+        idx = bisect_left(self.edge_tokens, token_id, start, end)
+        if idx < end and self.edge_tokens[idx] == token_id:
+            return self.edge_targets[idx]
+        return 0
+
+    def save(self, binary_file: str):
+        with safe_open(binary_file, "wb") as write_file:
+            write_file.write(self.mmap)
+
+    def get_meta(self, node: int):
+        meta_id = self.meta_ids[node]
+        start, end = self.meta_offsets[meta_id], self.meta_offsets[meta_id + 1]
+        return json.loads(self.meta_blob[start:end].tobytes())
+
+
+def convert_json_to_binary(json_file: str, binary_file: str):
+    """
+    Compile a ner_dict JSON file (as written by NERDict.save_ner_dict_to_json) to the binary format
+    """
+    ner_dict = NERDict()
+    ner_dict.load_ner_dict_from_json(json_file)
+    ner_dict.save_ner_dict_to_binary(binary_file)
+
+
+if __name__ == "__main__":
+    import sys
+
+    convert_json_to_binary(sys.argv[1], sys.argv[2])
@@ -1,39 +1,100 @@
+import gc
 import logging
 import os
+import pickle
 import string
+import weakref
 
 from symspellpy.symspellpy import SymSpell
 from symspellpy.symspellpy import Verbosity
 
 import nlm_ingestor.ingestor as ingestor
+from nlm_ingestor.ingestion_daemon.config import settings
 from nlm_ingestor.ingestor import patterns
+from nlm_ingestor.ingestor_utils.lru_cache import lru_memoize
 
 logger = logging.getLogger(__name__)
 
+dictionary_path = os.path.join(
+    os.path.dirname(os.path.abspath(ingestor.__file__)),
+    "../ingestor_models/symspell/frequency_dictionary_en_82_765.txt",
+)
+# SymSpell index (deletes and words) built from the dictionary, see build_snapshot
+snapshot_path = os.path.splitext(dictionary_path)[0] + ".pickle"
+max_dictionary_edit_distance = 2
+prefix_length = 7
+snapshot_version = 1
+
+
+def get_snapshot_header():
+    """
+    What a snapshot must have been built from to be used.
+    """
+    return {
+        "snapshot_version": snapshot_version,
+        "max_dictionary_edit_distance": max_dictionary_edit_distance,
+        "prefix_length": prefix_length,
+        "dictionary_size": os.path.getsize(dictionary_path),
+    }
+
 
 class SpellUtil:
-    def __init__(self):
-        self.sym_spell = SymSpell(2, 7)
+    """
+    SymSpell based spell checking and word segmentation.
+    Building the SymSpell index from the dictionary takes a few seconds, so it is loaded from
+    the snapshot at snapshot_path when there is one, and the shared instance is models.get("spell_util").
+    The results of lookup_word, lookup_compound and segment are memoized (up to cache_size terms each,
+    settings.spell_cache_size by default, following its reloads),
+    as the same fragments (running headers, table labels, spaced out titles) come up over and over.
+    """
+    cached_methods = ("lookup_word", "lookup_compound", "segment")
 
-        dictionary_path = os.path.join(
-            os.path.dirname(os.path.abspath(ingestor.__file__)),
-            "../ingestor_models/symspell/frequency_dictionary_en_82_765.txt",
-        )
-        bigram_path = os.path.join(
-            os.path.dirname(os.path.abspath(ingestor.__file__)),
-            "../ingestor_models/symspell/frequency_dictionary_en_82_765.txt",
-        )
+    def __init__(self, snapshot_path=snapshot_path, cache_size=None):
+        if cache_size is None:
+            cache_size = settings.spell_cache_size
+            _resized_on_reload.add(self)
+        for method in self.cached_methods:
+            setattr(self, method, lru_memoize(max_length=cache_size)(getattr(self, method)))
+        self.sym_spell = SymSpell(max_dictionary_edit_distance, prefix_length)
+
+        if snapshot_path and os.path.exists(snapshot_path) and self.load_snapshot(snapshot_path):
+            return
 
+        # there is no bigram dictionary, the unigram dictionary has no bigram lines to load from
         if not self.sym_spell.load_dictionary(
             dictionary_path, term_index=0, count_index=1,
         ):
             logging.error(f"Dictionary file not found: {dictionary_path}")
             return
-        if not self.sym_spell.load_bigram_dictionary(
-            bigram_path, term_index=0, count_index=2,
-        ):
-            logger.error(f"Bigram dictionary file not found: {bigram_path}")
-            return
+
+    def load_snapshot(self, path):
+        """
+        Load the SymSpell index saved by save_snapshot. False if the snapshot is out of date.
+        """
+        try:
+            with open(path, "rb") as f:
+                if pickle.load(f) != get_snapshot_header():
+                    logger.warning(f"SymSpell snapshot {path} is out of date, rebuilding the index")
+                    return False
+                # the index is a few million small objects, don't let the gc walk them while they are created
+                gc_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    return self.sym_spell.load_pickle_stream(f)
+                finally:
+                    if gc_enabled:
+                        gc.enable()
+        except Exception:
+            logger.error(f"Failed to load SymSpell snapshot {path}", exc_info=True)
+            return False
+
+    def save_snapshot(self, path):
+        # write to a temporary file first, other processes may be loading the snapshot
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(get_snapshot_header(), f)
+            self.sym_spell.save_pickle_stream(f)
+        os.replace(tmp_path, path)
 
     def lookup_word(self, input_term):
         max_edit_distance_lookup = 2
@@ -85,3 +146,56 @@ class SpellUtil:
         if is_mixed_case_term:
             corrected_string = string.capwords(corrected_string)
         return corrected_string
+
+    def segment_many(self, input_terms):
+        """
+        segment for each of input_terms, segmenting each distinct term once.
+        """
+        segmented = {}
+        for input_term in input_terms:
+            if input_term not in segmented:
+                segmented[input_term] = self.segment(input_term)
+        return [segmented[input_term] for input_term in input_terms]
+
+    def get_cache_stats(self):
+        """
+        Hits, misses, size and hit rate of the memo of each cached method.
+        """
+        stats = {}
+        for method in self.cached_methods:
+            cache_stats = getattr(self, method).cache.get_stats()
+            stats[method] = {key: cache_stats[key] for key in ["hits", "misses", "size", "hit_rate"]}
+        return stats
+
+    def clear_caches(self):
+        for method in self.cached_methods:
+            getattr(self, method).cache.clear()
+
+    def resize_caches(self, cache_size):
+        for method in self.cached_methods:
+            getattr(self, method).cache.resize(cache_size)
+
+
+# the SpellUtils sized by settings.spell_cache_size
+_resized_on_reload = weakref.WeakSet()
+
+
+def resize_spell_caches(settings):
+    for spell_util in list(_resized_on_reload):
+        spell_util.resize_caches(settings.spell_cache_size)
+
+
+settings.on_reload(resize_spell_caches)
+
+
+def build_snapshot(path=snapshot_path):
+    """
+    Build the SymSpell index from the dictionary and save it to path.
+    """
+    SpellUtil(snapshot_path=None).save_snapshot(path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_snapshot()
+    logger.info(f"Saved SymSpell snapshot to {snapshot_path}")
@@ -2,11 +2,11 @@ import json
 import re
 
 import numpy as np
-from nltk import load
 from nltk import PunktSentenceTokenizer
 
-
-nltk_abbs = load("tokenizers/punkt/{}.pickle".format("english"))._params.abbrev_types
+from nlm_ingestor.ingestion_daemon.config import settings
+from nlm_ingestor.ingestor_utils.lru_cache import lru_memoize
+from nlm_ingestor.ingestor_utils.model_registry import models
 
 
 class NpEncoder(json.JSONEncoder):
@@ -52,34 +52,42 @@ nlm_special_abbs = {
     "inc",
 }
 
-abbs = nltk_abbs | nlm_abbs
-
 nltk_tokenzier = PunktSentenceTokenizer()
 
-rules = []
 
-for abb in abbs:
-    # match start of the sentence
-    pattern = fr"^{abb}.\s"
-    replaced = f"{abb}_ "
+def build_abbreviation_rules():
+    """
+    Replacements protecting the abbreviations (nltk punkt's and ours) from the sentence tokenizer.
+    """
+    rules = []
+    abbs = models.get("punkt_abbreviations") | nlm_abbs
+
+    for abb in abbs:
+        # match start of the sentence
+        pattern = fr"^{abb}.\s"
+        replaced = f"{abb}_ "
+
+        # case insensitive replacement for synonyms
+        rule = re.compile(pattern, re.IGNORECASE)
+        rules.append((rule, replaced))
 
-    # case insensitive replacement for synonyms
-    rule = re.compile(pattern, re.IGNORECASE)
-    rules.append((rule, replaced))
+        # match token in sentence
+        pattern = fr"\s{abb}.\s"
+        replaced = f" {abb}_ "
 
-    # match token in sentence
-    pattern = fr"\s{abb}.\s"
-    replaced = f" {abb}_ "
+        # case insensitive replacement for synonyms
+        rule = re.compile(pattern, re.IGNORECASE)
+        rules.append((rule, replaced))
 
-    # case insensitive replacement for synonyms
-    rule = re.compile(pattern, re.IGNORECASE)
-    rules.append((rule, replaced))
+    for abb in nlm_special_abbs:
+        pattern = fr"{abb}\."
+        replaced = f"{abb}_"
+        rule = re.compile(pattern, re.IGNORECASE)
+        rules.append((rule, replaced))
+    return rules
 
-for abb in nlm_special_abbs:
-    pattern = fr"{abb}\."
-    replaced = f"{abb}_"
-    rule = re.compile(pattern, re.IGNORECASE)
-    rules.append((rule, replaced))
+
+models.register("abbreviation_rules", build_abbreviation_rules)
 
 # match content inside brackets
 # (?<=\() ==> starts with "("
@@ -93,7 +101,13 @@ quotation_pattern = re.compile(r'[”“"‘’\']')
 def sent_tokenize(org_texts):
     if not org_texts:
         return org_texts
+    # callers modify the returned list
+    return list(tokenize_sents(org_texts))
+
 
+# the same block texts are tokenized several times while a document is processed
+@lru_memoize(max_length=settings.sent_cache_size, max_bytes=settings.sent_cache_bytes)
+def tokenize_sents(org_texts):
     sents = []
 
     # in case org_texts has \n, break it into multiple paragraph
@@ -114,7 +128,7 @@ def sent_tokenize(org_texts):
                 f"({span})", f"_{span.replace('.','_')}_",
             )
 
-        for rule, replaced in rules:
+        for rule, replaced in models.get("abbreviation_rules"):
             modified_text = rule.sub(replaced, modified_text)
         # Normalize all the quotation.
         modified_text = quotation_pattern.sub("\"", modified_text)
@@ -138,7 +152,14 @@ def sent_tokenize(org_texts):
         sents[1] = sents[0] + " " + sents[1]
         sents = sents[1:]
 
-    return sents
+    return tuple(sents)
+
+
+def resize_sent_cache(settings):
+    tokenize_sents.cache.resize(settings.sent_cache_size, settings.sent_cache_bytes)
+
+
+settings.on_reload(resize_sent_cache)
 
 
 def divide_list_into_chunks(lst, n):
@@ -2,15 +2,17 @@ import os
 import re
 from math import log
 
-import nlm_ingestor.ingestor as ingestor
 from nlm_ingestor.ingestor_utils.utils import safe_open
 
-word_file = os.path.join(
-    os.path.dirname(os.path.abspath(ingestor.__file__)), "../ingestor_utils/words.txt",
-)
+word_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.txt")
+split_pattern = re.compile("[^a-zA-Z0-9'’,.$%()/-]+")
 
 
 class WordSplitter:
+    """
+    Splits text with missing spaces into words, picking the most likely words assuming Zipf's law
+    for the words in word_file. Get the shared instance with models.get("word_splitter").
+    """
     def __init__(self, word_file=word_file):
         # Build a cost dictionary, assuming Zipf's law and cost = -math.log(probability).
         with safe_open(word_file) as f:
@@ -32,36 +34,57 @@ class WordSplitter:
             self._word2cost["’s"] = 1
             self._word2cost["'s"] = 1
             self._maxword = max(len(x) for x in words)
+            # the prefixes of words which aren't words themselves, to stop looking for longer words early
+            self._prefixes = {k[:i] for k in self._word2cost for i in range(1, len(k))}
+            self._prefixes.difference_update(self._word2cost)
 
     def split(self, s):
         # Dynamic programming
-        line = [self._split(x) for x in re.compile("[^a-zA-Z0-9'’,.$%()/-]+").split(s)]
+        line = [self._split(x) for x in split_pattern.split(s)]
         result = [item for sublist in line for item in sublist]
         return result
 
-    def _split(self, s):
-        # find the best match for the i first characters, assuming cost has
-        # been built for the i-1 first characters.
-        # returns a pair (match_cost, match_length).
-        def best_match(i):
-            candidates = enumerate(reversed(cost[max(0, i - self._maxword) : i]))
-            return min(
-                (c + self._word2cost.get(s[i - k - 1 : i].lower(), 9e999), k + 1)
-                for k, c in candidates
-            )
+    def get_best_matches(self, s):
+        """
+        The best match for the i first characters of s, as match_costs[i] and match_lengths[i]: the one with
+        the lowest cost, and the shortest one for the same cost. When no word ends at i, it is (inf, 1).
+        """
+        # s only holds the characters kept by split, so it can be lowered as a whole
+        s = s.lower()
+        word2cost = self._word2cost
+        prefixes = self._prefixes
+        n = len(s)
+        match_costs = [9e999] * (n + 1)
+        match_costs[0] = 0
+        match_lengths = [1] * (n + 1)
+        match_lengths[0] = 0
+        # extend the best match for the i first characters with each of the words starting at i.
+        # For a given end, later starts give shorter matches, so they win ties.
+        for i in range(n):
+            cost = match_costs[i]
+            if cost == 9e999:
+                continue
+            for end in range(i + 1, min(n, i + self._maxword) + 1):
+                word = s[i:end]
+                word_cost = word2cost.get(word, None)
+                if word_cost is None:
+                    if word in prefixes:
+                        continue
+                    break
+                word_cost += cost
+                if word_cost <= match_costs[end]:
+                    match_costs[end] = word_cost
+                    match_lengths[end] = end - i
+        return match_costs, match_lengths
 
-        # build the cost list
-        cost = [0]
-        for i in range(1, len(s) + 1):
-            c, k = best_match(i)
-            cost.append(c)
+    def _split(self, s):
+        _, match_lengths = self.get_best_matches(s)
 
         # backtrack to recover the minimal-cost string.
         out = []
         i = len(s)
         while i > 0:
-            c, k = best_match(i)
-            assert c == cost[i]
+            k = match_lengths[i]
             # handle digits, apostrophes, commas and brackets
             newToken = True
             if (not s[i - k : i] == "'") and (
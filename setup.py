@@ -33,6 +33,10 @@ setup(
         "boto3==1.34.79",
         "html5lib==1.1"
     ],
+    extras_require={
+        # Arrow / Parquet export of the blocks, see ingestor/visual_ingestor/columnar_export.py
+        "arrow": ["pyarrow==15.0.2"],
+    },
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Development Status :: 1 - Planning',
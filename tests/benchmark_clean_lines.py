@@ -0,0 +1,78 @@
+import argparse
+import random
+import xml.etree.ElementTree as ET
+from timeit import default_timer
+
+from nlm_ingestor.ingestor import processors
+
+# boilerplate that repeats in real documents (running headers, footers, labels)
+boilerplate_lines = [
+    "CONFIDENTIAL OFFERING MEMORANDUM",
+    "Page {n} of 250",
+    "TOTAL SOURCES $120,000,000 100.00% $370,370",
+    "Hard Costs 60,750,000 50.63% $187,500",
+    "e x e c u t i v e  s u m m a r y",
+]
+para_lines = [
+    "Cushman & Wakefield Equity, Debt & Structured Finance has been exclusively retained by a joint",
+    "venture of Stillman Development International and Daishin Securities to arrange a ${n} million",
+    "construction loan for the redevelopment of the former Times Square Theater.",
+    "• The property is located at {n} West 42nd Street",
+    "1. Section {n} Definitions",
+    "continued demand for this type of condominium product in Manhattan.",
+]
+
+
+def make_text_lines(n_lines, seed=0):
+    rnd = random.Random(seed)
+    lines = []
+    while len(lines) < n_lines:
+        for line in para_lines:
+            lines.append(line.format(n=rnd.randint(1, 100000)))
+        lines.append(rnd.choice(boilerplate_lines).format(n=len(lines)))
+    return lines[:n_lines]
+
+
+def make_xml_elements(n_lines, seed=0):
+    rnd = random.Random(seed)
+    root = ET.Element("filing")
+    n_added = 0
+    while n_added < n_lines:
+        record = ET.SubElement(root, "record", {"id": str(n_added)})
+        for tag in ["name", "address", "description"]:
+            child = ET.SubElement(record, tag)
+            child.text = "\n".join(
+                line.format(n=rnd.randint(1, 100000)) for line in rnd.sample(para_lines, 2)
+            )
+            n_added += 2
+    return [child.text for child in root.iter() if child.text and len(list(child)) == 0]
+
+
+def run_text(lines, repeat):
+    start = default_timer()
+    for _ in range(repeat):
+        processors.clean_lines(lines)
+    return len(lines) * repeat / (default_timer() - start)
+
+
+def run_xml(texts, repeat):
+    n_lines = 0
+    start = default_timer()
+    for _ in range(repeat):
+        for text in texts:
+            lines = text.split("\n")
+            processors.clean_lines(lines, xml=True)
+            n_lines += len(lines)
+    return n_lines / (default_timer() - start)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="clean_lines throughput benchmark")
+    arg_parser.add_argument("--lines", type=int, default=200000, help="number of lines per input")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="number of passes over each input")
+    args = arg_parser.parse_args()
+
+    text_lines = make_text_lines(args.lines)
+    print(f"text: {run_text(text_lines, args.repeat):,.0f} lines/second")
+    xml_texts = make_xml_elements(args.lines)
+    print(f"xml: {run_xml(xml_texts, args.repeat):,.0f} lines/second")
@@ -0,0 +1,40 @@
+import argparse
+import subprocess
+import sys
+from timeit import default_timer
+
+from nlm_ingestor.ingestor_utils.model_registry import models
+
+modules = [
+    "nlm_ingestor.ingestor_utils.utils",
+    "nlm_ingestor.ingestor.line_parser",
+    "nlm_ingestor.ingestor.processors",
+    "nlm_ingestor.ingestor.ingestor_api",
+]
+
+
+def time_import(module):
+    """
+    Seconds taken to import module in a fresh interpreter.
+    """
+    code = f"from timeit import default_timer; start = default_timer(); import {module}; print(default_timer() - start)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return float(output.split()[-1])
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Import time of the ingestor and first use time of its models")
+    arg_parser.add_argument("--runs", type=int, default=3, help="number of imports of each module")
+    args = arg_parser.parse_args()
+
+    for module in modules:
+        elapsed = min(time_import(module) for _ in range(args.runs))
+        print(f"import {module}: {elapsed:.2f}s")
+
+    import nlm_ingestor.ingestor.ingestor_api  # noqa: F401
+
+    start = default_timer()
+    models.warm()
+    print(f"warm all models: {default_timer() - start:.2f}s")
+    for name, elapsed in models.get_timings().items():
+        print(f"  {name}: {elapsed:.3f}s")
@@ -0,0 +1,59 @@
+import argparse
+import gc
+import resource
+import sys
+import tracemalloc
+from timeit import default_timer
+
+from nlm_ingestor.ingestor.visual_ingestor import visual_ingestor
+from tests.synthetic_pages import make_pages
+
+
+def get_deep_size(obj, seen):
+    """
+    Size of obj and of the containers and strings it references, each object counted once.
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(get_deep_size(k, seen) + get_deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(get_deep_size(item, seen) for item in obj)
+    return size
+
+
+def run(n_pages):
+    """
+    Parse a synthetic document and report the memory retained by the Doc, and how much of it is
+    the dicts of its blocks and visual lines themselves (the shells a __slots__ record would shrink)
+    rather than their values, the line_parser copies of the lines in particular.
+    """
+    visual_ingestor.PROGRESS_DEBUG = False
+    pages = make_pages(n_pages=n_pages)
+    gc.collect()
+    tracemalloc.start()
+    start = default_timer()
+    doc = visual_ingestor.Doc(pages, [], "json")
+    elapsed = default_timer() - start
+    del pages
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    visual_lines = [vl for block in doc.blocks for vl in block["visual_lines"]]
+    shells = sum(sys.getsizeof(block) for block in doc.blocks) + sum(sys.getsizeof(vl) for vl in visual_lines)
+    seen = set()
+    line_parsers = sum(get_deep_size(vl["line_parser"], seen) for vl in visual_lines if "line_parser" in vl)
+    print(f"{n_pages} pages: {len(doc.blocks):,} blocks, {len(visual_lines):,} visual lines, {elapsed:.1f}s")
+    print(f"  retained {retained / 2 ** 20:,.1f} MiB, peak {peak / 2 ** 20:,.1f} MiB, max RSS {max_rss / 2 ** 10:,.1f} MiB")
+    print(f"  block and visual line dicts {shells / 2 ** 20:,.1f} MiB, line_parser copies {line_parsers / 2 ** 20:,.1f} MiB")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Memory held by the blocks and visual lines of a Doc")
+    arg_parser.add_argument("--pages", type=int, default=100, help="number of pages in the synthetic document")
+    args = arg_parser.parse_args()
+    run(args.pages)
@@ -0,0 +1,260 @@
+"""
+Offline benchmark and regression check of the ingestors on the checked-in golden corpus.
+
+tests/golden/fixtures has tika's xhtml for PDFs (the text layer of a report with tables, a two column
+page and a scan with its hOCR, made with tests.synthetic_pages) and an html, markdown, text and xml
+document, so neither tika nor the network is needed. Each case runs the ingestor of its fixture in
+a fresh process, reports the time spent parsing and in the json / html renderers, pages per second
+and peak RSS, and compares the json output with tests/golden/expected/<case>.json.
+
+    python -m tests.benchmark_golden                    # compare with tests/golden/baseline.json
+    python -m tests.benchmark_golden --save-baseline    # after a change known to be good
+    python -m tests.benchmark_golden --update-golden    # after a change of the output known to be good
+
+The exit status is 1 when an output differs from its golden json or a stage is slower than the
+baseline by more than --threshold.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+from collections import defaultdict
+from functools import wraps
+from timeit import default_timer
+
+from nlm_ingestor.file_parser import markdown_parser
+from nlm_ingestor.ingestor import html_ingestor, pdf_ingestor, text_ingestor, xml_ingestor
+from nlm_ingestor.ingestor.visual_ingestor import block_renderer, visual_ingestor
+from nlm_ingestor.ingestor.visual_ingestor.hocr_reader import read_hocr
+from nlm_ingestor.ingestor_utils.utils import NpEncoder
+
+golden_dir = os.path.join(os.path.dirname(__file__), "golden")
+fixtures_dir = os.path.join(golden_dir, "fixtures")
+expected_dir = os.path.join(golden_dir, "expected")
+default_baseline_path = os.path.join(golden_dir, "baseline.json")
+
+# stage timings below this many seconds are too noisy to be compared with the baseline
+min_compared_seconds = 0.01
+
+
+def read_fixture(path):
+    with open(path) as f:
+        return f.read()
+
+
+def run_pdf(path):
+    result = pdf_ingestor.parse_blocks(read_fixture(path), render_format="all")[4]
+    return result[1]["document"]
+
+
+def run_pdf_ocr(path):
+    hocr_doc = read_hocr({"content": read_fixture(path)})
+    result = pdf_ingestor.parse_blocks(hocr_doc, render_format="all")[4]
+    return result[1]["document"]
+
+
+def run_html(path):
+    return html_ingestor.HTMLIngestor(path).json_dict
+
+
+def run_markdown(path):
+    return markdown_parser.MarkdownDocument(path).json_dict
+
+
+def run_text(path):
+    return text_ingestor.TextIngestor(path, {"render_format": "all"}).json_dict
+
+
+def run_xml(path):
+    return xml_ingestor.XMLIngestor(path).json_dict
+
+
+# case -> (fixture, ingestor)
+cases = {
+    "pdf_text": ("pdf_text.xhtml", run_pdf),
+    "pdf_columns": ("pdf_columns.xhtml", run_pdf),
+    "pdf_ocr": ("pdf_ocr.xhtml", run_pdf_ocr),
+    "html": ("sample.html", run_html),
+    "markdown": ("sample.md", run_markdown),
+    "text": ("sample.txt", run_text),
+    "xml": ("sample.xml", run_xml),
+}
+
+# seconds spent in each renderer by the running case
+render_times = defaultdict(float)
+
+
+def timed(stage, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = default_timer()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            render_times[stage] += default_timer() - start
+    wrapper.stage = stage
+    return wrapper
+
+
+def install_render_timers():
+    """
+    Time the renderers into render_times, once per process.
+    """
+    for stage in ["render_json", "render_html"]:
+        render = getattr(block_renderer.BlockRenderer, stage)
+        if getattr(render, "stage", None) != stage:
+            setattr(block_renderer.BlockRenderer, stage, timed(stage, render))
+
+
+def count_pages(path):
+    """
+    Page divs in tika's xhtml, 1 for the documents without pages.
+    """
+    if not path.endswith(".xhtml"):
+        return 1
+    return read_fixture(path).count('<div class="page"')
+
+
+def to_json(output):
+    return json.loads(json.dumps(output, cls=NpEncoder))
+
+
+def run_case(case):
+    """
+    Output of the ingestor of case on its fixture, and the seconds spent in each stage.
+    """
+    fixture, ingest = cases[case]
+    install_render_timers()
+    render_times.clear()
+    start = default_timer()
+    output = ingest(os.path.join(fixtures_dir, fixture))
+    total = default_timer() - start
+    timings = {
+        "parse": total - sum(render_times.values()),
+        "render_json": render_times["render_json"],
+        "render_html": render_times["render_html"],
+        "total": total,
+    }
+    return to_json(output), timings
+
+
+def read_golden(case):
+    with open(os.path.join(expected_dir, f"{case}.json")) as f:
+        return json.load(f)
+
+
+def write_golden(case, output):
+    with open(os.path.join(expected_dir, f"{case}.json"), "w") as f:
+        json.dump(output, f, indent=1)
+        f.write("\n")
+
+
+def diff_json(expected, actual, path="$"):
+    """
+    Paths at which actual differs from expected, with the two values.
+    """
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in expected.keys() | actual.keys():
+            if key not in actual:
+                yield f"{path}.{key}: missing"
+            elif key not in expected:
+                yield f"{path}.{key}: unexpected {actual[key]!r:.80}"
+            else:
+                yield from diff_json(expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            yield f"{path}: {len(actual)} items instead of {len(expected)}"
+        for idx, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            yield from diff_json(expected_item, actual_item, f"{path}[{idx}]")
+    elif expected != actual:
+        yield f"{path}: {actual!r:.80} instead of {expected!r:.80}"
+
+
+def measure_case(case, runs, update_golden):
+    """
+    Best timings of case over runs, its pages, the peak RSS of this process in MiB and the
+    differences of its output with the golden json.
+    """
+    visual_ingestor.PROGRESS_DEBUG = False
+    best_timings = None
+    for _ in range(runs):
+        output, timings = run_case(case)
+        if best_timings is None:
+            best_timings = timings
+        else:
+            best_timings = {stage: min(best_timings[stage], seconds) for stage, seconds in timings.items()}
+    if update_golden:
+        write_golden(case, output)
+        diffs = []
+    else:
+        diffs = list(diff_json(read_golden(case), output))
+    return {
+        "timings": best_timings,
+        "pages": count_pages(os.path.join(fixtures_dir, cases[case][0])),
+        "max_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "diffs": diffs,
+    }
+
+
+def find_regressions(results, baseline, threshold):
+    regressions = []
+    for case, result in results.items():
+        if case not in baseline:
+            continue
+        for stage, seconds in result["timings"].items():
+            base_seconds = baseline[case]["timings"].get(stage, 0.0)
+            if seconds > max(base_seconds, min_compared_seconds) * (1 + threshold):
+                regressions.append(f"{case} {stage}: {seconds:.3f}s instead of {base_seconds:.3f}s")
+        base_rss = baseline[case]["max_rss_mib"]
+        if result["max_rss_mib"] > base_rss * (1 + threshold):
+            regressions.append(f"{case} peak RSS: {result['max_rss_mib']:.1f} MiB instead of {base_rss:.1f} MiB")
+    return regressions
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Ingestor benchmark and regression check on the golden corpus")
+    arg_parser.add_argument("--cases", nargs="+", choices=list(cases), default=list(cases), help="cases to run")
+    arg_parser.add_argument("--runs", type=int, default=3, help="runs of each case, the best timings are kept")
+    arg_parser.add_argument("--baseline", default=default_baseline_path, help="json of the baseline timings")
+    arg_parser.add_argument("--threshold", type=float, default=0.25,
+                            help="relative slowdown (or peak RSS growth) over the baseline reported as a regression")
+    arg_parser.add_argument("--save-baseline", action="store_true", help="save these timings as the baseline")
+    arg_parser.add_argument("--update-golden", action="store_true", help="save these outputs as the golden json")
+    arg_parser.add_argument("--case", choices=list(cases), help="run a single case in this process, print its json")
+    args = arg_parser.parse_args()
+
+    if args.case:
+        print(json.dumps(measure_case(args.case, args.runs, args.update_golden)))
+        sys.exit(0)
+
+    results = {}
+    for case in args.cases:
+        # a fresh process per case, so that peak RSS is not shared between the cases
+        command = [sys.executable, "-m", "tests.benchmark_golden", "--case", case, "--runs", str(args.runs)]
+        if args.update_golden:
+            command.append("--update-golden")
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        result = results[case] = json.loads(output.splitlines()[-1])
+        timings = result["timings"]
+        print(f"{case:>12}: parse {timings['parse']:.3f}s, render json {timings['render_json']:.3f}s, "
+              f"render html {timings['render_html']:.3f}s, {result['pages'] / timings['total']:,.1f} pages/s, "
+              f"peak RSS {result['max_rss_mib']:,.1f} MiB")
+        for diff in result["diffs"][:10]:
+            print(f"{'':>14}{diff}")
+
+    failures = [f"{case}: output differs from the golden json" for case, result in results.items() if result["diffs"]]
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            baseline = {case: {key: result[key] for key in ["timings", "pages", "max_rss_mib"]} for case, result in results.items()}
+            json.dump(baseline, f, indent=1)
+        print(f"saved the baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            failures += find_regressions(results, json.load(f), args.threshold)
+    else:
+        print(f"no baseline at {args.baseline}, save one with --save-baseline")
+    for failure in failures:
+        print(f"FAILED {failure}")
+    sys.exit(1 if failures else 0)
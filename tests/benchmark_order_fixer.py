@@ -0,0 +1,41 @@
+import argparse
+from timeit import default_timer
+
+from nlm_ingestor.ingestor.visual_ingestor import order_fixer, visual_ingestor
+from tests.synthetic_pages import make_column_pages
+
+reorder = order_fixer.OrderFixer.reorder
+timings = []
+
+
+def timed_reorder(self):
+    start = default_timer()
+    result = reorder(self)
+    timings.append((len(self.page_blocks), default_timer() - start))
+    return result
+
+
+def run_layout(n_pages, n_columns, blocks_per_column, row_major):
+    """
+    Parse multi-column synthetic pages and report the time spent in OrderFixer.reorder.
+    """
+    timings.clear()
+    pages = make_column_pages(n_pages, n_columns=n_columns, blocks_per_column=blocks_per_column, row_major=row_major)
+    visual_ingestor.Doc(pages, [], "json")
+    n_blocks = max(n for n, _ in timings)
+    elapsed = sum(t for _, t in timings)
+    print(f"{n_columns} columns, {'row' if row_major else 'column'} major: "
+          f"up to {n_blocks:,} blocks a page, reorder {elapsed * 1000 / n_pages:,.1f}ms a page")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="OrderFixer benchmark on pages with 500+ blocks")
+    arg_parser.add_argument("--pages", type=int, default=3, help="number of pages per layout")
+    arg_parser.add_argument("--blocks", type=int, default=200, help="number of blocks in a column")
+    args = arg_parser.parse_args()
+
+    visual_ingestor.PROGRESS_DEBUG = False
+    order_fixer.OrderFixer.reorder = timed_reorder
+    for n_columns in [3, 4]:
+        for row_major in [False, True]:
+            run_layout(args.pages, n_columns, args.blocks, row_major)
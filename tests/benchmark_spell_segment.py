@@ -0,0 +1,64 @@
+import argparse
+import random
+from timeit import default_timer
+
+from nlm_ingestor.ingestor import processors
+from nlm_ingestor.ingestor_utils import spell_utils
+from nlm_ingestor.ingestor_utils.model_registry import models
+from tests.synthetic_pages import make_sentence
+
+boilerplate = [
+    "ACME HOLDINGS CONFIDENTIAL",
+    "A N N U A L  R E P O R T",
+    "C O N S O L I D A T E D  B A L A N C E  S H E E T S",
+    "Total revenue",
+    "Net income",
+    "Page 1 of 10",
+]
+
+
+def make_lines(n_lines, seed):
+    """
+    Lines of a long filing: mostly running headers, spaced out titles and table labels, some text.
+    """
+    rnd = random.Random(seed)
+    lines = []
+    for _ in range(n_lines):
+        if rnd.random() < 0.8:
+            lines.append(rnd.choice(boilerplate))
+        else:
+            lines.append(make_sentence(rnd, rnd.randint(1, 3)))
+    return lines
+
+
+def run(lines, cache_size):
+    """
+    Clean lines the way processors does (spaced characters and first words), with a SpellUtil
+    keeping cache_size results, then segment them again with segment_many.
+    """
+    spell_util = spell_utils.SpellUtil(cache_size=cache_size)
+    models.models["spell_util"] = spell_util
+    start = default_timer()
+    for line in lines:
+        processors.fix_spaced_characters(line)
+        spell_util.segment(line.split(" ")[0])
+    elapsed = default_timer() - start
+    print(f"cache size {cache_size:,}: {elapsed:.2f}s for {len(lines):,} lines")
+    for method, stats in spell_util.get_cache_stats().items():
+        if stats["hits"] + stats["misses"]:
+            print(f"  {method}: {stats['hits']:,} hits, {stats['misses']:,} misses, hit rate {stats['hit_rate']:.0%}")
+
+    spell_util.clear_caches()
+    start = default_timer()
+    spell_util.segment_many([processors.patterns.whitespace.sub("", line) for line in lines])
+    print(f"  segment_many: {default_timer() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="SpellUtil.segment on lines with repeated boilerplate")
+    arg_parser.add_argument("--lines", type=int, default=300, help="number of lines")
+    args = arg_parser.parse_args()
+
+    lines = make_lines(args.lines, 0)
+    run(lines, 0)
+    run(lines, spell_utils.SPELL_CACHE_SIZE)
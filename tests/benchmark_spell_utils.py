@@ -0,0 +1,62 @@
+import argparse
+import os
+import random
+import subprocess
+import sys
+
+from nlm_ingestor.ingestor_utils import spell_utils
+
+load_code = """
+import resource
+from timeit import default_timer
+from nlm_ingestor.ingestor_utils import spell_utils
+
+start = default_timer()
+spell_utils.SpellUtil(snapshot_path={snapshot_path!r})
+elapsed = default_timer() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def time_load(snapshot_path):
+    """
+    Seconds taken by SpellUtil() in a fresh interpreter, and the peak RSS of that interpreter in MB.
+    """
+    code = load_code.format(snapshot_path=snapshot_path)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    elapsed, max_rss = output.split()[-2:]
+    return float(elapsed), int(max_rss) / 1024
+
+
+def make_terms(n_terms, seed):
+    rnd = random.Random(seed)
+    words = list(spell_utils.SpellUtil(snapshot_path=None).sym_spell.words)
+    terms = []
+    for _ in range(n_terms):
+        word = rnd.choice(words)
+        if rnd.random() < 0.5:
+            # misspell it
+            pos = rnd.randrange(len(word))
+            word = word[:pos] + rnd.choice("aeiourst") + word[pos + 1:]
+        terms.append(word)
+    return terms
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="SpellUtil load time and RSS, from the dictionary and the snapshot")
+    arg_parser.add_argument("--terms", type=int, default=2000, help="number of terms to compare the results on")
+    args = arg_parser.parse_args()
+
+    if not os.path.exists(spell_utils.snapshot_path):
+        spell_utils.build_snapshot()
+    for name, snapshot_path in [("dictionary", None), ("snapshot", spell_utils.snapshot_path)]:
+        elapsed, max_rss = time_load(snapshot_path)
+        print(f"load from {name}: {elapsed:.2f}s, peak RSS {max_rss:,.0f}MB")
+
+    terms = make_terms(args.terms, 0)
+    from_dictionary = spell_utils.SpellUtil(snapshot_path=None)
+    from_snapshot = spell_utils.SpellUtil()
+    glued = ["".join(terms[idx:idx + 4]) for idx in range(0, len(terms), 4)]
+    assert [from_dictionary.lookup_word(term) for term in terms] == [from_snapshot.lookup_word(term) for term in terms]
+    assert [from_dictionary.segment(text) for text in glued] == [from_snapshot.segment(text) for text in glued]
+    print(f"same lookup_word and segment results on {len(terms):,} terms")
@@ -0,0 +1,36 @@
+import argparse
+import logging
+from timeit import default_timer
+
+from nlm_ingestor.ingestor.table_parser import TableParser
+from tests.synthetic_pages import make_table_infos
+
+
+def run(n_tables, seed, dataframes):
+    """
+    Resolve n_tables synthetic tables and build their es index, optionally building the DataFrames too.
+    """
+    infos = make_table_infos(n_tables, seed)
+    start = default_timer()
+    tp = TableParser(infos)
+    parsed = default_timer()
+    n_records = 0
+    for table in tp.tables.values():
+        if dataframes:
+            table = table.to_dataframe()
+        es_index, cell_texts = tp.create_es_index(table)
+        n_records += len(es_index) + len(cell_texts)
+    indexed = default_timer()
+    print(f"{len(tp.tables):,} of {n_tables:,} tables{' (as DataFrames)' if dataframes else ''}: "
+          f"resolve {parsed - start:.2f}s, es index {indexed - parsed:.2f}s, {n_records:,} records")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="TableParser benchmark on synthetic tables")
+    arg_parser.add_argument("--tables", type=int, default=10000, help="number of tables")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    run(args.tables, args.seed, False)
+    run(args.tables, args.seed, True)
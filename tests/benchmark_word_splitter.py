@@ -0,0 +1,43 @@
+import argparse
+import random
+from timeit import default_timer
+
+from nlm_ingestor.ingestor_utils.word_splitter import WordSplitter
+
+
+def make_glued_text(words, n_words, seed):
+    """
+    A long string of frequent words, numbers and symbols with no spaces, as extracted from some PDFs.
+    """
+    rnd = random.Random(seed)
+    parts = []
+    for _ in range(n_words):
+        parts.append(rnd.choice(words))
+        if rnd.random() < 0.1:
+            parts.append(rnd.choice(["1,234", "$12", "15%", "(56)", ".", ",", "’s"]))
+    return "".join(parts)
+
+
+def run(n_words, n_texts, seed):
+    start = default_timer()
+    word_splitter = WordSplitter()
+    loaded = default_timer()
+    words = list(word_splitter._word2cost)[:5000]
+    texts = [make_glued_text(words, n_words, seed + i) for i in range(n_texts)]
+    n_chars = sum(len(text) for text in texts)
+    split_start = default_timer()
+    n_tokens = sum(len(word_splitter.split(text)) for text in texts)
+    split_end = default_timer()
+    print(f"load {loaded - start:.2f}s, split {n_texts} texts of {n_chars / n_texts:,.0f} chars "
+          f"into {n_tokens:,} tokens: {split_end - split_start:.2f}s "
+          f"({n_chars / (split_end - split_start):,.0f} chars/s)")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="WordSplitter benchmark on long glued strings")
+    arg_parser.add_argument("--words", type=int, default=2000, help="number of words per string")
+    arg_parser.add_argument("--texts", type=int, default=20, help="number of strings")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    run(args.words, args.texts, args.seed)
@@ -0,0 +1,219 @@
+import random
+
+from bs4 import BeautifulSoup
+
+# Synthetic tika-style xhtml pages for exercising the visual ingestor without a tika server.
+words = (
+    "the company shall provide financial statements and any other report required under this agreement "
+    "including revenue growth margin net income cash flow borrower lender property loan interest rate"
+).split()
+
+
+def p_tag(text, top, left, size=10.0, family="Times", weight="normal", space_width=2.5):
+    starts, ends, fonts = [], [], []
+    x = left
+    for word in text.split():
+        x_end = x + len(word) * size * 0.5
+        starts.append(f"({x:.2f},{top:.2f},{size},{weight})")
+        ends.append(f"({x_end:.2f},{top:.2f},{size},{weight})")
+        fonts.append(f"({family},{weight},normal,{size},0,{space_width})")
+        x = x_end + space_width
+    style = (
+        f"top:{top:.2f}px;font-size:{size}px;font-family:{family};font-style:normal;font-weight:{weight};"
+        f"word-start-positions:[{', '.join(starts)}];word-end-positions:[{', '.join(ends)}];"
+        f"word-fonts:[{', '.join(fonts)}]"
+    )
+    return f'<p style="{style}">{text}</p>'
+
+
+def make_sentence(rnd, n_words):
+    return " ".join(rnd.choice(words) for _ in range(n_words))
+
+
+def make_html(n_pages=10, seed=0, tables=True):
+    """
+    Pages with a running header, page numbers, numbered section headers, paragraphs
+    (some continuing on the next page), bulleted lists and, optionally, 3 column tables.
+    """
+    rnd = random.Random(seed)
+    html = ["<html><body>"]
+    section_number = 1
+    for page_idx in range(n_pages):
+        html.append('<div class="page" style="width:612px;height:792px">')
+        html.append(p_tag("ACME HOLDINGS CONFIDENTIAL", 30.0, 200))
+        top = 90.0
+        while top < 660:
+            kind = rnd.random()
+            if kind < 0.15:
+                header = f"{section_number}. {make_sentence(rnd, 3).title()}"
+                html.append(p_tag(header, top, 72, size=12.0, family="Times.B", weight="bold"))
+                section_number += 1
+                top += 20
+            elif kind < 0.3 and tables:
+                for _ in range(rnd.randint(2, 5)):
+                    html.append(p_tag(make_sentence(rnd, 1).title(), top, 72))
+                    html.append(p_tag(f"{rnd.randint(1, 9999):,}", top, 222))
+                    html.append(p_tag(f"{rnd.randint(1, 9999):,}", top, 372))
+                    top += 14
+                top += 10
+            elif kind < 0.4:
+                for _ in range(rnd.randint(2, 4)):
+                    html.append(p_tag(f"• {make_sentence(rnd, rnd.randint(4, 10))}.", top, 80))
+                    top += 14
+                top += 8
+            else:
+                n_lines = rnd.randint(1, 6)
+                for line_idx in range(n_lines):
+                    text = make_sentence(rnd, rnd.randint(8, 12))
+                    if line_idx == n_lines - 1 and rnd.random() < 0.7:
+                        text += "."
+                    html.append(p_tag(text, top, 72))
+                    top += 12
+                top += 10
+        html.append(p_tag(f"{page_idx + 1}", 740.0, 300))
+        html.append("</div>")
+    html.append("</body></html>")
+    return "\n".join(html)
+
+
+def make_column_html(n_pages=1, seed=0, n_columns=3, blocks_per_column=200, row_major=False):
+    """
+    Tall pages laid out in n_columns side by side, each a stack of short paragraphs.
+    Blocks are emitted column by column (every column after the first starts back at the top),
+    or with row_major, a row of blocks across the columns at a time.
+    """
+    rnd = random.Random(seed)
+    column_width = 540 // n_columns
+    html = ["<html><body>"]
+    for page_idx in range(n_pages):
+        html.append(f'<div class="page" style="width:612px;height:{blocks_per_column * 70 + 200}px">')
+        page_blocks = []
+        for column_idx in range(n_columns):
+            left = 36 + column_idx * column_width
+            top = 90.0
+            for block_idx in range(blocks_per_column):
+                n_lines = rnd.randint(4, 5)
+                block = []
+                for line_idx in range(n_lines):
+                    text = make_sentence(rnd, rnd.randint(3, 5))
+                    if line_idx == n_lines - 1:
+                        text += "."
+                    block.append(p_tag(text, top, left))
+                    top += 12
+                top += 10
+                order = (block_idx, column_idx) if row_major else (column_idx, block_idx)
+                page_blocks.append((order, block))
+        for _, block in sorted(page_blocks, key=lambda order_block: order_block[0]):
+            html.extend(block)
+        html.append("</div>")
+    html.append("</body></html>")
+    return "\n".join(html)
+
+
+def to_pages(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.find_all("div", class_=lambda x: x not in ["annotation"])
+
+
+def make_pages(n_pages=10, seed=0, tables=True):
+    return to_pages(make_html(n_pages, seed, tables))
+
+
+def make_column_pages(n_pages=1, seed=0, n_columns=3, blocks_per_column=200, row_major=False):
+    return to_pages(make_column_html(n_pages, seed, n_columns, blocks_per_column, row_major))
+
+
+def make_hocr_html(n_pages=3, seed=0, scale=300 / 72):
+    """
+    Tika output for a scanned PDF: the tesseract hOCR of each page (at scale times the page size)
+    in its page div, with headers, paragraphs and lines with indented first words.
+    """
+    rnd = random.Random(seed)
+    html = ['<html><head><meta name="dc:title" content="Scanned"/></head><body>']
+    for page_idx in range(n_pages):
+        html.append('<div class="page" style="width:612px;height:792px"><div class="ocr">')
+        html.append(f'<div class="ocr_page" title="image;bbox 0 0 {612 * scale:.0f} {792 * scale:.0f}; ppageno {page_idx}">')
+        top = 72.0
+        while top < 700:
+            is_header = rnd.random() < 0.15
+            n_lines = 1 if is_header else rnd.randint(2, 6)
+            size = 14.0 if is_header else 10.0
+            html.append('<div class="ocr_carea"><p class="ocr_par">')
+            for line_idx in range(n_lines):
+                left = 72.0 + (18 if line_idx == 0 and not is_header else 0) + rnd.uniform(-0.5, 0.5)
+                text = make_sentence(rnd, 3 if is_header else rnd.randint(5, 12))
+                if is_header:
+                    text = text.title()
+                x, spans = left, []
+                for word in text.split():
+                    x_end = x + len(word) * size * 0.5
+                    bbox = f"{x * scale:.0f} {top * scale:.0f} {x_end * scale:.0f} {(top + size) * scale:.0f}"
+                    spans.append(f'<span class="ocrx_word" title="bbox {bbox}; x_wconf 95">{word}</span>')
+                    x = x_end + size * 0.3
+                bbox = f"{left * scale:.0f} {top * scale:.0f} {x * scale:.0f} {(top + size) * scale:.0f}"
+                html.append(
+                    f'<span class="ocr_line" title="bbox {bbox}; baseline 0 -3; x_size {size * scale:.0f}; '
+                    f'x_descenders 5; x_ascenders 5">{" ".join(spans)}</span>'
+                )
+                top += size * 1.4
+            html.append("</p></div>")
+            top += 12
+        html.append("</div></div></div>")
+    html.append("</body></html>")
+    return "".join(html)
+
+
+def make_cell(rnd):
+    kind = rnd.random()
+    if kind < 0.35:
+        return f"{rnd.randint(1, 99999):,}"
+    elif kind < 0.45:
+        return rnd.choice(["$ 1,234", "(56)", "12.5%", "N/A", "-", "", " ", "1e3", "nan"])
+    elif kind < 0.55:
+        return str(rnd.randint(1990, 2030))
+    return make_sentence(rnd, rnd.randint(1, 3))
+
+
+def make_table_infos(n_tables=10, seed=0):
+    """
+    Table infos (blocks as passed to ingestor.table_parser.TableParser) of n_tables tables:
+    single and multi-level headers, tables without headers, row groups, ragged rows, empty cells,
+    year and number columns. Each table is preceded by a para.
+    """
+    rnd = random.Random(seed)
+    infos = []
+    for table_idx in range(n_tables):
+        infos.append({"block_text": make_sentence(rnd, 8)})
+        n_cols = rnd.randint(1, 6)
+        table = []
+        header_kind = rnd.random()
+        if header_kind < 0.5:
+            header = [rnd.choice(["", "Total", "2020", "Name (in $)", "Notes:"]) or make_sentence(rnd, 1)
+                      if rnd.random() < 0.7 else "" for _ in range(n_cols)]
+            table.append({"is_header": True, "cell_values": header})
+        elif header_kind < 0.75:
+            col_spans = []
+            while sum(col_spans) < n_cols:
+                col_spans.append(rnd.randint(1, n_cols - sum(col_spans)))
+            table.append({
+                "is_header_group": True,
+                "col_spans": col_spans,
+                "cell_values": [rnd.choice(["", make_sentence(rnd, 1)]) for _ in col_spans],
+            })
+            table.append({"is_header": True, "cell_values": [rnd.choice(["", "2019", "2020"]) for _ in range(n_cols)]})
+        for _ in range(rnd.randint(0, 12)):
+            if rnd.random() < 0.1:
+                table.append({"is_row_group": True, "cell_values": [make_sentence(rnd, 2)]})
+                continue
+            width = n_cols if rnd.random() < 0.9 else rnd.randint(1, n_cols)
+            first_cell = [str(rnd.randint(2000, 2020))] if rnd.random() < 0.2 else []
+            cells = first_cell + [make_cell(rnd) for _ in range(width - len(first_cell))]
+            table.append({"cell_values": cells[:width]})
+        while len(table) < 2:
+            table.append({"cell_values": [make_cell(rnd) for _ in range(n_cols)]})
+        table[0]["is_table_start"] = True
+        table[-1]["is_table_end"] = True
+        for info in table:
+            info["table_idx"] = table_idx
+        infos.extend(table)
+    return infos
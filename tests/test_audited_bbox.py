@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from nlm_ingestor.ingestor.visual_ingestor import visual_ingestor
+from nlm_ingestor.ingestor.visual_ingestor.page_geometry import AuditedBBoxIndex, box_within_bound
+from nlm_ingestor.ingestor_utils.ing_named_tuples import BoxStyle
+from tests.synthetic_pages import p_tag, to_pages
+
+
+class AuditedBBox(dict):
+    """
+    Stand-in for the audited bboxes passed to Doc, read both as bbox.page_idx and bbox["block_type"].
+    """
+    __getattr__ = dict.__getitem__
+
+
+def make_bboxes(rnd, n_pages, n_bboxes):
+    bboxes = []
+    for _ in range(n_bboxes):
+        left, top = rnd.uniform(0, 500), rnd.uniform(0, 750)
+        bboxes.append(AuditedBBox(
+            page_idx=rnd.randrange(n_pages),
+            block_type=rnd.choice(["table", "para", "header"]),
+            bbox=(left, top, left + rnd.uniform(5, 300), top + rnd.uniform(5, 200)),
+        ))
+    return bboxes
+
+
+def make_table_page():
+    html = ['<html><body><div class="page" style="width:612px;height:792px">']
+    html.append(p_tag("The following table shows the revenue of each segment for the year.", 100, 72))
+    for row_idx, name in enumerate(["Segment", "Retail", "Wholesale", "Online", "Total"]):
+        top = 200 + row_idx * 14
+        html.append(p_tag(name, top, 72))
+        html.append(p_tag(f"{row_idx * 1234 + 5:,}", top, 222))
+        html.append(p_tag(f"{row_idx * 999 + 7:,}", top, 372))
+    html.append(p_tag("Revenue grew in every segment during the year and margins improved.", 300, 72))
+    html.append("</div></body></html>")
+    return to_pages("\n".join(html))
+
+
+class AuditedBBoxTest(unittest.TestCase):
+    def test_same_as_scan(self):
+        rnd = random.Random(0)
+        bboxes = make_bboxes(rnd, 3, 900)
+        index = AuditedBBoxIndex(bboxes)
+        n_found = 0
+        for _ in range(3000):
+            page_idx, block_type = rnd.randrange(3), rnd.choice(["table", "para"])
+            left, top = rnd.uniform(0, 600), rnd.uniform(0, 800)
+            box_style = BoxStyle(top, left, left + 100, 100, rnd.uniform(5, 40))
+            expected = next(
+                (bbox for bbox in bboxes if bbox.page_idx == page_idx and bbox["block_type"] == block_type
+                 and box_within_bound(box_style, bbox.bbox)),
+                None,
+            )
+            self.assertIs(index.find_bbox(page_idx, block_type, box_style), expected)
+            n_found += expected is not None
+        self.assertGreater(n_found, 0)
+        self.assertIsNone(index.find_bbox(5, "table", BoxStyle(10, 10, 20, 10, 10)))
+
+    def test_audited_table_rows(self):
+        visual_ingestor.PROGRESS_DEBUG = False
+        audited_bbox = [AuditedBBox(page_idx=0, block_type="table", bbox=(70, 195, 450, 260))]
+        doc = visual_ingestor.Doc(make_table_page(), [], "json", audited_bbox=audited_bbox)
+        audited_blocks = [block for block in doc.blocks if block.get("audited", False)]
+        self.assertEqual(len(audited_blocks), 5)
+        self.assertTrue(all(block["block_type"] == "table_row" for block in audited_blocks))
+        self.assertEqual(audited_blocks[0]["block_text"], "Segment 5 7")
+
+
+if __name__ == "__main__":
+    unittest.main()
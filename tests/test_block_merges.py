@@ -0,0 +1,76 @@
+import unittest
+
+from nlm_ingestor.ingestor.visual_ingestor import visual_ingestor
+from nlm_ingestor.ingestor.visual_ingestor.visual_ingestor import Doc, MergedText, ends_with_sentence_delimiter_pattern
+from nlm_ingestor.ingestor_utils.utils import sent_tokenize
+from tests.synthetic_pages import make_pages
+
+
+def make_doc():
+    visual_ingestor.PROGRESS_DEBUG = False
+    return Doc(make_pages(n_pages=2, seed=3), [], "json")
+
+
+def copy_block(block):
+    return dict(block, visual_lines=list(block["visual_lines"]))
+
+
+class BlockMergeTest(unittest.TestCase):
+    def test_merge_chain(self):
+        doc = make_doc()
+        blocks = [copy_block(block) for block in doc.blocks if block["block_type"] == "para"][:8]
+        self.assertEqual(len(blocks), 8)
+        first_visual_lines = list(blocks[0]["visual_lines"])
+
+        # a chain of 5 merges, then a second chain of 2 merges absorbed by the first one
+        merged = blocks[0]
+        eager_text = blocks[0]["block_text"]
+        eager_visual_lines = list(blocks[0]["visual_lines"])
+        other = doc.merge_block_pair(blocks[5], blocks[6], 5, blocks[5]["page_idx"], "para", blocks[5]["block_class"])
+        other = doc.merge_block_pair(other, blocks[7], 5, other["page_idx"], "para", other["block_class"])
+        other_text = blocks[5]["block_text"]
+        for blk in blocks[6:8]:
+            other_text = other_text + Doc.check_add_space_btw_texts(other_text, blk["block_text"]) + blk["block_text"]
+        for blk in blocks[1:5] + [other]:
+            blk_text = other_text if blk is other else blk["block_text"]
+            merged = doc.merge_block_pair(merged, blk, 0, blk["page_idx"], "para", merged["block_class"])
+            eager_text = eager_text + Doc.check_add_space_btw_texts(eager_text, blk_text) + blk_text
+            eager_visual_lines = eager_visual_lines + blk["visual_lines"]
+
+            self.assertEqual(merged["visual_lines"], eager_visual_lines)
+            self.assertEqual(merged["box_style"], Doc.calc_block_span({"visual_lines": eager_visual_lines}))
+            self.assertEqual(doc.count_block_words(merged), len(eager_text.split()))
+            self.assertEqual(doc.ends_with_sentence_delimiter(merged),
+                             ends_with_sentence_delimiter_pattern.search(eager_text) is not None)
+            self.assertIsNone(merged["block_text"])
+
+        # the list of the first block, which may be shared, is copied rather than extended
+        self.assertEqual(blocks[0]["visual_lines"], first_visual_lines)
+
+        doc.blocks = [merged]
+        doc.finalize_merged_blocks()
+        self.assertEqual(merged["block_text"], eager_text)
+        self.assertEqual(merged["block_sents"], sent_tokenize(eager_text))
+        self.assertEqual(doc.merged_blocks, {})
+
+    def test_merged_text(self):
+        for parts in [
+            ["Revenue grew", "in every segment."],
+            ["see note (", "a) below", " ;  ", "'"],
+            ["Acme", "Inc", ".", " ", "”"],
+            ["words", "", "glued", "together:"],
+            ["", "x", ".", ""],
+        ]:
+            merged_text = MergedText(parts[0])
+            eager_text = parts[0]
+            for text in parts[1:]:
+                merged_text.append(text)
+                eager_text = eager_text + Doc.check_add_space_btw_texts(eager_text, text) + text
+                self.assertEqual(merged_text.word_count, len(eager_text.split()))
+                self.assertEqual(ends_with_sentence_delimiter_pattern.search(merged_text.tail()) is None,
+                                 ends_with_sentence_delimiter_pattern.search(eager_text) is None)
+            self.assertEqual(merged_text.join(), eager_text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+from nlm_ingestor.ingestor.visual_ingestor import visual_ingestor
+from nlm_ingestor.ingestor.visual_ingestor.block_renderer import BlockRenderer
+from tests.test_audited_bbox import make_table_page
+
+# pyarrow comes with the arrow extra
+has_pyarrow = importlib.util.find_spec("pyarrow") is not None
+
+
+def make_doc():
+    visual_ingestor.PROGRESS_DEBUG = False
+    return visual_ingestor.Doc(make_table_page(), [], "json")
+
+
+class ColumnarExportTest(unittest.TestCase):
+    def test_same_as_json(self):
+        doc = make_doc()
+        block_columns, cell_columns = BlockRenderer(doc).render_columns()
+        json_blocks = BlockRenderer(doc).render_json()["blocks"]
+        self.assertEqual(block_columns["block_idx"], [block["block_idx"] for block in json_blocks])
+        self.assertEqual(block_columns["tag"], ["para", "table", "para"])
+        self.assertEqual(block_columns["bbox"], [block["bbox"] for block in json_blocks])
+        self.assertEqual(block_columns["sentences"][0], json_blocks[0]["sentences"])
+
+        table_rows = json_blocks[1]["table_rows"]
+        json_cells = [
+            (row_idx, cell_idx, row["type"], cell["cell_value"])
+            for row_idx, row in enumerate(table_rows)
+            for cell_idx, cell in enumerate(row["cells"])
+        ]
+        self.assertEqual(
+            list(zip(cell_columns["row"], cell_columns["col"], cell_columns["row_type"], cell_columns["value"])),
+            json_cells,
+        )
+        self.assertEqual(set(cell_columns["table_idx"]), {block_columns["block_idx"][1]})
+
+    def test_merged_cell_columns(self):
+        doc = make_doc()
+        # turn the header into a group header whose first cell spans the two value columns
+        header = doc.blocks[1]
+        del header["is_header"]
+        header["is_header_group"] = True
+        header["cell_values"] = ["Sales", "Share"]
+        header["col_spans"] = [2, 1]
+        _, cell_columns = BlockRenderer(doc).render_columns()
+        cells = list(zip(cell_columns["row"], cell_columns["col"], cell_columns["col_span"], cell_columns["value"]))
+        self.assertEqual(cells[:2], [(0, 0, 2, "Sales"), (0, 2, 1, "Share")])
+        self.assertEqual(cells[2:5], [(1, 0, 1, "Retail"), (1, 1, 1, "1,239"), (1, 2, 1, "1,006")])
+
+    @unittest.skipUnless(has_pyarrow, "pyarrow is not installed")
+    def test_to_arrow(self):
+        from nlm_ingestor.ingestor.visual_ingestor.columnar_export import to_arrow
+
+        blocks_table, cells_table = to_arrow(make_doc())
+        self.assertEqual(blocks_table.num_rows, 3)
+        self.assertEqual(cells_table.num_rows, 15)
+        self.assertEqual(cells_table.column("value").to_pylist()[:3], ["Segment", "5", "7"])
+        self.assertEqual(blocks_table.column("tag").to_pylist(), ["para", "table", "para"])
+
+    @unittest.skipUnless(has_pyarrow, "pyarrow is not installed")
+    def test_write_parquet(self):
+        import pyarrow.parquet as pq
+        from nlm_ingestor.ingestor.visual_ingestor.columnar_export import to_arrow, write_parquet
+
+        doc = make_doc()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            blocks_path = os.path.join(tmp_dir, "blocks.parquet")
+            cells_path = os.path.join(tmp_dir, "cells.parquet")
+            write_parquet(doc, blocks_path, cells_path)
+            blocks_table, cells_table = to_arrow(doc)
+            self.assertTrue(pq.read_table(blocks_path).equals(blocks_table))
+            self.assertTrue(pq.read_table(cells_path).equals(cells_table))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import nlm_ingestor.ingestion_daemon.config as cfg
+from nlm_ingestor.ingestor import ingestor_api, processors
+
+
+class SettingsTest(unittest.TestCase):
+    def test_settings(self):
+        settings = cfg.Settings()
+        self.assertEqual(settings.tika_timeout, 3000)
+        self.assertIs(settings.tika_ocr, False)
+        self.assertIsNone(settings.aws_region)
+        with mock.patch.dict(os.environ, {"TIKA_TIMEOUT": " 60 ", "TIKA_OCR": "Yes"}):
+            settings.reload()
+        self.assertEqual((settings.tika_timeout, settings.tika_ocr), (60, True))
+
+        with mock.patch.dict(os.environ, {"TIKA_TIMEOUT": "1m"}):
+            with self.assertRaises(ValueError):
+                settings.reload()
+            with self.assertRaises(ValueError):
+                cfg.Settings()
+        self.assertEqual(settings.tika_timeout, 60)
+
+    def test_bool(self):
+        self.assertTrue(cfg.to_bool("on"))
+        self.assertFalse(cfg.to_bool(" False"))
+        self.assertFalse(cfg.to_bool(0))
+        with self.assertRaises(ValueError):
+            cfg.to_bool("maybe")
+        self.assertTrue(cfg.get_config_as_bool("NOT_A_SETTING", "true"))
+
+    def test_reload(self):
+        try:
+            cfg.set_config("LINE_CACHE_SIZE", 5)
+            self.assertEqual(cfg.settings.line_cache_size, 5)
+            self.assertEqual(processors._line_cache.max_length, 5)
+        finally:
+            cfg.set_config("LINE_CACHE_SIZE", 20000)
+        self.assertEqual(processors._line_cache.max_length, 20000)
+
+        # invalid values are not stored
+        with self.assertRaises(ValueError):
+            cfg.set_config("TIKA_TIMEOUT", "abc")
+        self.assertFalse(cfg.is_config_set("TIKA_TIMEOUT"))
+        cfg.settings.reload()
+
+    def test_config_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "ingestor.env")
+            with open(path, "w") as f:
+                f.write("# tika\nTIKA_TIMEOUT = 90\nTIKA_SERVER_ENDPOINT='http://tika:9998'\n\nRUN_TABLE_DETECTION=yes\n")
+            with mock.patch.dict(os.environ, {cfg.config_file_env: path, "TIKA_TIMEOUT": "60"}):
+                settings = cfg.Settings()
+                # the file takes precedence over the environment
+                self.assertEqual(settings.tika_timeout, 90)
+                self.assertEqual(settings.tika_server_endpoint, "http://tika:9998")
+
+                with open(path, "w") as f:
+                    f.write("RUN_TABLE_DETECTION=yes\nLINE_CACHE_SIZE=7\n")
+                cfg.reload_settings()
+                self.assertEqual(cfg.settings.line_cache_size, 7)
+                self.assertEqual(processors._line_cache.max_length, 7)
+                self.assertIs(ingestor_api.run_table_detection, True)
+
+                # a bad file is logged, the settings are kept
+                with open(path, "w") as f:
+                    f.write("LINE_CACHE_SIZE=20k\n")
+                with self.assertLogs(cfg.logger, "ERROR"):
+                    cfg.reload_settings()
+                self.assertEqual(cfg.settings.line_cache_size, 7)
+            cfg.reload_settings()
+        self.assertEqual(cfg.settings.line_cache_size, 20000)
+        self.assertIs(ingestor_api.run_table_detection, False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import hashlib
+import sys
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from nlm_ingestor.ingestor_utils import de_duplicate_engine
+
+
+class StubEncoder:
+    """
+    Deterministic local replacement of EncoderClient: every text gets a fixed random unit vector
+    """
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, texts):
+        return {"embeddings": [embed(text) for text in texts]}
+
+
+def embed(text, dim=32):
+    seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+    vector = np.random.RandomState(seed).randn(dim)
+    return vector / np.linalg.norm(vector)
+
+
+def make_engine(settings):
+    # the engine imports nlm_utils.model_client when it is created, which needs the network
+    model_client = types.ModuleType("nlm_utils.model_client")
+    model_client.EncoderClient = StubEncoder
+    with mock.patch.dict(sys.modules, {"nlm_utils.model_client": model_client}):
+        return de_duplicate_engine.DeDuplicateEngine(settings)
+
+
+class DeDuplicateEngineTest(unittest.TestCase):
+    settings = [
+        {"level": "block", "text": "Confidential", "ignore_all_after": False},
+        {"level": "block", "text": "Appendix", "ignore_all_after": True},
+        {"level": "sent", "text": "All rights reserved", "ignore_all_after": False},
+    ]
+
+    def test_batch_matches_single(self):
+        engine = make_engine(self.settings)
+        blocks = [
+            {"block": embed("Introduction")},
+            {"block": embed("Confidential"), "sent": embed("Something else")},
+            {"sent": embed("All rights reserved")},
+            {"other_level": embed("Confidential")},
+        ]
+        reports = engine.check_duplicates(blocks)
+        self.assertEqual([report["is_duplicated"] for report in reports], [False, True, True, False])
+        self.assertEqual(reports, [engine.check_duplicate(block) for block in blocks])
+
+    def test_ignore_all_after(self):
+        engine = make_engine(self.settings)
+        blocks = [
+            {"block": embed("Introduction")},
+            {"block": 2.0 * embed("Appendix")},
+            {"block": embed("Terms")},
+        ]
+        reports = engine.check_duplicates(blocks, top_k=2)
+        self.assertEqual(reports[0], {"is_duplicated": False, "ignore_all_after": False})
+        self.assertEqual(reports[1], {"is_duplicated": True, "ignore_all_after": True})
+        self.assertEqual(reports[2], {"is_duplicated": True, "ignore_all_after": True})
+
+    def test_not_inited(self):
+        engine = make_engine([])
+        self.assertEqual(
+            engine.check_duplicates([{"block": embed("Appendix")}]),
+            [{"is_duplicated": False, "ignore_all_after": False}],
+        )
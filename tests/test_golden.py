@@ -0,0 +1,46 @@
+import unittest
+
+from nlm_ingestor.ingestor.visual_ingestor import visual_ingestor
+from tests import benchmark_golden
+
+
+class GoldenTest(unittest.TestCase):
+    def test_outputs(self):
+        visual_ingestor.PROGRESS_DEBUG = False
+        for case in benchmark_golden.cases:
+            with self.subTest(case=case):
+                output, timings = benchmark_golden.run_case(case)
+                diffs = list(benchmark_golden.diff_json(benchmark_golden.read_golden(case), output))
+                self.assertEqual(diffs, [])
+                self.assertGreater(timings["render_json"], 0)
+                if case != "markdown":
+                    # markdown's html comes from mistune
+                    self.assertGreater(timings["render_html"], 0)
+                self.assertGreaterEqual(timings["parse"], 0)
+
+    def test_diff_json(self):
+        expected = {"blocks": [{"tag": "para", "sentences": ["a", "b"]}], "styles": []}
+        self.assertEqual(list(benchmark_golden.diff_json(expected, expected)), [])
+        actual = {"blocks": [{"tag": "header", "sentences": ["a"]}, {}], "title": "t"}
+        self.assertEqual(sorted(benchmark_golden.diff_json(expected, actual)), [
+            "$.blocks: 2 items instead of 1",
+            "$.blocks[0].sentences: 1 items instead of 2",
+            "$.blocks[0].tag: 'header' instead of 'para'",
+            "$.styles: missing",
+            "$.title: unexpected 't'",
+        ])
+
+    def test_find_regressions(self):
+        baseline = {"pdf_text": {"timings": {"parse": 1.0, "render_json": 0.001}, "pages": 6, "max_rss_mib": 100.0}}
+        results = {
+            "pdf_text": {"timings": {"parse": 1.2, "render_json": 0.005}, "pages": 6, "max_rss_mib": 110.0},
+            "xml": {"timings": {"parse": 9.0}, "pages": 1, "max_rss_mib": 500.0},
+        }
+        self.assertEqual(benchmark_golden.find_regressions(results, baseline, 0.25), [])
+        self.assertEqual(benchmark_golden.find_regressions(results, baseline, 0.1), [
+            "pdf_text parse: 1.200s instead of 1.000s",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from unittest import mock
+
+from bs4 import BeautifulSoup
+
+from nlm_ingestor.ingestor import pdf_ingestor
+from nlm_ingestor.ingestor.visual_ingestor import style_utils
+from nlm_ingestor.ingestor.visual_ingestor.hocr_reader import read_hocr
+from tests.synthetic_pages import make_hocr_html, make_html
+
+
+class HocrReaderTest(unittest.TestCase):
+    def test_line_styles(self):
+        html = make_hocr_html(n_pages=2, seed=1)
+        # a line with its words out of order
+        html = html.replace(
+            "</div></div></div></body>",
+            '<span class="ocr_line" title="bbox 300 3000 900 3040; x_size 40">'
+            '<span class="ocrx_word" title="bbox 700 3000 900 3040">agreement</span> '
+            '<span class="ocrx_word" title="bbox 300 3000 500 3040">total</span>'
+            '<span class="ocrx_word" title="bbox 300 3000 500 3040"> </span></span></div></div></div></body>',
+        )
+        hocr_doc = read_hocr({"content": html})
+        pages = hocr_doc.soup.find_all("div", class_="page")
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(pages[0].find_all("span"), [])
+        n_lines = 0
+        for page in pages:
+            for p in page.find_all("p"):
+                self.assertEqual(
+                    hocr_doc.line_styles[id(p)],
+                    style_utils.parse_tika_style(p["style"], p.text, 612),
+                )
+                n_lines += 1
+        self.assertEqual(n_lines, len(hocr_doc.line_styles))
+        self.assertEqual(p.text, "agreement total")
+        box_style = hocr_doc.line_styles[id(p)][0]
+        self.assertEqual((box_style.left, box_style.right), (168.0, 87.0))
+
+    def test_parse_blocks(self):
+        hocr_doc = read_hocr({"content": make_hocr_html(n_pages=2, seed=0)})
+        blocks, _, _, _, result, page_dim, num_pages = pdf_ingestor.parse_blocks(hocr_doc, render_format="json")
+        self.assertEqual(result[0]["title"], "Scanned")
+        self.assertEqual(page_dim, [612.0, 792.0])
+        self.assertTrue(blocks)
+
+    def test_sparse_page_ocr(self):
+        # the second page of the text layer is a scan without text
+        text_soup = BeautifulSoup(make_html(n_pages=3, seed=0, tables=False), "html.parser")
+        for p in text_soup.find_all("div", class_="page")[1].find_all("p"):
+            p.decompose()
+        text_content = {"content": str(text_soup)}
+        ocr_content = {"content": make_hocr_html(n_pages=3, seed=0)}
+
+        def parse_to_html(doc_location, do_ocr=False, ocr_strategy="ocr_only", ocr_auto_min_chars=None):
+            if do_ocr:
+                self.assertEqual(ocr_strategy, "auto")
+                # the blank page is OCR'd by tika's threshold, the pages with text are not
+                self.assertGreater(ocr_auto_min_chars, len(text_soup.find_all("div", class_="page")[1].get_text()))
+                self.assertLess(ocr_auto_min_chars, len(text_soup.find_all("div", class_="page")[0].get_text()))
+                return ocr_content
+            return text_content
+
+        with mock.patch.object(pdf_ingestor.pdf_file_parser, "parse_to_html", side_effect=parse_to_html) as parser:
+            self.assertIs(pdf_ingestor.parse_pdf("doc.pdf", {}), text_content)
+            self.assertEqual(parser.call_count, 1)
+            hocr_doc = pdf_ingestor.parse_pdf("doc.pdf", {"ocr_sparse_pages": True})
+        self.assertEqual(hocr_doc.ocr_page_idxs, [1])
+        pages = hocr_doc.soup.find_all("div", class_="page")
+        ocr_pages = read_hocr(ocr_content).soup.find_all("div", class_="page")
+        text_pages = text_soup.find_all("div", class_="page")
+        self.assertEqual([p.text for p in pages[1].find_all("p")], [p.text for p in ocr_pages[1].find_all("p")])
+        for page_idx in (0, 2):
+            self.assertEqual([p.text for p in pages[page_idx].find_all("p")], [p.text for p in text_pages[page_idx].find_all("p")])
+        self.assertEqual(set(hocr_doc.line_styles), {id(p) for p in pages[1].find_all("p")})
+        blocks = pdf_ingestor.parse_blocks(hocr_doc, render_format="json")[0]
+        self.assertEqual({block["page_idx"] for block in blocks}, {0, 1, 2})
+
+        # pages with enough text are not OCR'd
+        text_content = {"content": make_html(n_pages=2)}
+        with mock.patch.object(pdf_ingestor.pdf_file_parser, "parse_to_html", return_value=ocr_content) as parser:
+            self.assertIs(pdf_ingestor.apply_sparse_page_ocr("doc.pdf", text_content), text_content)
+            parser.assert_not_called()
+
+    def test_sparse_page_not_ocred(self):
+        # pages 1 and 2 of the text layer are sparse, tika's OCR output has no hOCR for page 2
+        text_soup = BeautifulSoup(make_html(n_pages=3, seed=0, tables=False), "html.parser")
+        text_pages = text_soup.find_all("div", class_="page")
+        for page_idx in (1, 2):
+            for p in text_pages[page_idx].find_all("p")[1:]:
+                p.decompose()
+        ocr_soup = BeautifulSoup(make_hocr_html(n_pages=3, seed=0), "html.parser")
+        ocr_soup.find_all("div", class_="page")[2].find("div", class_="ocr_page").decompose()
+
+        with mock.patch.object(pdf_ingestor.pdf_file_parser, "parse_to_html", return_value={"content": str(ocr_soup)}):
+            with self.assertLogs(pdf_ingestor.logger, "WARNING") as logs:
+                hocr_doc = pdf_ingestor.apply_sparse_page_ocr("doc.pdf", {"content": str(text_soup)})
+        self.assertEqual(hocr_doc.ocr_page_idxs, [1])
+        self.assertIn("Sparse pages [2] were not OCR'd", logs.output[0])
+        pages = hocr_doc.soup.find_all("div", class_="page")
+        self.assertEqual([p.text for p in pages[2].find_all("p")], [p.text for p in text_pages[2].find_all("p")])
+
+
+if __name__ == "__main__":
+    unittest.main()
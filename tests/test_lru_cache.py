@@ -0,0 +1,64 @@
+import threading
+import unittest
+
+from nlm_ingestor.ingestor_utils.lru_cache import LRUCache, lru_memoize
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_eviction(self):
+        cache = LRUCache(max_length=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        self.assertEqual(cache["a"], 1)
+        cache["c"] = 3
+        self.assertNotIn("b", cache)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+        with self.assertRaises(KeyError):
+            cache["b"]
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"], stats["size"]), (3, 2, 1, 2))
+
+    def test_max_bytes(self):
+        cache = LRUCache(max_bytes=100, size_of=len)
+        cache["a"] = "x" * 40
+        cache["b"] = "x" * 40
+        cache["c"] = "x" * 40
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.get_stats()["bytes"], 82)
+        # an entry larger than the bound is still kept, alone
+        cache["d"] = "x" * 200
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.pop("d"), "x" * 200)
+        self.assertEqual(cache.get_stats()["bytes"], 0)
+
+    def test_ttl(self):
+        cache = LRUCache(ttl=0)
+        cache["a"] = 1
+        self.assertNotIn("a", cache)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get_stats()["expirations"], 1)
+        cache = LRUCache(ttl=60)
+        cache["a"] = 1
+        self.assertEqual(cache["a"], 1)
+
+    def test_memoize(self):
+        calls = []
+
+        @lru_memoize(max_length=10)
+        def square(x):
+            calls.append(x)
+            return x * x
+
+        threads = [threading.Thread(target=lambda: [square(i % 5) for i in range(100)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(square(3), 9)
+        self.assertEqual(sorted(set(calls)), [0, 1, 2, 3, 4])
+        self.assertEqual(square.cache.get_stats()["size"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import threading
+import unittest
+
+from nlm_ingestor.ingestor_utils.model_registry import ModelRegistry, models
+
+
+class ModelRegistryTest(unittest.TestCase):
+    def test_lazy_load(self):
+        registry = ModelRegistry()
+        loads = []
+        registry.register("words", lambda: loads.append(1) or {"a", "b"})
+        registry.register("counts", lambda: {"a": 1})
+        self.assertFalse(registry.is_loaded("words"))
+
+        threads = [threading.Thread(target=registry.get, args=("words",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(loads, [1])
+        self.assertEqual(registry.get("words"), {"a", "b"})
+        self.assertEqual(list(registry.get_timings()), ["words"])
+
+        registry.warm()
+        self.assertTrue(registry.is_loaded("counts"))
+        registry.unload("words")
+        registry.get("words")
+        self.assertEqual(len(loads), 2)
+
+    def test_stop_words(self):
+        self.assertIn("the", models.get("stop_words"))
+        self.assertIn("per", models.get("stop_words"))
+
+
+if __name__ == "__main__":
+    unittest.main()
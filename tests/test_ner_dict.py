@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from nlm_ingestor.ingestor_utils.ner_dict import NERDict, convert_json_to_binary
+
+
+def make_ner_dict():
+    ner_dict = NERDict()
+    ner_dict.create_ner_dict(
+        {
+            "Abdominal Neoplasms": {"type": "disease", "metadata": {"uuid": "D000008"}},
+            "Abdominal Neoplasms Stage II": {"type": "disease", "metadata": {"uuid": "D000009"}},
+            "Neoplasms": {"type": "disease", "metadata": {"uuid": "D009369"}},
+            "BRCA1": {"type": "gene", "metadata": {"uuid": "672"}},
+        },
+    )
+    return ner_dict
+
+
+class NERDictTest(unittest.TestCase):
+    def test_find_keys_in_text(self):
+        ner_dict = make_ner_dict()
+        keys = ner_dict.find_keys_in_text("BRCA1 is found in the Abdominal Neoplasms of mice", ["the", "is", "of"])
+        self.assertEqual([key["result"] for key in keys], ["BRCA1", "Abdominal Neoplasms"])
+        self.assertEqual(keys[1]["meta"][0]["metadata"]["uuid"], "D000008")
+
+    def test_longest_match(self):
+        ner_dict = make_ner_dict()
+        keys = ner_dict.find_keys_in_text("Abdominal Neoplasms Stage II", [])
+        self.assertEqual([key["result"] for key in keys], ["Abdominal Neoplasms Stage II"])
+        # falls back to the shorter entries when the longer one does not complete
+        keys = ner_dict.find_keys_in_text("Abdominal Neoplasms Stage I", [])
+        self.assertEqual([key["result"] for key in keys], ["Abdominal Neoplasms"])
+
+    def test_batch_and_long_text(self):
+        ner_dict = make_ner_dict()
+        results = ner_dict.find_keys_in_texts(["BRCA1", "", "Neoplasms " * 20000], [])
+        self.assertEqual(len(results[0]), 1)
+        self.assertEqual(results[1], [])
+        self.assertEqual(len(results[2]), 20000)
+        # the legacy walk is iterative and handles long paragraphs too
+        keys = ner_dict.lookup_keys_in_dict(["BRCA1"] * 20000, ner_dict.ner_dict, [], [])
+        self.assertEqual(len(keys), 20000)
+
+    def test_binary_format(self):
+        ner_dict = make_ner_dict()
+        texts = ["BRCA1 in Abdominal Neoplasms Stage II", "Abdominal Neoplasms Stage I", "nothing here"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_file = os.path.join(tmp_dir, "ner_dict.json")
+            binary_file = os.path.join(tmp_dir, "ner_dict.bin")
+            ner_dict.save_ner_dict_to_json(json_file)
+            convert_json_to_binary(json_file, binary_file)
+            mapped_ner_dict = NERDict()
+            mapped_ner_dict.load_ner_dict_from_binary(binary_file)
+            self.assertEqual(
+                mapped_ner_dict.find_keys_in_texts(texts, ["in"]),
+                ner_dict.find_keys_in_texts(texts, ["in"]),
+            )
@@ -0,0 +1,30 @@
+import unittest
+
+from nlm_ingestor.ingestor.visual_ingestor.order_fixer import BlockColumn, have_range_overlap
+
+
+def make_block(top, left, n_lines=1):
+    visual_lines = [{"box_style": (top + 12 * idx, left, left + 100, 100, 10)} for idx in range(n_lines)]
+    return {"visual_lines": visual_lines}
+
+
+class OrderFixerTest(unittest.TestCase):
+    def test_range_overlap(self):
+        self.assertTrue(have_range_overlap(10, 20, 20, 30))
+        self.assertTrue(have_range_overlap(10, 40, 20, 30))
+        self.assertFalse(have_range_overlap(10, 19, 20, 30))
+
+    def test_block_column_insert(self):
+        blocks = [make_block(100, 72, 3), make_block(200, 72)]
+        column = BlockColumn(blocks)
+        column.insert(1, make_block(150, 300))
+        for top in range(300, 1000, 20):
+            column.append(make_block(top, 72))
+        self.assertIs(column.blocks, blocks)
+        self.assertEqual(column.tops.tolist(), [blk["visual_lines"][0]["box_style"][0] for blk in blocks])
+        self.assertEqual(column.lefts.tolist()[:3], [72, 300, 72])
+        self.assertEqual(column.bottoms.tolist()[:3], [134, 160, 210])
+
+
+if __name__ == "__main__":
+    unittest.main()
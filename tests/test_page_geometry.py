@@ -0,0 +1,57 @@
+import random
+import unittest
+
+from bs4 import BeautifulSoup
+
+from nlm_ingestor.ingestor.visual_ingestor.page_geometry import SvgLineIndex
+from nlm_ingestor.ingestor.visual_ingestor.visual_ingestor import Doc
+from nlm_ingestor.ingestor_utils.ing_named_tuples import BoxStyle
+
+
+def make_lines(rnd, n_lines):
+    soup = BeautifulSoup()
+    lines = []
+    for _ in range(n_lines):
+        x1 = rnd.uniform(0, 300)
+        y1 = round(rnd.uniform(0, 800), 1)
+        # numeric attributes, like the line tags made by Doc.remove_duplicate_svg_tags
+        lines.append(soup.new_tag("line", attrs={"x1": x1, "y1": y1, "x2": x1 + rnd.uniform(50, 400), "y2": y1}))
+    return lines
+
+
+def make_box(rnd):
+    left = rnd.uniform(0, 400)
+    width = rnd.uniform(10, 200)
+    return BoxStyle(round(rnd.uniform(0, 800), 1), left, left + width, width, 10.0)
+
+
+class SvgLineIndexTest(unittest.TestCase):
+    def test_lines_between(self):
+        lines = make_lines(random.Random(0), 50)
+        index = SvgLineIndex(lines)
+        self.assertEqual(len(index), 50)
+        self.assertEqual(index.lines_between(-1, 1000), lines)
+        expected = [line for line in lines if 100 <= line["y1"] <= 200]
+        self.assertEqual(index.lines_between(100, 200), expected)
+
+    def test_same_as_line_list(self):
+        rnd = random.Random(1)
+        lines = make_lines(rnd, 200)
+        index = SvgLineIndex(lines)
+        n_found = 0
+        for _ in range(2000):
+            box_1, box_2 = sorted([make_box(rnd), make_box(rnd)])
+            for check_gap in [False, True]:
+                for x_axis_relaxed in [False, True]:
+                    found = Doc.check_line_between_box_styles(box_1, box_2, lines, check_gap, x_axis_relaxed)
+                    self.assertEqual(
+                        Doc.check_line_between_box_styles(box_1, box_2, index, check_gap, x_axis_relaxed),
+                        found,
+                    )
+                    n_found += found
+        self.assertGreater(n_found, 0)
+        self.assertFalse(Doc.check_line_between_box_styles(box_1, box_2, SvgLineIndex([])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -216,3 +216,32 @@ class MyTest(unittest.TestCase):
         #         'March 2019']
         # result = pro.clean_lines(lines)
         # self.assertEqual(result, ["by the end of March 2019"])
+
+    def test_iter_clean_lines(self):
+        lines = [
+            "continued demand for this type of condominium product in ",
+            "Manhattan.",
+            "TOTAL SOURCES $120,000,000 100.00% $370,370",
+            "% PER KEY",
+            "Hard Costs 60,750,000 50.63% $187,500",
+        ]
+        self.assertEqual(list(pro.iter_clean_lines(iter(lines))), pro.clean_lines(lines))
+
+    def test_seen_line_cache_size(self):
+        lines = [
+            "ANNUAL REPORT 2019",
+            "The first section of the report.",
+            "The second section of the report.",
+            "ANNUAL REPORT 2020",
+        ]
+        # the repeated header is dropped while it is one of the last seen_line_cache_size distinct lines
+        texts = " ".join(block["block_text"] for block in pro.iter_clean_lines(lines))
+        self.assertEqual(texts.count("ANNUAL REPORT"), 1)
+        texts = " ".join(block["block_text"] for block in pro.iter_clean_lines(lines, seen_line_cache_size=2))
+        self.assertEqual(texts.count("ANNUAL REPORT"), 2)
+
+    def test_nlm_tokenize(self):
+        self.assertEqual(pro.nlm_tokenize("Buyer's 10-K/A (2019), total: 5%"), ["buyers", "k", "a", "total:"])
+        self.assertEqual(pro.nlm_tokenize(""), ["unknown"])
+        self.assertTrue(pro.check_parentheses("(a) and (b)"))
+        self.assertFalse(pro.check_parentheses("(a and (b)"))
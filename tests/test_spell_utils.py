@@ -0,0 +1,59 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import nlm_ingestor.ingestion_daemon.config as cfg
+from nlm_ingestor.ingestor_utils import spell_utils
+
+
+class SpellUtilTest(unittest.TestCase):
+    def test_snapshot(self):
+        from_dictionary = spell_utils.SpellUtil(snapshot_path=None)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "symspell.pickle")
+            from_dictionary.save_snapshot(path)
+            from_snapshot = spell_utils.SpellUtil(snapshot_path=path)
+
+            self.assertEqual(from_snapshot.sym_spell.words, from_dictionary.sym_spell.words)
+            for term in ["revenue", "revnue", "finacial", "statments", "agrement"]:
+                self.assertEqual(from_snapshot.lookup_word(term), from_dictionary.lookup_word(term))
+            for text in ["thecompanyshallprovide", "FinancialStatements", "netincomeandcashflow"]:
+                self.assertEqual(from_snapshot.segment(text), from_dictionary.segment(text))
+
+            # a snapshot built with other settings is not used
+            with open(path, "rb") as f:
+                pickle.load(f)
+                data = f.read()
+            with open(path, "wb") as f:
+                pickle.dump(dict(spell_utils.get_snapshot_header(), prefix_length=5), f)
+                f.write(data)
+            self.assertFalse(spell_utils.SpellUtil(snapshot_path=None).load_snapshot(path))
+
+    def test_memo(self):
+        try:
+            cfg.set_config("SPELL_CACHE_SIZE", 2)
+            spell_util = spell_utils.SpellUtil()
+            texts = ["ANNUALREPORT", "netincome", "ANNUALREPORT", "ANNUALREPORT"]
+            self.assertEqual(spell_util.segment_many(texts), ["Annual Report", "net income", "Annual Report", "Annual Report"])
+            self.assertEqual(spell_util.segment("netincome"), "net income")
+            self.assertEqual(spell_util.segment("totalrevenue"), "total revenue")
+            stats = spell_util.get_cache_stats()["segment"]
+            self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 3, 2))
+            self.assertEqual(stats["hit_rate"], 0.25)
+
+            # the memo follows the setting, unless its size was given
+            cfg.set_config("SPELL_CACHE_SIZE", 1)
+            self.assertEqual(spell_util.get_cache_stats()["segment"]["size"], 1)
+            sized_spell_util = spell_utils.SpellUtil(cache_size=3)
+            cfg.set_config("SPELL_CACHE_SIZE", 5)
+            self.assertEqual(spell_util.segment.cache.max_length, 5)
+            self.assertEqual(sized_spell_util.segment.cache.max_length, 3)
+        finally:
+            cfg.set_config("SPELL_CACHE_SIZE", 50000)
+        spell_util.clear_caches()
+        self.assertEqual(spell_util.get_cache_stats()["segment"]["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import pandas as pd
+
+from nlm_ingestor.ingestor.table_builder import format_tables
+
+
+def make_blocks_df(rows):
+    return pd.DataFrame({
+        "block_text": [text for text, _ in rows],
+        "block_sents": [[text] for text, _ in rows],
+        "block_type": [block_type for _, block_type in rows],
+    })
+
+
+class TableBuilderTest(unittest.TestCase):
+    def test_format_tables(self):
+        blocks_df = make_blocks_df([
+            ("Results of operations", "header"),
+            ("Revenue 1,234 1,500", "table_row"),
+            ("Net income (56) 120", "table_row"),
+            ("The table above shows the results.", "para"),
+            ("Total 1,178", "table_row"),
+            ("Margin: 12% 15%", "table_row"),
+            ("Segments", "header"),
+            ("Retail $ 10 $ 20 Online $ 30 $ 40", "table_row"),
+            ("Wholesale $ 50 $ 60", "table_row"),
+            ("Final para", "para"),
+            ("Trailing 1 2", "table_row"),
+            ("Trailing 3 4", "table_row"),
+        ])
+        # output of the DataFrame drop / loc based implementation
+        tables = [
+            [["Revenue", "1,234", "1,500"], ["Net income", "(56)", "120"]],
+            [["Total", "1,178"], ["12%", "15%"]],
+            [["Retail", "$10", "$20", "Online", "$30", "$40"], ["Wholesale", "$50", "$60"]],
+        ]
+        expected = pd.DataFrame({
+            "block_text": [
+                "Results of operations", tables[0], "The table above shows the results.", tables[1], "Segments",
+                tables[2], "Final para", "Trailing 1 2", "Trailing 3 4",
+            ],
+            "block_sents": [
+                ["Results of operations"], tables[0], ["The table above shows the results."], tables[1],
+                ["Segments"], tables[2], ["Final para"], ["Trailing 1 2"], ["Trailing 3 4"],
+            ],
+            "block_type": ["header", "table", "para", "table", "header", "table", "para", "table_row", "table_row"],
+        })
+        pd.testing.assert_frame_equal(format_tables(blocks_df), expected)
+
+    def test_tables_of_different_lengths(self):
+        blocks_df = make_blocks_df([
+            ("Revenue 1,234 1,500", "table_row"),
+            ("Net income 120 NA", "table_row"),
+            ("Total 1,354 1,500", "table_row"),
+            ("Outlook", "header"),
+            ("Single row 1 2", "table_row"),
+            ("Final para", "para"),
+            ("Tax 5 6", "table_row"),
+            ("Cost 1 2 Price 3 4", "table_row"),
+            ("Fees 7 8", "table_row"),
+            ("Other 9", "table_row"),
+            ("The end", "para"),
+            ("Trailing 1 2", "table_row"),
+            ("Trailing 3 4", "table_row"),
+        ])
+        formatted_df = format_tables(blocks_df)
+        self.assertEqual(
+            formatted_df.block_type.tolist(),
+            ["table", "header", "para", "para", "table", "para", "table_row", "table_row"],
+        )
+        self.assertEqual(formatted_df.block_text[0][1], ["Net income", "120", "NA"])
+        # the row holding two rows is split in two
+        self.assertEqual(
+            formatted_df.block_text[4],
+            [["Tax", "5", "6"], ["Cost", "1", "2"], ["Price", "3", "4"], ["Fees", "7", "8"], ["Other", "9"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from nlm_ingestor.ingestor.table_parser import TableModel, TableParser
+from tests.synthetic_pages import make_table_infos
+
+
+def make_infos():
+    rows = [
+        {"is_header": True, "cell_values": ["", "2019", "2020"]},
+        {"is_row_group": True, "cell_values": ["Revenue:"]},
+        {"cell_values": ["Retail", "1,234", "1,500"]},
+        {"cell_values": ["Online", "99", "120"]},
+        {"is_row_group": True, "cell_values": ["Costs"]},
+        {"cell_values": ["Retail", "(56)", "N/A"]},
+    ]
+    rows[0]["is_table_start"] = True
+    rows[-1]["is_table_end"] = True
+    return [{"block_text": "The segments were as follows."}] + [dict(row, table_idx=0) for row in rows]
+
+
+class TableParserTest(unittest.TestCase):
+    def test_row_groups(self):
+        tp = TableParser(make_infos())
+        table = tp.tables[1]
+        self.assertIsInstance(table, TableModel)
+        self.assertEqual(table.columns, ["2019", "2020"])
+        self.assertEqual(table.index_names, ["_MULTI_INDEX_", "_UNKNOWN_COLUMN_0_"])
+        es_index, cell_texts = tp.create_es_index(table)
+        self.assertEqual([record["type"] for record in es_index], ["row"] * 3 + ["col"] * 2 + ["index"])
+        self.assertEqual(es_index[2]["text"], "Costs Retail (56) N/A")
+        self.assertEqual(es_index[4]["text"], "2020 1,500 120 N/A")
+        self.assertEqual(cell_texts[:2], ["None Revenue Retail 2019 1,234", "None Revenue Retail 2020 1,500"])
+
+        df = table.to_dataframe()
+        self.assertEqual(df.index.names, ["_MULTI_INDEX_", "_UNKNOWN_COLUMN_0_"])
+        self.assertEqual(df.loc[("Costs", "Retail"), "2020"], "N/A")
+
+    def test_same_as_dataframe(self):
+        tp = TableParser(make_table_infos(300))
+        self.assertGreater(len(tp.tables), 200)
+        for table in tp.tables.values():
+            df = table.to_dataframe()
+            self.assertEqual(df.shape, table.shape)
+            self.assertEqual(tp.create_es_index(df), tp.create_es_index(table))
+            flat_df = df.reset_index(drop=True)
+            self.assertEqual(tp.resolve_index(flat_df), tp.resolve_index(TableModel.from_dataframe(flat_df)))
+
+
+if __name__ == "__main__":
+    unittest.main()
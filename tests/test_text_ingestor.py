@@ -0,0 +1,29 @@
+import os
+import shutil
+import tempfile
+import types
+import unittest
+
+from nlm_ingestor.ingestor import ingestor_api, text_ingestor
+
+sample_path = os.path.join(os.path.dirname(__file__), "golden", "fixtures", "sample.txt")
+
+
+class TextIngestorTest(unittest.TestCase):
+    def test_stream_blocks(self):
+        blocks = text_ingestor.TextIngestor(sample_path, {"render_format": "all"}).return_dict["result"]["blocks"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            doc_location = shutil.copy(sample_path, os.path.join(tmp_dir, "sample.txt"))
+            return_dict, ingestor = ingestor_api.ingest_document(
+                "sample.txt", doc_location, "text/plain", {"render_format": "all", "stream_blocks": True},
+            )
+            # ingest_document has deleted the file, its blocks are read from the file opened before
+            self.assertFalse(os.path.exists(doc_location))
+            self.assertIsInstance(return_dict["result"]["blocks"], types.GeneratorType)
+            self.assertEqual(list(return_dict["result"]["blocks"]), blocks)
+        self.assertTrue(blocks)
+        self.assertEqual(return_dict["result"]["styles"], ingestor.json_dict["styles"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from nlm_ingestor.ingestor_utils.model_registry import models
+
+
+class WordSplitterTest(unittest.TestCase):
+    def test_split(self):
+        word_splitter = models.get("word_splitter")
+        self.assertEqual(word_splitter.split("thecompanyshallprovide"), ["the", "company", "shall", "provide"])
+        self.assertEqual(word_splitter.split("TotalRevenue"), ["Total", "Revenue"])
+        self.assertEqual(word_splitter.split("revenueof1,234million"), ["revenue", "of", "1,234", "million"])
+        self.assertEqual(word_splitter.split("upby15%"), ["up", "by", "15 %"])
+        self.assertEqual(word_splitter.split(""), [])
+
+    def test_best_matches(self):
+        match_costs, match_lengths = models.get("word_splitter").get_best_matches("netincome")
+        self.assertEqual(len(match_costs), 10)
+        self.assertEqual(match_lengths[3], 3)
+        self.assertEqual(match_lengths[9], 6)
+        self.assertEqual(match_costs[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()